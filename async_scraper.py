@@ -0,0 +1,428 @@
+"""asyncio engine for the scraping workflows.
+
+``AsyncScraperService`` runs the same hashtag and followers/following
+pipelines as ``ScraperService`` from an event loop: blocking instagrapi
+calls go to a thread pool, pacing waits with ``asyncio.sleep`` and
+cancelling the task (Ctrl-C under ``asyncio.run``) stops the scrape after
+flushing the cache, the store and the checkpoint journal. Sessions, caches,
+the pacer and the checkpoint bookkeeping are shared with the wrapped
+``ScraperService``.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from dataclasses import dataclass, field
+from functools import partial
+from typing import AsyncIterator, Awaitable, Callable, Iterable, Iterator
+
+from checkpoint import CheckpointJournal
+from delta import SnapshotDelta
+from filters import FilterCriteria
+from metrics import RunMetrics
+from records import UserRow
+from scraper import (
+    RELATION_CHUNK_METHODS,
+    RELATION_PAGE_SIZE,
+    ClientError,
+    PleaseWaitFewMinutes,
+    PrivateError,
+    RateLimitError,
+    ScrapeRun,
+    ScraperResult,
+    ScraperService,
+    ScrapeStats,
+    SourceOutcome,
+    UserNotFound,
+    check_refresh,
+    describe_stream,
+    endpoint_name,
+)
+from targeting import ScrapeTarget
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class AsyncScrapeStream:
+    """Async counterpart of ``ScrapeStream``; consume it with ``async for``."""
+
+    rows: AsyncIterator[UserRow]
+    stats: ScrapeStats
+    describe: Callable[[ScrapeStats], str]
+    metrics: RunMetrics = field(default_factory=RunMetrics)
+    delta: SnapshotDelta | None = None
+    checkpoints: CheckpointJournal | None = None
+
+    @property
+    def description(self) -> str:
+        return describe_stream(self)
+
+    def __aiter__(self) -> AsyncIterator[UserRow]:
+        return self.rows
+
+    async def collect(self) -> ScraperResult:
+        rows = [row async for row in self.rows]
+        return ScraperResult(rows, self.description, self.delta)
+
+
+class AsyncScraperService:
+    """Event-loop front end over a ``ScraperService``.
+
+    Up to ``concurrency`` (``service.workers`` by default) profile requests
+    are in flight at once, each in its own executor thread with its own copy
+    of the session; all of them still share the service's pacer.
+    """
+
+    def __init__(self, service: ScraperService, concurrency: int | None = None) -> None:
+        self.service = service
+        self.concurrency = max(1, concurrency or service.workers)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.concurrency, thread_name_prefix="async-io", initializer=self._init_thread
+        )
+
+    def _init_thread(self) -> None:
+        self.service.isolate_thread()
+
+    def __enter__(self) -> "AsyncScraperService":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    async def __aenter__(self) -> "AsyncScraperService":
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Stops the executor; a request already on the wire is allowed to finish."""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    # ------------------------------------------------------------------
+    # Solicitudes
+    # ------------------------------------------------------------------
+    async def _offload(self, func: Callable, *args, **kwargs):
+        # copy_context: los hilos registran en las métricas del stream que los lanzó.
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(copy_context().run, func, *args, **kwargs))
+
+    async def _acquire(self) -> float:
+        waited = 0.0
+        while True:
+            delay = self.service.pacer.reserve()
+            if not delay:
+                return waited
+            await asyncio.sleep(delay)
+            waited += delay
+
+    def _invoke(self, client, method: str | Callable, args: tuple, kwargs: dict):
+        service = self.service
+        return service.endpoint(service.worker_client(client), method)(*args, **kwargs)
+
+    async def _call(self, client, method: str | Callable, *args, **kwargs):
+        """Async ``ScraperService._call``: same retries and metrics, without blocking the loop."""
+        service = self.service
+        if service.session_pool is not None:
+            # La espera por una cuenta libre del pool ocurre en el hilo.
+            return await self._offload(service.pooled_call, method, *args, **kwargs)
+        endpoint = endpoint_name(method)
+        attempts = 0
+        while True:
+            service.metrics.add_sleep(await self._acquire())
+            start = time.perf_counter()
+            try:
+                result = await self._offload(self._invoke, client, method, args, kwargs)
+            except Exception as exc:
+                attempts = service.request_failed(endpoint, start, exc, attempts)
+                continue
+            service.request_done(endpoint, start)
+            return result
+
+    async def _request_user_row(self, client, user) -> UserRow | None:
+        service = self.service
+        try:
+            for method in service.profile_methods():
+                row = service.profile_row(user, method, await self._call(client, method, user.pk))
+                if row is not None:
+                    return row
+        except Exception as exc:
+            return service.profile_error_row(user, exc)
+        return None
+
+    async def _enrich_users(
+        self, client, users: AsyncIterator, run: ScrapeRun
+    ) -> AsyncIterator[tuple[object, UserRow]]:
+        """Async ``ScraperService._enrich_users``: ordered, with a bounded window of requests."""
+        loop = asyncio.get_running_loop()
+        pending: deque[tuple[object, asyncio.Future, bool]] = deque()
+        window = self.concurrency * 2
+        should_stop = run.should_stop
+
+        async def resolve(item: tuple[object, asyncio.Future, bool]) -> tuple[object, UserRow | None]:
+            user, future, from_cache = item
+            row = await future
+            if row is not None and not from_cache:
+                run.remember(user, row)
+            return user, row
+
+        try:
+            async for user in users:
+                known = run.known_row(user)
+                if known is not None:
+                    future = loop.create_future()
+                    future.set_result(known)
+                    pending.append((user, future, True))
+                else:
+                    pending.append((user, asyncio.ensure_future(self._request_user_row(client, user)), False))
+                while pending and (len(pending) > window or pending[0][1].done()):
+                    ready, row = await resolve(pending.popleft())
+                    if row is not None:
+                        yield ready, row
+                if should_stop is not None:
+                    in_flight = sum(1 for _, future, from_cache in pending if not from_cache and not future.done())
+                    if should_stop(in_flight):
+                        break
+            while pending:
+                ready, row = await resolve(pending.popleft())
+                if row is not None:
+                    yield ready, row
+        finally:
+            futures = [future for _, future, _ in pending]
+            for future in futures:
+                future.cancel()
+            await asyncio.gather(*futures, return_exceptions=True)
+
+    async def _relation_pages(
+        self, client, user_id: str, relation: str, cursor: str | None = None
+    ) -> AsyncIterator[tuple[str | None, list]]:
+        method = RELATION_CHUNK_METHODS[relation]
+        while True:
+            users, next_cursor = await self._call(
+                client, method, user_id, max_amount=RELATION_PAGE_SIZE, max_id=cursor or ""
+            )
+            yield cursor, users
+            if not users or not next_cursor:
+                return
+            cursor = next_cursor
+
+    # ------------------------------------------------------------------
+    # Flujos
+    # ------------------------------------------------------------------
+    def stream_hashtag(
+        self,
+        hashtag: str,
+        amount: int,
+        criteria: FilterCriteria | None = None,
+        refresh_age: float | None = None,
+        target: ScrapeTarget | None = None,
+    ) -> AsyncScrapeStream:
+        """Async ``ScraperService.stream_hashtag``."""
+        client = self.service.ensure_login()
+        check_refresh(refresh_age, resume=False, incremental=False)
+        run = ScrapeRun(self.service, hashtag, "hashtag", criteria, refresh_age, target)
+
+        async def rows() -> AsyncIterator[UserRow]:
+            run.activate()
+            try:
+                medias = await self._call(client, "hashtag_medias_recent", hashtag, amount=amount)
+            except ClientError as exc:
+                raise RuntimeError(f"Instagram rechazó la consulta del hashtag: {exc}") from exc
+            run.begin()
+
+            async def candidates() -> AsyncIterator:
+                for user in run.hashtag_candidates(medias):
+                    yield user
+
+            enriched = self._enrich_users(client, candidates(), run)
+            try:
+                async for user, row in enriched:
+                    if run.keep(user, row):
+                        yield row
+                    if run.met():
+                        break
+            except (RateLimitError, PleaseWaitFewMinutes) as exc:
+                raise run.rate_limit_error() from exc
+            finally:
+                await enriched.aclose()
+                run.close()
+            run.finish()
+
+        return AsyncScrapeStream(rows(), run.stats, run.describe, run.metrics, run.delta)
+
+    async def scrape_hashtag(
+        self,
+        hashtag: str,
+        amount: int,
+        criteria: FilterCriteria | None = None,
+        refresh_age: float | None = None,
+        target: ScrapeTarget | None = None,
+    ) -> ScraperResult:
+        return await self.stream_hashtag(hashtag, amount, criteria, refresh_age, target).collect()
+
+    def stream_profile_relations(
+        self,
+        usernames: Iterable[str],
+        relation: str,
+        criteria: FilterCriteria | None = None,
+        resume: bool = False,
+        limit: int | None = None,
+        incremental: bool = False,
+        refresh_age: float | None = None,
+        target: ScrapeTarget | None = None,
+    ) -> Iterator[tuple[str, AsyncScrapeStream]]:
+        """Async ``ScraperService.stream_profile_relations``, with the same checkpoint, refresh and target semantics."""
+        service = self.service
+        client = service.ensure_login()
+        relation = relation.lower()
+        if relation not in RELATION_CHUNK_METHODS:
+            raise ValueError("La relación debe ser 'followers' o 'following'.")
+        check_refresh(refresh_age, resume, incremental)
+
+        async def source_rows(run: ScrapeRun) -> AsyncIterator[UserRow]:
+            run.activate()
+            if not run.start_walk(resume, limit, incremental):
+                return
+            walk = run.walk
+
+            try:
+                user_id = await self._call(client, "user_id_from_username", run.source)
+            except UserNotFound as exc:
+                raise run.source_error(exc) from exc
+
+            pages = self._relation_pages(client, user_id, relation, walk.start_cursor)
+            try:
+                first_page = await pages.__anext__()
+            except (RateLimitError, PleaseWaitFewMinutes, PrivateError) as exc:
+                raise run.source_error(exc) from exc
+
+            async def candidates() -> AsyncIterator:
+                cursor, page = first_page
+                while True:
+                    for user in run.page_candidates(cursor, page):
+                        yield user
+                    if walk.stopped:
+                        return
+                    try:
+                        cursor, page = await pages.__anext__()
+                    except StopAsyncIteration:
+                        break
+                walk.exhausted = True
+
+            run.begin()
+            enriched = self._enrich_users(client, candidates(), run)
+            try:
+                async for user, row in enriched:
+                    if run.keep(user, row):
+                        yield row
+                    run.processed(user)
+                    if run.met():
+                        break
+            except (RateLimitError, PleaseWaitFewMinutes) as exc:
+                raise run.rate_limit_error() from exc
+            finally:
+                await enriched.aclose()
+                await pages.aclose()
+                run.close()
+            run.finish()
+
+        def stream_for(username: str) -> AsyncScrapeStream:
+            run = ScrapeRun(service, username, relation, criteria, refresh_age, target)
+            return AsyncScrapeStream(source_rows(run), run.stats, run.describe, run.metrics, run.delta, run.checkpoints)
+
+        def streams() -> Iterator[tuple[str, AsyncScrapeStream]]:
+            for username in usernames:
+                username = username.strip()
+                if username:
+                    yield username, stream_for(username)
+
+        return streams()
+
+    def run_profile_relations(
+        self,
+        usernames: Iterable[str],
+        relation: str,
+        consume: Callable[[str, AsyncScrapeStream], Awaitable[object]] | None = None,
+        criteria: FilterCriteria | None = None,
+        resume: bool = False,
+        limit: int | None = None,
+        incremental: bool = False,
+        parallel: int | None = None,
+        refresh_age: float | None = None,
+        target: ScrapeTarget | None = None,
+    ) -> AsyncIterator[SourceOutcome]:
+        """Async ``ScraperService.run_profile_relations``: one task per source.
+
+        Outcomes are yielded in completion order. Closing the iterator (or
+        cancelling the task consuming it) cancels the sources still running,
+        and each one flushes its progress before stopping.
+        """
+        consume = consume or (lambda username, stream: stream.collect())
+        streams = self.stream_profile_relations(
+            usernames,
+            relation,
+            criteria,
+            resume,
+            limit=limit,
+            incremental=incremental,
+            refresh_age=refresh_age,
+            target=target,
+        )
+        semaphore = asyncio.Semaphore(max(1, parallel or self.service.parallel_sources))
+
+        async def run(username: str, stream: AsyncScrapeStream) -> SourceOutcome:
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    value = await consume(username, stream)
+                except Exception as exc:
+                    logger.warning("Falló el scraping de %s de %s: %s", relation, username, exc)
+                    return SourceOutcome(username, stream, error=str(exc), seconds=time.perf_counter() - start)
+                return SourceOutcome(username, stream, value, seconds=time.perf_counter() - start)
+
+        async def outcomes() -> AsyncIterator[SourceOutcome]:
+            tasks = [asyncio.ensure_future(run(username, stream)) for username, stream in streams]
+            try:
+                for next_done in asyncio.as_completed(tasks):
+                    yield await next_done
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+        return outcomes()
+
+    async def scrape_profile_relations(
+        self,
+        usernames: Iterable[str],
+        relation: str,
+        criteria: FilterCriteria | None = None,
+        resume: bool = False,
+        limit: int | None = None,
+        incremental: bool = False,
+        parallel: int | None = None,
+        refresh_age: float | None = None,
+        target: ScrapeTarget | None = None,
+    ) -> dict[str, ScraperResult]:
+        """Results of every source that finished; failed sources are logged and left out."""
+        results: dict[str, ScraperResult] = {}
+        outcomes = self.run_profile_relations(
+            usernames,
+            relation,
+            criteria=criteria,
+            resume=resume,
+            limit=limit,
+            incremental=incremental,
+            parallel=parallel,
+            refresh_age=refresh_age,
+            target=target,
+        )
+        async for outcome in outcomes:
+            if outcome.ok:
+                results[outcome.username] = outcome.value
+        return results
@@ -0,0 +1,518 @@
+"""Non-interactive job runner for scheduled (cron) executions.
+
+Progress is reported as one JSON object per line on stdout; logs go to
+stderr. The process exit code summarizes the run (see ``EXIT_*``).
+"""
+from __future__ import annotations
+
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field, fields
+from pathlib import Path
+from typing import IO, Callable, Iterator, List
+
+from filters import FilterCriteria, apply_filters_frame
+from metrics import RunMetrics
+from output import OutputOptions, open_output
+from targeting import ScrapeTarget
+from utils import (
+    OUTPUT_FORMATS,
+    delta_path,
+    filtered_output_path,
+    frame_to_rows,
+    hashtag_output_path,
+    open_result_writer,
+    read_results,
+    relation_output_path,
+    report_path,
+    result_fields,
+    result_format,
+    result_shards,
+)
+
+EXIT_OK = 0
+EXIT_JOB_FAILED = 1
+EXIT_INVALID_JOBS = 2
+EXIT_NOT_LOGGED_IN = 3
+EXIT_INTERRUPTED = 130
+
+ENGINES = ("threads", "asyncio")
+
+JOB_TYPES = ("hashtag", "profiles", "filter")
+PROGRESS_EVERY = 25
+
+
+class JobFileError(ValueError):
+    """The job file (or the job built from CLI arguments) is invalid."""
+
+
+@dataclass
+class Job:
+    type: str
+    hashtag: str | None = None
+    amount: int = 100
+    usernames: List[str] = field(default_factory=list)
+    relation: str = "followers"
+    resume: bool = False
+    limit: int | None = None
+    incremental: bool = False
+    refresh_days: float | None = None
+    path: Path | None = None
+    criteria: FilterCriteria | None = None
+    output_format: str = "csv"
+    output: OutputOptions = field(default_factory=OutputOptions)
+    scrape_target: ScrapeTarget | None = None
+
+    @property
+    def refresh_age(self) -> float | None:
+        return self.refresh_days * 86400 if self.refresh_days is not None else None
+
+    @property
+    def target(self) -> str:
+        if self.type == "hashtag":
+            return f"#{self.hashtag}"
+        if self.type == "profiles":
+            return ",".join(self.usernames)
+        return str(self.path)
+
+
+def criteria_from_mapping(data: dict | str | None) -> FilterCriteria | None:
+    """Criteria of a job: a filter expression, or the fixed fields (plus an optional ``expression``)."""
+    if not data:
+        return None
+    if isinstance(data, str):
+        data = {"expression": data}
+    known = {item.name for item in fields(FilterCriteria)}
+    unknown = set(data) - known
+    if unknown:
+        raise JobFileError(f"Filtros desconocidos: {', '.join(sorted(unknown))}")
+    values = dict(data)
+    expression = values.pop("expression", None)
+    try:
+        criteria = FilterCriteria(**values)
+        return FilterCriteria.from_expression(expression, criteria) if expression else criteria
+    except ValueError as exc:
+        raise JobFileError(f"Filtro inválido: {exc}") from None
+
+
+def output_from_mapping(data: dict) -> OutputOptions:
+    """Output options of a job: ``compress`` (gzip/zstd), ``shard_mb`` and ``shard_rows``."""
+    try:
+        shard_mb = float(data["shard_mb"]) if data.get("shard_mb") is not None else None
+        shard_rows = int(data["shard_rows"]) if data.get("shard_rows") is not None else None
+        return OutputOptions(
+            compression=data.get("compress") or None,
+            max_bytes=int(shard_mb * 2**20) if shard_mb is not None else None,
+            max_rows=shard_rows,
+        )
+    except (TypeError, ValueError) as exc:
+        raise JobFileError(f"Opciones de salida inválidas: {exc}") from None
+
+
+def target_from_mapping(data: dict) -> ScrapeTarget | None:
+    """Target of a job: ``target`` (matching accounts per source) and/or ``max_requests``."""
+    if data.get("target") is None and data.get("max_requests") is None:
+        return None
+    try:
+        return ScrapeTarget(
+            matches=int(data["target"]) if data.get("target") is not None else None,
+            requests=int(data["max_requests"]) if data.get("max_requests") is not None else None,
+        )
+    except (TypeError, ValueError) as exc:
+        raise JobFileError(f"Objetivo inválido: {exc}") from None
+
+
+def _positive_int(data: dict, name: str, job_type: str) -> int:
+    try:
+        value = int(data[name])
+    except (TypeError, ValueError):
+        raise JobFileError(f"'{name}' debe ser un número entero en el trabajo de {job_type}: {data[name]!r}.") from None
+    if value < 1:
+        raise JobFileError(f"'{name}' debe ser mayor que cero en el trabajo de {job_type}: {value}.")
+    return value
+
+
+def job_from_mapping(data: dict) -> Job:
+    if not isinstance(data, dict):
+        raise JobFileError("Cada trabajo debe ser un objeto JSON.")
+    job_type = data.get("type")
+    if job_type not in JOB_TYPES:
+        raise JobFileError(f"Tipo de trabajo inválido: {job_type!r}. Usa uno de {', '.join(JOB_TYPES)}.")
+    output_format = data.get("format", "csv")
+    if output_format not in OUTPUT_FORMATS:
+        raise JobFileError(f"Formato de salida inválido: {output_format!r}.")
+    job = Job(
+        type=job_type,
+        criteria=criteria_from_mapping(data.get("filters")),
+        output_format=output_format,
+        output=output_from_mapping(data),
+    )
+    if job_type != "filter" and data.get("refresh") is not None:
+        try:
+            job.refresh_days = float(data["refresh"])
+        except (TypeError, ValueError):
+            raise JobFileError(f"'refresh' debe ser una cantidad de días: {data['refresh']!r}.") from None
+        if job.refresh_days < 0:
+            raise JobFileError("'refresh' no puede ser negativo.")
+    if job_type != "filter":
+        job.scrape_target = target_from_mapping(data)
+    if job_type == "hashtag":
+        job.hashtag = str(data.get("hashtag", "")).strip().lstrip("#")
+        if data.get("amount") is not None:
+            job.amount = _positive_int(data, "amount", job_type)
+        if not job.hashtag:
+            raise JobFileError("Los trabajos de hashtag necesitan 'hashtag'.")
+    elif job_type == "profiles":
+        usernames = data.get("usernames") or []
+        if isinstance(usernames, str):
+            usernames = usernames.split(",")
+        job.usernames = [name.strip() for name in usernames if name and name.strip()]
+        job.relation = str(data.get("relation", job.relation)).lower()
+        job.resume = bool(data.get("resume", False))
+        job.incremental = bool(data.get("incremental", False))
+        job.limit = _positive_int(data, "limit", job_type) if data.get("limit") is not None else None
+        if not job.usernames:
+            raise JobFileError("Los trabajos de perfiles necesitan 'usernames'.")
+        if job.relation not in {"followers", "following"}:
+            raise JobFileError("La relación debe ser 'followers' o 'following'.")
+        if job.refresh_days is not None and (job.resume or job.incremental):
+            raise JobFileError("'refresh' lista la relación completa; no se combina con 'resume' ni 'incremental'.")
+    else:
+        if not data.get("path"):
+            raise JobFileError("Los trabajos de filtro necesitan 'path'.")
+        job.path = Path(data["path"]).expanduser()
+        if job.criteria is None:
+            raise JobFileError("Los trabajos de filtro necesitan 'filters'.")
+    return job
+
+
+def load_jobs(path: Path) -> List[Job]:
+    """Reads a JSON job file: ``{"jobs": [...]}`` or a plain list of jobs."""
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError) as exc:
+        raise JobFileError(f"No se pudo leer el archivo de trabajos {path}: {exc}") from exc
+    entries = data.get("jobs") if isinstance(data, dict) else data
+    if not isinstance(entries, list) or not entries:
+        raise JobFileError("El archivo de trabajos no contiene una lista 'jobs'.")
+    jobs = []
+    for index, entry in enumerate(entries, start=1):
+        try:
+            jobs.append(job_from_mapping(entry))
+        except JobFileError as exc:
+            raise JobFileError(f"Trabajo {index}: {exc}") from None
+    return jobs
+
+
+class ProgressEmitter:
+    """Writes machine-readable progress events as JSON lines.
+
+    Sources scraped in parallel emit from their own threads, so every line
+    is written under a lock.
+    """
+
+    def __init__(self, stream: IO[str] | None = None) -> None:
+        self.stream = stream or sys.stdout
+        self._lock = threading.Lock()
+
+    def emit(self, event: str, **data: object) -> None:
+        payload = {"event": event, "ts": round(time.time(), 3), **data}
+        line = json.dumps(payload, ensure_ascii=False, default=str) + "\n"
+        with self._lock:
+            self.stream.write(line)
+            self.stream.flush()
+
+
+@contextmanager
+def _stream_writer(
+    stream, output_path: Path, fieldnames: List[str], job: Job, append: bool = False
+) -> Iterator:
+    """Result writer for ``stream`` that leaves the run report next to ``output_path``, also on errors."""
+    error = None
+    try:
+        with open_output(
+            output_path,
+            fieldnames,
+            job.output_format,
+            append=append,
+            metrics=stream.metrics,
+            options=job.output,
+            checkpoints=stream.checkpoints,
+        ) as writer:
+            yield writer
+    except Exception as exc:
+        error = str(exc)
+        raise
+    except BaseException:
+        error = "interrumpido"
+        raise
+    finally:
+        stream.metrics.finish()
+        extra = {"error": error} if error else {}
+        stream.metrics.write_report(
+            report_path(output_path), output=str(output_path), stats=asdict(stream.stats), **extra
+        )
+        if stream.delta is not None:
+            stream.delta.write(delta_path(output_path))
+
+
+def _write_stream(
+    stream,
+    output_path: Path,
+    fieldnames: List[str],
+    job: Job,
+    emit: Callable,
+    index: int,
+    append: bool = False,
+    source: str | None = None,
+) -> int:
+    """Writes ``stream`` to ``output_path`` and its run report next to it."""
+    where = {"source": source} if source else {}
+    with _stream_writer(stream, output_path, fieldnames, job, append) as writer:
+        for row in stream:
+            writer.write(row)
+            if writer.rows_written % PROGRESS_EVERY == 0:
+                emit("progress", job=index, **where, found=stream.stats.found, kept=stream.stats.kept)
+    return writer.rows_written
+
+
+async def _write_stream_async(
+    stream,
+    output_path: Path,
+    fieldnames: List[str],
+    job: Job,
+    emit: Callable,
+    index: int,
+    append: bool = False,
+    source: str | None = None,
+) -> int:
+    """``_write_stream`` for an ``AsyncScrapeStream``."""
+    where = {"source": source} if source else {}
+    with _stream_writer(stream, output_path, fieldnames, job, append) as writer:
+        async for row in stream:
+            writer.write(row)
+            if writer.rows_written % PROGRESS_EVERY == 0:
+                emit("progress", job=index, **where, found=stream.stats.found, kept=stream.stats.kept)
+    return writer.rows_written
+
+
+def _delta_output(stream, output_path: Path) -> dict:
+    if stream.delta is None:
+        return {}
+    return {"delta": str(delta_path(output_path)), "changes": stream.delta.summary()}
+
+
+def _target_output(stream) -> dict:
+    stats = stream.stats
+    if not stats.spent_requests and not stats.target_stop:
+        return {}
+    return {
+        "requests": stats.spent_requests,
+        "stop": stats.target_stop,
+        "skipped": stats.skipped,
+        "saved_requests": stats.saved_requests,
+    }
+
+
+def _shard_output(output_path: Path) -> dict:
+    shards = result_shards(output_path)
+    return {"shards": [str(path) for path in shards]} if len(shards) > 1 else {}
+
+
+def _hashtag_output(stream, output_path: Path, rows: int) -> List[dict]:
+    return [
+        {
+            "output": str(output_path),
+            "rows": rows,
+            "description": stream.description,
+            "report": str(report_path(output_path)),
+            **_shard_output(output_path),
+            **_delta_output(stream, output_path),
+            **_target_output(stream),
+        }
+    ]
+
+
+def _run_hashtag(service, job: Job, index: int, emit: Callable) -> List[dict]:
+    stream = service.stream_hashtag(job.hashtag, job.amount, job.criteria, job.refresh_age, job.scrape_target)
+    output_path = hashtag_output_path(job.hashtag, job.output_format, job.output.compression)
+    rows = _write_stream(stream, output_path, result_fields(), job, emit, index)
+    return _hashtag_output(stream, output_path, rows)
+
+
+async def _run_hashtag_async(service, job: Job, index: int, emit: Callable) -> List[dict]:
+    stream = service.stream_hashtag(job.hashtag, job.amount, job.criteria, job.refresh_age, job.scrape_target)
+    output_path = hashtag_output_path(job.hashtag, job.output_format, job.output.compression)
+    rows = await _write_stream_async(stream, output_path, result_fields(), job, emit, index)
+    return _hashtag_output(stream, output_path, rows)
+
+
+def _source_output(outcome, job: Job, index: int, emit: Callable) -> dict:
+    """Output entry of one source, announced with ``source_done`` or ``source_error``."""
+    output_path = relation_output_path(outcome.username, job.relation, job.output_format, job.output.compression)
+    output = {
+        "source": outcome.username,
+        "output": str(output_path),
+        "rows": outcome.value if outcome.ok else outcome.stream.stats.kept,
+        "description": outcome.stream.description,
+        "report": str(report_path(output_path)),
+        "seconds": round(outcome.seconds, 2),
+        **_shard_output(output_path),
+        **_delta_output(outcome.stream, output_path),
+        **_target_output(outcome.stream),
+    }
+    if outcome.ok:
+        emit("source_done", job=index, **output)
+    else:
+        output["error"] = outcome.error
+        emit("source_error", job=index, **output)
+    return output
+
+
+def _run_profiles(service, job: Job, index: int, emit: Callable) -> List[dict]:
+    """Scrapes the sources of ``job`` in parallel; each one reports on its own.
+
+    A failed source is listed with its ``error`` (and whatever rows it kept)
+    without stopping the others.
+    """
+    append = job.resume or job.incremental
+    fieldnames = result_fields(extra_source=True)
+
+    def consume(username: str, stream) -> int:
+        output_path = relation_output_path(username, job.relation, job.output_format, job.output.compression)
+        return _write_stream(stream, output_path, fieldnames, job, emit, index, append=append, source=username)
+
+    outcomes = service.run_profile_relations(
+        job.usernames,
+        job.relation,
+        consume,
+        job.criteria,
+        resume=job.resume,
+        limit=job.limit,
+        incremental=job.incremental,
+        refresh_age=job.refresh_age,
+        target=job.scrape_target,
+    )
+    return [_source_output(outcome, job, index, emit) for outcome in outcomes]
+
+
+async def _run_profiles_async(service, job: Job, index: int, emit: Callable) -> List[dict]:
+    append = job.resume or job.incremental
+    fieldnames = result_fields(extra_source=True)
+
+    async def consume(username: str, stream) -> int:
+        output_path = relation_output_path(username, job.relation, job.output_format, job.output.compression)
+        return await _write_stream_async(
+            stream, output_path, fieldnames, job, emit, index, append=append, source=username
+        )
+
+    outcomes = service.run_profile_relations(
+        job.usernames,
+        job.relation,
+        consume,
+        job.criteria,
+        resume=job.resume,
+        limit=job.limit,
+        incremental=job.incremental,
+        refresh_age=job.refresh_age,
+        target=job.scrape_target,
+    )
+    return [_source_output(outcome, job, index, emit) async for outcome in outcomes]
+
+
+def _run_filter(job: Job) -> List[dict]:
+    metrics = RunMetrics(f"filtro:{job.path.name}")
+    with metrics.timed("read"):
+        frame = read_results(job.path)
+    filtered = apply_filters_frame(frame, job.criteria, metrics)
+    output_path = filtered_output_path(job.path)
+    output_format, compression = result_format(job.path)
+    fieldnames = result_fields(extra_source="source" in frame.columns)
+    with open_result_writer(output_path, fieldnames, output_format, metrics=metrics, compression=compression) as writer:
+        for row in frame_to_rows(filtered):
+            writer.write(row)
+    metrics.finish()
+    report = metrics.write_report(report_path(output_path), input=str(job.path), output=str(output_path))
+    description = f"{len(filtered)} de {len(frame)} filas"
+    return [{"output": str(output_path), "rows": len(filtered), "description": description, "report": str(report)}]
+
+
+def run_jobs(
+    service, jobs: List[Job], emitter: ProgressEmitter | None = None, engine: str = "threads"
+) -> int:
+    """Runs ``jobs`` back to back with one ``ScraperService`` and returns the exit code.
+
+    With ``engine="asyncio"`` the scrapes run on an ``AsyncScraperService``
+    wrapping ``service``, one event loop per job.
+    """
+    emitter = emitter or ProgressEmitter()
+    emit = emitter.emit
+    needs_login = any(job.type != "filter" for job in jobs)
+    if needs_login and not service.is_logged_in():
+        emit("error", error="No hay una sesión activa. Inicia sesión desde el menú interactivo primero.")
+        return EXIT_NOT_LOGGED_IN
+
+    if engine == "asyncio" and needs_login:
+        from async_scraper import AsyncScraperService
+
+        with AsyncScraperService(service) as async_service:
+            return _run_all(
+                jobs, emit, async_service=async_service, proxy_pool=service.proxy_pool, session_pool=service.session_pool
+            )
+    return _run_all(
+        jobs,
+        emit,
+        service=service,
+        proxy_pool=getattr(service, "proxy_pool", None),
+        session_pool=getattr(service, "session_pool", None),
+    )
+
+
+def _run_all(
+    jobs: List[Job], emit: Callable, service=None, async_service=None, proxy_pool=None, session_pool=None
+) -> int:
+    failed = 0
+    for index, job in enumerate(jobs, start=1):
+        emit("job_start", job=index, type=job.type, target=job.target)
+        started = time.monotonic()
+        try:
+            if job.type == "filter":
+                outputs = _run_filter(job)
+            elif async_service is not None:
+                import asyncio  # solo con el motor asyncio; no pesa en el arranque del CLI
+
+                runner = _run_hashtag_async if job.type == "hashtag" else _run_profiles_async
+                outputs = asyncio.run(runner(async_service, job, index, emit))
+            elif job.type == "hashtag":
+                outputs = _run_hashtag(service, job, index, emit)
+            else:
+                outputs = _run_profiles(service, job, index, emit)
+        except Exception as exc:
+            failed += 1
+            emit("job_error", job=index, type=job.type, target=job.target, error=str(exc))
+            continue
+        errors = [output for output in outputs if output.get("error")]
+        if errors:
+            failed += 1
+            emit(
+                "job_error",
+                job=index,
+                type=job.type,
+                target=job.target,
+                error=f"{len(errors)} de {len(outputs)} perfiles fallaron.",
+                outputs=outputs,
+            )
+            continue
+        emit("job_done", job=index, type=job.type, seconds=round(time.monotonic() - started, 2), outputs=outputs)
+
+    exit_code = EXIT_JOB_FAILED if failed else EXIT_OK
+    extra = {}
+    if session_pool is not None:
+        extra["accounts"] = session_pool.report()
+    if proxy_pool is not None:
+        extra["proxies"] = proxy_pool.report()
+    emit("summary", jobs=len(jobs), failed=failed, exit_code=exit_code, **extra)
+    return exit_code
@@ -0,0 +1,660 @@
+#!/usr/bin/env python3
+"""Micro-benchmarks for the scraper pipeline.
+
+Uso: python benchmarks.py filters --rows 1000000
+     python benchmarks.py rows --rows 1000000
+     python benchmarks.py parse --profiles 5000
+     python benchmarks.py startup --repeat 5
+     python benchmarks.py pipeline --users 20000 --latency 20 --workers 4
+     python benchmarks.py proxies --requests 2000 --workers 4
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from functools import partial
+from pathlib import Path
+from typing import Callable, Dict, List, Mapping
+
+from expressions import parse_expression
+from filters import FilterCriteria, apply_filters, apply_filters_frame
+
+
+def _timed(func: Callable[[], object]) -> tuple[float, object]:
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def synthetic_rows(count: int, seed: int = 1234, row_type: Callable[..., Mapping] = dict) -> List[Mapping]:
+    """``count`` profile rows built with ``row_type`` (``dict`` or ``records.UserRow``)."""
+    rng = random.Random(seed)
+    rows: List[Mapping] = []
+    for index in range(count):
+        private = rng.random() < 0.3
+        rows.append(
+            row_type(
+                username=f"user_{index}",
+                full_name=f"User {index}",
+                followers=None if private and rng.random() < 0.5 else int(rng.paretovariate(1.2) * 100),
+                following=rng.randint(0, 5000),
+                media_count=None if private else rng.randint(0, 800),
+                is_private=private,
+                is_verified=rng.random() < 0.02,
+                has_highlight_reels=rng.random() < 0.4,
+            )
+        )
+    return rows
+
+
+def bench_filters(args: argparse.Namespace) -> None:
+    import pandas as pd
+
+    from utils import frame_to_rows
+
+    rows = synthetic_rows(args.rows)
+    frame = pd.DataFrame(rows).convert_dtypes()
+    criteria_sets = {
+        "seguidores 1k-50k": FilterCriteria(min_followers=1_000, max_followers=50_000),
+        "públicas con 10+ posts": FilterCriteria(min_posts=10, require_public=True),
+        "verificadas con destacadas": FilterCriteria(require_verified=True, require_highlights=True),
+        "expresión con OR y regex": FilterCriteria(
+            expression="(followers between 1k and 50k or is_verified) and following < 2k and username ~ /7$/"
+        ),
+    }
+    print(f"Filas sintéticas: {args.rows:,}")
+    to_rows_time, _ = _timed(lambda: frame_to_rows(frame))
+    print(f"Conversión DataFrame -> dicts (necesaria para el filtro por filas): {to_rows_time:.3f} s")
+    for label, criteria in criteria_sets.items():
+        row_time, row_result = _timed(lambda: apply_filters(rows, criteria))
+        frame_time, frame_result = _timed(lambda: apply_filters_frame(frame, criteria))
+        # Los mismos criterios escritos como expresión deben elegir las mismas filas.
+        expression = parse_expression(criteria.to_expression())
+        expression_time, expression_result = _timed(lambda: [row for row in rows if expression(row)])
+        same = frame_to_rows(frame_result) == row_result == expression_result
+        print(
+            f"{label:<28} filas: {row_time:7.3f} s  expresión: {expression_time:7.3f} s  "
+            f"vectorizado: {frame_time:7.3f} s  x{row_time / frame_time if frame_time else float('inf'):5.1f}  "
+            f"coincidencias: {len(row_result):,}  {'OK' if same else 'DIFERENTE'}"
+        )
+
+
+def bench_rows(args: argparse.Namespace) -> None:
+    """Memory and speed of dict rows against ``UserRow`` through filter and CSV write."""
+    from records import UserRow
+    from utils import open_result_writer, result_fields
+
+    criteria = FilterCriteria(min_followers=1_000, require_public=True)
+    runs = []
+    for label, row_type in (("dict", dict), ("UserRow", UserRow)):
+        tracemalloc.start()
+        rows = synthetic_rows(args.rows, row_type=row_type)
+        retained = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del rows
+        build_time, rows = _timed(lambda: synthetic_rows(args.rows, row_type=row_type))
+        filter_time, kept = _timed(lambda: apply_filters(rows, criteria))
+        with tempfile.TemporaryDirectory() as directory:
+
+            def write() -> None:
+                with open_result_writer(Path(directory) / "rows.csv", result_fields(), "csv") as writer:
+                    for row in rows:
+                        writer.write(row)
+
+            write_time, _ = _timed(write)
+        runs.append(
+            {
+                "rows": label,
+                "mb": round(retained / 2**20, 1),
+                "bytes_per_row": round(retained / args.rows),
+                "build_s": round(build_time, 3),
+                "filter_s": round(filter_time, 3),
+                "write_s": round(write_time, 3),
+                "kept": len(kept),
+            }
+        )
+        del rows, kept
+
+    if args.json:
+        print(json.dumps(runs, ensure_ascii=False))
+        return
+    print(f"Filas sintéticas: {args.rows:,} (memoria retenida por la lista, incluidos los valores)")
+    for run in runs:
+        print(
+            f"{run['rows']:<8} {run['mb']:8.1f} MB  {run['bytes_per_row']:5d} B/fila  "
+            f"creación: {run['build_s']:6.2f} s  filtro: {run['filter_s']:6.2f} s  CSV: {run['write_s']:6.2f} s"
+        )
+
+
+def _load_payloads(args: argparse.Namespace) -> List[str]:
+    """``users/{pk}/info/`` responses as JSON text: recorded ones (``--payloads``) or synthetic."""
+    if args.payloads is not None:
+        lines = [line for line in args.payloads.read_text(encoding="utf-8").splitlines() if line.strip()]
+        # Se aceptan respuestas completas ({"user": {...}}) o solo el objeto del usuario.
+        return [line if '"user"' in line[:20] else json.dumps({"user": json.loads(line)}) for line in lines]
+    from fake_client import SyntheticDataset
+
+    dataset = SyntheticDataset(users=args.profiles)
+    return [json.dumps(dataset.user_json(pk)) for pk in range(1, args.profiles + 1)]
+
+
+def bench_parse(args: argparse.Namespace) -> None:
+    """CPU per profile: instagrapi's pydantic ``User`` against ``row_from_user_json``."""
+    from copy import deepcopy
+
+    from records import row_from_user_json
+    from scraper import ScraperService
+    from instagrapi.extractors import extract_user_v1
+
+    payloads = _load_payloads(args)
+    serialize = partial(ScraperService._serialize_user, None)
+
+    def decode() -> None:
+        for text in payloads:
+            json.loads(text)
+
+    def model() -> list:
+        # Lo que hace Client.user_info: validar el User, copiarlo desde su caché y reducirlo a la fila.
+        return [serialize(deepcopy(extract_user_v1(json.loads(text)["user"]))) for text in payloads]
+
+    def raw() -> list:
+        return [row_from_user_json(json.loads(text)["user"]) for text in payloads]
+
+    timings = {}
+    results = {}
+    for label, func in (("json", decode), ("modelo", model), ("crudo", raw)):
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = time.process_time()
+            results[label] = func()
+            best = min(best, time.process_time() - start)
+        timings[label] = best / len(payloads)
+    # El modelo User de instagrapi no tiene has_highlight_reels: por esa vía el campo siempre sale False.
+    differing = sorted(
+        {
+            name
+            for model_row, raw_row in zip(results["modelo"], results["crudo"])
+            for name in model_row
+            if model_row[name] != raw_row[name]
+        }
+    )
+    report = {
+        "profiles": len(payloads),
+        "payload_bytes": round(statistics.mean(len(text) for text in payloads)),
+        "us_per_profile": {label: round(seconds * 1e6, 1) for label, seconds in timings.items()},
+        "profiles_per_cpu_s": {label: round(1 / seconds) for label, seconds in timings.items() if seconds},
+        "speedup": round(timings["modelo"] / timings["crudo"], 1) if timings["crudo"] else None,
+        "differing_fields": differing,
+    }
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False))
+        return
+    print(f"Respuestas: {report['profiles']:,} ({report['payload_bytes']:,} bytes de media) · mejor de {args.repeat}")
+    for label in timings:
+        print(
+            f"{label:<8} {report['us_per_profile'][label]:8.1f} µs CPU/perfil  "
+            f"{report['profiles_per_cpu_s'].get(label, 0):9,} perfiles/s por núcleo"
+        )
+    print(f"Modelo / crudo: x{report['speedup']}")
+    if differing:
+        print(f"Campos que difieren (el modelo no los conserva): {', '.join(differing)}")
+    else:
+        print("Filas idénticas por ambas vías.")
+
+
+PROJECT_ROOT = Path(__file__).resolve().parent
+STARTUP_MODULES = ("cli", "interactive", "scraper")
+
+
+def import_profile(module: str) -> tuple[float, Dict[str, float]]:
+    """Import time of ``module`` in ms and of each of its direct imports, via ``-X importtime``."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        cwd=PROJECT_ROOT,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"No se pudo importar {module}: {result.stderr.strip().splitlines()[-1]}")
+    children: Dict[str, float] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        # -X importtime lista cada módulo después de sus dependencias.
+        if depth == 1:
+            children[name.strip()] = int(cumulative) / 1000
+        elif depth == 0:
+            if name.strip() == module:
+                return int(cumulative) / 1000, children
+            children = {}
+    raise RuntimeError(f"{module} ya estaba importado al iniciar el intérprete.")
+
+
+def bench_startup(args: argparse.Namespace) -> None:
+    report: Dict[str, object] = {}
+    help_times = []
+    for _ in range(args.repeat):
+        elapsed, _ = _timed(
+            lambda: subprocess.run([sys.executable, "cli.py", "--help"], cwd=PROJECT_ROOT, capture_output=True, check=True)
+        )
+        help_times.append(elapsed * 1000)
+    report["cli --help (ms, mediana)"] = round(statistics.median(help_times), 1)
+
+    for module in args.modules:
+        try:
+            total, children = import_profile(module)
+        except RuntimeError as exc:
+            report[module] = {"error": str(exc)}
+            continue
+        heaviest = sorted(children.items(), key=lambda item: item[1], reverse=True)[: args.top]
+        report[module] = {
+            "total_ms": round(total, 1),
+            "heaviest": {name: round(ms, 1) for name, ms in heaviest},
+        }
+
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False))
+        return
+    print(f"cli.py --help: {report['cli --help (ms, mediana)']:.1f} ms (mediana de {args.repeat})")
+    for module in args.modules:
+        entry = report[module]
+        if "error" in entry:
+            print(f"import {module}: {entry['error']}")
+            continue
+        print(f"import {module}: {entry['total_ms']:.1f} ms")
+        for name, ms in entry["heaviest"].items():
+            print(f"    {name:<32} {ms:8.1f} ms")
+
+
+PIPELINE_SCENARIOS = ("hashtag", "relations")
+
+
+def _pipeline_service(directory: Path, client, args: argparse.Namespace):
+    from cache import ProfileCache
+    from checkpoint import CheckpointJournal
+    from pacing import AdaptivePacer, TokenBucket
+    from scraper import ScraperService
+    from seen import SeenIndex
+    from store import ResultStore
+
+    pacer = AdaptivePacer(
+        TokenBucket(args.rate),
+        max_rate=args.rate * 2,
+        base_backoff=args.backoff,
+        max_backoff=args.backoff * 8,
+    )
+    service = ScraperService(
+        directory / "session.json",
+        profile_cache=ProfileCache(directory / "profiles.json"),
+        checkpoints=CheckpointJournal(directory / "checkpoints.jsonl"),
+        workers=args.workers,
+        pacer=pacer,
+        client_factory=lambda base: base.clone(),
+        result_store=ResultStore(directory / "store.sqlite3"),
+        seen_index=SeenIndex(directory / "seen.bin"),
+        raw_profiles=args.raw_profiles,
+    )
+    service.client = client
+    service.mark_authenticated(client.username)
+    return service
+
+
+def _pipeline_streams(service, scenario: str, args: argparse.Namespace):
+    if scenario == "hashtag":
+        yield service.stream_hashtag("benchmark", args.amount)
+    else:
+        sources = [f"user_{index}" for index in range(1, args.sources + 1)]
+        for _, stream in service.stream_profile_relations(sources, "followers"):
+            yield stream
+
+
+def _drain(service, scenario: str, args: argparse.Namespace) -> tuple[int, int]:
+    found = kept = 0
+    for stream in _pipeline_streams(service, scenario, args):
+        for _ in stream:
+            pass
+        found += stream.stats.found
+        kept += stream.stats.kept
+    return found, kept
+
+
+async def _drain_async(service, scenario: str, args: argparse.Namespace) -> tuple[int, int]:
+    from async_scraper import AsyncScraperService
+
+    found = kept = 0
+    with AsyncScraperService(service) as async_service:
+        for stream in _pipeline_streams(async_service, scenario, args):
+            async for _ in stream:
+                pass
+            found += stream.stats.found
+            kept += stream.stats.kept
+    return found, kept
+
+
+def _run_pipeline(scenario: str, args: argparse.Namespace, max_rps: float | None, memory: bool) -> dict:
+    from fake_client import FakeClient, FaultPlan, SyntheticDataset
+
+    dataset = SyntheticDataset(users=args.users, relation_size=args.amount)
+    faults = FaultPlan(private=args.private, not_found=args.not_found, max_rps=max_rps)
+    client = FakeClient(dataset, latency=(args.latency / 2000, args.latency * 1.5 / 1000), faults=faults)
+    with tempfile.TemporaryDirectory() as directory:
+        service = _pipeline_service(Path(directory), client, args)
+        if memory:
+            tracemalloc.start()
+        started_at = time.time()
+        start = time.perf_counter()
+        found = kept = 0
+        error = None
+        try:
+            if args.engine == "asyncio":
+                found, kept = asyncio.run(_drain_async(service, scenario, args))
+            else:
+                found, kept = _drain(service, scenario, args)
+        except RuntimeError as exc:
+            error = str(exc)
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] if memory else None
+        if memory:
+            tracemalloc.stop()
+        service.result_store.close()
+    history = service.pacer.history
+    requests = sum(client.calls.values())
+    return {
+        "scenario": scenario,
+        "seconds": round(elapsed, 2),
+        "found": found,
+        "kept": kept,
+        "rows_per_s": round(found / elapsed, 1) if elapsed else 0.0,
+        "requests": requests,
+        "requests_per_s": round(requests / elapsed, 2) if elapsed else 0.0,
+        "throttles": len(history),
+        "backoff_s": round(sum(event.delay for event in history), 2),
+        # Tiempo desde la última pausa hasta el final: cuánto se sostuvo el ritmo recuperado.
+        "recovered_s": round(elapsed - (history[-1].timestamp - started_at), 2) if history else None,
+        "final_rate": round(service.pacer.current_rate, 2),
+        "peak_mb": round(peak / 2**20, 1) if peak is not None else None,
+        "error": error,
+    }
+
+
+def bench_pipeline(args: argparse.Namespace) -> None:
+    scenarios = args.scenarios or list(PIPELINE_SCENARIOS)
+    unknown = sorted(set(scenarios) - set(PIPELINE_SCENARIOS))
+    if unknown:
+        raise SystemExit(f"Escenarios desconocidos: {', '.join(unknown)}")
+    runs = []
+    for scenario in scenarios:
+        for label, max_rps in (("", None), ("+ rate limit", args.rate / 2)):
+            if label and not args.rate_limit:
+                continue
+            result = _run_pipeline(scenario, args, max_rps, memory=False)
+            if args.memory:
+                result["peak_mb"] = _run_pipeline(scenario, args, max_rps, memory=True)["peak_mb"]
+            result["scenario"] = f"{scenario} {label}".strip()
+            runs.append(result)
+
+    if args.json:
+        print(json.dumps(runs, ensure_ascii=False))
+        return
+    print(
+        f"Usuarios sintéticos: {args.users:,} · latencia ~{args.latency:g} ms · "
+        f"workers: {args.workers} · ritmo inicial: {args.rate:g}/s · motor: {args.engine}"
+    )
+    for run in runs:
+        line = (
+            f"{run['scenario']:<24} {run['seconds']:7.2f} s  {run['rows_per_s']:8.1f} filas/s  "
+            f"{run['requests_per_s']:7.1f} sol/s  pausas: {run['throttles']} ({run['backoff_s']:.1f} s)"
+        )
+        if run["peak_mb"] is not None:
+            line += f"  pico: {run['peak_mb']:.1f} MB"
+        if run["throttles"]:
+            line += f"  ritmo final: {run['final_rate']:.2f}/s"
+        if run["error"]:
+            line += f"  ERROR: {run['error']}"
+        print(line)
+
+
+def _run_target(scenario: str, args: argparse.Namespace, target) -> dict:
+    from fake_client import FakeClient, SyntheticDataset
+    from filters import FilterCriteria
+
+    client = FakeClient(SyntheticDataset(users=args.users, relation_size=args.amount))
+    criteria = FilterCriteria(min_followers=args.min_followers)
+    with tempfile.TemporaryDirectory() as directory:
+        service = _pipeline_service(Path(directory), client, args)
+        start = time.perf_counter()
+        if scenario == "hashtag":
+            stream = service.stream_hashtag("benchmark", args.amount, criteria, target=target)
+        else:
+            _, stream = next(iter(service.stream_profile_relations(["user_1"], "followers", criteria, target=target)))
+        for _ in stream:
+            pass
+        elapsed = time.perf_counter() - start
+        service.result_store.close()
+    stats = stream.stats
+    return {
+        "scenario": scenario,
+        "mode": "objetivo" if target is not None else "completo",
+        "seconds": round(elapsed, 2),
+        "kept": stats.kept,
+        "requests": sum(client.calls.values()),
+        "profile_requests": client.calls.get("user_info", 0),
+        "skipped": stats.skipped,
+        "saved_requests": stats.saved_requests,
+    }
+
+
+def bench_target(args: argparse.Namespace) -> None:
+    from targeting import ScrapeTarget
+
+    target = ScrapeTarget(matches=args.target, requests=args.max_requests)
+    runs = []
+    for scenario in PIPELINE_SCENARIOS:
+        runs.append(_run_target(scenario, args, None))
+        runs.append(_run_target(scenario, args, target))
+    if args.json:
+        print(json.dumps(runs, ensure_ascii=False))
+        return
+    print(f"Usuarios sintéticos: {args.users:,} · mínimo de seguidores: {args.min_followers} · {target.describe()}")
+    for run in runs:
+        line = (
+            f"{run['scenario']:<10} {run['mode']:<9} {run['kept']:5} coincidencias  "
+            f"{run['requests']:6} solicitudes ({run['profile_requests']} perfiles)  {run['seconds']:6.2f} s"
+        )
+        if run["skipped"]:
+            line += f"  sin consultar: {run['skipped']} (~{run['saved_requests']} solicitudes ahorradas)"
+        print(line)
+
+
+def _free_port() -> int:
+    import socket
+
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def bench_proxies(args: argparse.Namespace) -> None:
+    """Requests through ``ProxyPool`` against local stand-in proxies: one fast, one slow, one flaky, one down."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    from fake_client import HttpStandInClient, StandInProxy, SyntheticDataset
+    from proxies import ProxyPool
+    from scraper import user_info_raw
+
+    dataset = SyntheticDataset(users=args.requests)
+    servers = {
+        "rápido": StandInProxy(dataset, latency=args.latency / 1000),
+        "lento": StandInProxy(dataset, latency=args.latency * 6 / 1000),
+        "inestable": StandInProxy(dataset, latency=args.latency / 1000, failure=args.failure, seed=7),
+    }
+    dead = f"http://127.0.0.1:{_free_port()}"
+    labels = {server.url: name for name, server in servers.items()}
+    labels[dead] = "caído"
+    for server in servers.values():
+        server.__enter__()
+    pool = ProxyPool(list(labels), breaker_cooldown=args.cooldown, min_requests=args.min_requests, seed=1)
+    clients = [HttpStandInClient() for _ in range(args.workers)]
+    failures = 0
+
+    def worker(index: int) -> int:
+        client = clients[index]
+        errors = 0
+        for pk in range(index + 1, args.requests + 1, args.workers):
+            try:
+                pool.call(client, user_info_raw, client, pk)
+            except Exception:
+                errors += 1
+        return errors
+
+    start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=args.workers) as executor:
+            failures = sum(executor.map(worker, range(args.workers)))
+    finally:
+        elapsed = time.perf_counter() - start
+        for client in clients:
+            client.close()
+        for server in servers.values():
+            server.__exit__(None, None, None)
+    proxies = []
+    for row in pool.report():
+        url = next(url for url in labels if url.endswith(row["proxy"].split("://", 1)[1]))
+        server = servers.get(labels[url])
+        proxies.append(
+            {
+                "name": labels[url],
+                **row,
+                "connections": server.connections if server else 0,
+                "requests_per_connection": round(server.requests / server.connections, 1)
+                if server and server.connections
+                else None,
+            }
+        )
+    report = {
+        "requests": args.requests,
+        "workers": args.workers,
+        "seconds": round(elapsed, 2),
+        "requests_per_s": round(args.requests / elapsed, 1) if elapsed else 0.0,
+        "failed": failures,
+        "proxies": proxies,
+    }
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False))
+        return
+    print(
+        f"Solicitudes: {args.requests:,} · workers: {args.workers} · {report['seconds']:.2f} s "
+        f"({report['requests_per_s']:.1f} sol/s) · fallidas: {failures}"
+    )
+    for proxy in proxies:
+        latency = f"{proxy['latency_ms']:.1f} ms" if proxy["latency_ms"] is not None else "-"
+        reuse = f"{proxy['requests_per_connection']:.1f}" if proxy["requests_per_connection"] else "-"
+        print(
+            f"{proxy['name']:<10} {proxy['requests']:6,} sol  {proxy['errors']:4} errores  latencia: {latency:>9}  "
+            f"conexiones: {proxy['connections']:4} (x{reuse} sol/conexión)  aperturas: {proxy['trips']}  {proxy['status']}"
+        )
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Benchmarks del Instagram Scraper CLI.")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    filters_parser = subparsers.add_parser("filters", help="apply_filters por filas frente a la versión vectorizada.")
+    filters_parser.add_argument("--rows", type=int, default=1_000_000)
+    filters_parser.set_defaults(func=bench_filters)
+
+    rows_parser = subparsers.add_parser("rows", help="Memoria y velocidad de filas dict frente a UserRow.")
+    rows_parser.add_argument("--rows", type=int, default=1_000_000)
+    rows_parser.add_argument("--json", action="store_true", help="Emitir el resultado como JSON.")
+    rows_parser.set_defaults(func=bench_rows)
+
+    parse_parser = subparsers.add_parser(
+        "parse", help="CPU por perfil: modelo pydantic de instagrapi frente a lectura del JSON crudo."
+    )
+    parse_parser.add_argument("--profiles", type=int, default=5_000, help="Respuestas sintéticas a generar.")
+    parse_parser.add_argument(
+        "--payloads", type=Path, help="Archivo JSON por línea con respuestas grabadas de users/{pk}/info/."
+    )
+    parse_parser.add_argument("--repeat", type=int, default=3)
+    parse_parser.add_argument("--json", action="store_true", help="Emitir el resultado como JSON.")
+    parse_parser.set_defaults(func=bench_parse)
+
+    startup_parser = subparsers.add_parser("startup", help="Tiempo de arranque e importación (-X importtime).")
+    startup_parser.add_argument("--repeat", type=int, default=5, help="Ejecuciones de cli.py --help.")
+    startup_parser.add_argument("--top", type=int, default=5, help="Importaciones más costosas a mostrar.")
+    startup_parser.add_argument("--json", action="store_true", help="Emitir el resultado como JSON.")
+    startup_parser.add_argument("modules", nargs="*", default=list(STARTUP_MODULES))
+    startup_parser.set_defaults(func=bench_startup)
+
+    pipeline_parser = subparsers.add_parser(
+        "pipeline", help="Scraping completo contra el cliente falso (filas/s, memoria, recuperación de rate limits)."
+    )
+    pipeline_parser.add_argument(
+        "scenarios", nargs="*", help=f"Escenarios a ejecutar ({', '.join(PIPELINE_SCENARIOS)}; por defecto todos)."
+    )
+    pipeline_parser.add_argument("--users", type=int, default=20_000, help="Tamaño del conjunto sintético.")
+    pipeline_parser.add_argument("--amount", type=int, default=500, help="Publicaciones del hashtag / cuentas por relación.")
+    pipeline_parser.add_argument("--sources", type=int, default=2, help="Perfiles de origen en el escenario de relaciones.")
+    pipeline_parser.add_argument("--latency", type=float, default=20.0, help="Latencia media por solicitud (ms).")
+    pipeline_parser.add_argument("--workers", type=int, default=4)
+    pipeline_parser.add_argument("--engine", choices=("threads", "asyncio"), default="threads", help="Motor de scraping.")
+    pipeline_parser.add_argument("--rate", type=float, default=100.0, help="Solicitudes por segundo iniciales.")
+    pipeline_parser.add_argument("--backoff", type=float, default=0.5, help="Pausa base tras un rate limit (s).")
+    pipeline_parser.add_argument("--private", type=float, default=0.05, help="Proporción de PrivateError en user_info.")
+    pipeline_parser.add_argument("--not-found", type=float, default=0.01, help="Proporción de UserNotFound en user_info.")
+    pipeline_parser.add_argument(
+        "--no-rate-limit", dest="rate_limit", action="store_false", help="Omitir la variante con límite del servidor."
+    )
+    pipeline_parser.add_argument(
+        "--raw-profiles", action="store_true", help="Enriquecer desde el JSON crudo en lugar del modelo de instagrapi."
+    )
+    pipeline_parser.add_argument("--memory", action="store_true", help="Medir el pico de memoria (ejecución extra).")
+    pipeline_parser.add_argument("--json", action="store_true", help="Emitir el resultado como JSON.")
+    pipeline_parser.set_defaults(func=bench_pipeline)
+
+    target_parser = subparsers.add_parser(
+        "target", help="Scraping con objetivo (--target/--max-requests) frente al scraping completo."
+    )
+    target_parser.add_argument("--users", type=int, default=20_000, help="Tamaño del conjunto sintético.")
+    target_parser.add_argument("--amount", type=int, default=1_000, help="Publicaciones del hashtag / cuentas por relación.")
+    target_parser.add_argument("--min-followers", type=int, default=1_000, help="Filtro a cumplir.")
+    target_parser.add_argument("--target", type=int, default=50, help="Coincidencias a conseguir.")
+    target_parser.add_argument("--max-requests", type=int, help="Máximo de solicitudes.")
+    target_parser.add_argument("--workers", type=int, default=4)
+    target_parser.add_argument("--rate", type=float, default=10_000.0, help="Solicitudes por segundo.")
+    target_parser.add_argument("--backoff", type=float, default=0.5, help="Pausa base tras un rate limit (s).")
+    target_parser.add_argument("--raw-profiles", action="store_true", help="Enriquecer desde el JSON crudo.")
+    target_parser.add_argument("--json", action="store_true", help="Emitir el resultado como JSON.")
+    target_parser.set_defaults(func=bench_target)
+
+    proxies_parser = subparsers.add_parser(
+        "proxies", help="Pool de proxies contra proxies HTTP locales (reparto, keep-alive, circuitos)."
+    )
+    proxies_parser.add_argument("--requests", type=int, default=2_000)
+    proxies_parser.add_argument("--workers", type=int, default=4)
+    proxies_parser.add_argument("--latency", type=float, default=5.0, help="Latencia del proxy rápido (ms).")
+    proxies_parser.add_argument("--failure", type=float, default=0.3, help="Proporción de cortes del proxy inestable.")
+    proxies_parser.add_argument("--cooldown", type=float, default=1.0, help="Pausa al abrir un circuito (s).")
+    proxies_parser.add_argument("--min-requests", type=int, default=20, help="Solicitudes antes de poder descartar un proxy.")
+    proxies_parser.add_argument("--json", action="store_true", help="Emitir el resultado como JSON.")
+    proxies_parser.set_defaults(func=bench_proxies)
+    return parser
+
+
+def main() -> None:
+    args = build_parser().parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
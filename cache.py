@@ -0,0 +1,107 @@
+"""On-disk cache of enriched Instagram profiles keyed by user pk."""
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = 7 * 24 * 3600.0
+DEFAULT_MAX_ENTRIES = 50_000
+
+
+class ProfileCache:
+    """LRU cache of serialized profiles with TTL-based freshness.
+
+    Entries live in memory while the CLI runs and are persisted as JSON with
+    ``save()``. When the cache grows past ``max_entries`` the least recently
+    used profiles are evicted first. Safe to share between threads.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        ttl: float = DEFAULT_TTL,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ) -> None:
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, dict] | None = None
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Persistencia
+    # ------------------------------------------------------------------
+    def _load(self) -> OrderedDict[str, dict]:
+        if self._entries is not None:
+            return self._entries
+        entries: OrderedDict[str, dict] = OrderedDict()
+        if self.path.exists():
+            try:
+                raw = json.loads(self.path.read_text(encoding="utf-8"))
+            except (OSError, json.JSONDecodeError) as exc:
+                logger.warning("La caché de perfiles está dañada y se ignorará: %s", exc)
+            else:
+                for pk, entry in raw.get("entries", []):
+                    if isinstance(entry, dict) and "row" in entry:
+                        entries[str(pk)] = entry
+        self._entries = entries
+        return entries
+
+    def save(self) -> None:
+        with self._lock:
+            if self._entries is None or not self._dirty:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            payload = {"entries": list(self._entries.items())}
+            tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+            tmp_path.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+            tmp_path.replace(self.path)
+            self._dirty = False
+
+    # ------------------------------------------------------------------
+    # Acceso
+    # ------------------------------------------------------------------
+    def get(self, pk: object, max_age: float | None = None) -> dict | None:
+        """Cached row for ``pk``; ``max_age`` tightens the TTL for this lookup."""
+        key = str(pk)
+        ttl = self.ttl if max_age is None else min(self.ttl, max_age)
+        with self._lock:
+            entries = self._load()
+            entry = entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            age = time.time() - entry.get("fetched_at", 0)
+            if age > ttl:
+                if age > self.ttl:
+                    del entries[key]
+                    self._dirty = True
+                self.misses += 1
+                return None
+            entries.move_to_end(key)
+            self.hits += 1
+            return dict(entry["row"])
+
+    def put(self, pk: object, row: dict) -> None:
+        key = str(pk)
+        entry = {"fetched_at": time.time(), "row": dict(row)}
+        with self._lock:
+            entries = self._load()
+            entries[key] = entry
+            entries.move_to_end(key)
+            while len(entries) > self.max_entries:
+                entries.popitem(last=False)
+            self._dirty = True
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._load())
@@ -0,0 +1,163 @@
+"""Append-only checkpoint journal for resumable relation scrapes."""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+Key = Tuple[str, str]
+
+
+class _Progress:
+    __slots__ = ("processed", "complete", "cursor")
+
+    def __init__(self) -> None:
+        self.processed: Set[str] = set()
+        self.complete = False
+        self.cursor: str | None = None
+
+
+class CheckpointJournal:
+    """Records which pks were processed for every (source username, relation).
+
+    Each event is appended as one JSON line. Processed pks are buffered and
+    written every ``fsync_every`` events (other events right away); before
+    each ``sync`` the registered sync hooks run, so the output files reach
+    the disk before the journal says their rows are done. An interrupted run
+    loses at most the pks since the last sync, which are scraped again on
+    resume. Replaying the file rebuilds the progress of every source;
+    ``reset`` starts a source from scratch without rewriting the journal.
+    Besides the pks, the journal keeps the pagination cursor of
+    the first page not fully processed yet, so a resumed scrape skips the
+    pages it already went through. Sources scraped concurrently can share
+    one journal.
+    """
+
+    def __init__(self, path: Path, fsync_every: int = 100) -> None:
+        self.path = path
+        self.fsync_every = max(1, fsync_every)
+        self._progress: Dict[Key, _Progress] | None = None
+        self._file = None
+        # Líneas aún no escritas: solo llegan al archivo en ``sync``, después de los hooks.
+        self._pending: List[str] = []
+        self._sync_hooks: List[Callable[[], None]] = []
+        self._lock = threading.RLock()
+
+    # ------------------------------------------------------------------
+    # Lectura
+    # ------------------------------------------------------------------
+    def _load(self) -> Dict[Key, _Progress]:
+        with self._lock:
+            if self._progress is None:
+                self._progress = self._replay()
+            return self._progress
+
+    def _replay(self) -> Dict[Key, _Progress]:
+        progress: Dict[Key, _Progress] = {}
+        if self.path.exists():
+            with self.path.open(encoding="utf-8") as file:
+                for line_number, line in enumerate(file, start=1):
+                    try:
+                        event = json.loads(line)
+                        key = (event["source"], event["relation"])
+                        kind = event["event"]
+                    except (json.JSONDecodeError, KeyError, TypeError):
+                        logger.warning("Línea %s del checkpoint dañada; se ignorará.", line_number)
+                        continue
+                    self._apply(progress, key, kind, event)
+        return progress
+
+    @staticmethod
+    def _apply(progress: Dict[Key, _Progress], key: Key, kind: str, event: dict) -> None:
+        if kind == "reset":
+            progress[key] = _Progress()
+            return
+        entry = progress.setdefault(key, _Progress())
+        if kind == "pk":
+            entry.processed.add(str(event.get("pk")))
+        elif kind == "cursor":
+            entry.cursor = event.get("cursor") or None
+        elif kind == "done":
+            entry.complete = True
+            entry.cursor = None
+
+    def processed(self, source: str, relation: str) -> Set[str]:
+        with self._lock:
+            entry = self._load().get((source, relation))
+            return set(entry.processed) if entry else set()
+
+    def is_complete(self, source: str, relation: str) -> bool:
+        entry = self._load().get((source, relation))
+        return bool(entry and entry.complete)
+
+    def cursor(self, source: str, relation: str) -> str | None:
+        """Cursor to resume the pagination of ``source`` from, if any."""
+        entry = self._load().get((source, relation))
+        return entry.cursor if entry else None
+
+    def has_progress(self, source: str, relation: str) -> bool:
+        entry = self._load().get((source, relation))
+        return bool(entry and (entry.processed or entry.complete))
+
+    # ------------------------------------------------------------------
+    # Escritura
+    # ------------------------------------------------------------------
+    def _append(self, source: str, relation: str, kind: str, **fields: object) -> None:
+        event = {"source": source, "relation": relation, "event": kind, "ts": round(time.time(), 3), **fields}
+        line = json.dumps(event, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._apply(self._load(), (source, relation), kind, event)
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = self.path.open("a", encoding="utf-8")
+            self._pending.append(line)
+            if kind != "pk" or len(self._pending) >= self.fsync_every:
+                self.sync()
+
+    def record(self, source: str, relation: str, pk: object) -> None:
+        self._append(source, relation, "pk", pk=str(pk))
+
+    def record_cursor(self, source: str, relation: str, cursor: str | None) -> None:
+        self._append(source, relation, "cursor", cursor=cursor or "")
+
+    def mark_complete(self, source: str, relation: str) -> None:
+        self._append(source, relation, "done")
+
+    def reset(self, source: str, relation: str) -> None:
+        with self._lock:
+            if self.has_progress(source, relation):
+                self._append(source, relation, "reset")
+
+    def add_sync_hook(self, hook: Callable[[], None]) -> None:
+        """Runs ``hook`` (e.g. ``ResultWriter.sync``) before every journal sync."""
+        with self._lock:
+            self._sync_hooks.append(hook)
+
+    def remove_sync_hook(self, hook: Callable[[], None]) -> None:
+        with self._lock:
+            if hook in self._sync_hooks:
+                self._sync_hooks.remove(hook)
+
+    def sync(self) -> None:
+        with self._lock:
+            if self._file is None or not self._pending:
+                return
+            for hook in list(self._sync_hooks):
+                hook()
+            self._file.write("".join(self._pending))
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._pending.clear()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self.sync()
+                self._file.close()
+                self._file = None
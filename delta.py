@@ -0,0 +1,111 @@
+"""Differences between a scrape and the previous snapshot of the same source."""
+from __future__ import annotations
+
+import json
+import time
+from pathlib import Path
+from typing import Dict, List, Mapping
+
+
+class SnapshotDelta:
+    """Tracks what changed for one source since its last stored scrape.
+
+    ``previous`` maps every pk of the last complete scrape of ``source`` /
+    ``relation`` to its stored ``username`` and ``followers``. While the new
+    scrape runs, ``listed`` receives every account in the current list and
+    ``observe`` every row produced for it, whether refreshed or reused.
+    Accounts missing from the new list are only reported as removed when
+    the list was read ``complete`` (no ``--limit`` cut, no error).
+    """
+
+    def __init__(self, source: str, relation: str, max_age: float) -> None:
+        self.source = source
+        self.relation = relation
+        self.max_age = max_age
+        self.previous: Dict[str, Mapping[str, object]] = {}
+        self.previous_scrape: int | None = None
+        self.complete = False
+        self._current: set[str] = set()
+        self._added: Dict[str, dict] = {}
+        self._changed: List[dict] = []
+
+    def start(self, previous: Mapping[str, Mapping[str, object]], scrape_id: int | None) -> None:
+        self.previous = dict(previous)
+        self.previous_scrape = scrape_id
+
+    def listed(self, user) -> None:
+        key = str(user.pk)
+        if key in self._current:
+            return
+        self._current.add(key)
+        if key not in self.previous:
+            self._added[key] = {"pk": key, "username": getattr(user, "username", None), "followers": None}
+
+    def observe(self, pk: object, row: Mapping[str, object]) -> None:
+        key = str(pk)
+        followers = row.get("followers")
+        if key in self._added:
+            self._added[key]["followers"] = followers
+            return
+        before = self.previous.get(key, {}).get("followers")
+        if before is not None and followers is not None and before != followers:
+            self._changed.append(
+                {
+                    "pk": key,
+                    "username": row.get("username"),
+                    "followers_before": before,
+                    "followers_after": followers,
+                    "change": followers - before,
+                }
+            )
+
+    @property
+    def added(self) -> List[dict]:
+        return list(self._added.values())
+
+    @property
+    def removed(self) -> List[dict]:
+        if not self.complete:
+            return []
+        return [
+            {"pk": key, "username": data.get("username"), "followers": data.get("followers")}
+            for key, data in self.previous.items()
+            if key not in self._current
+        ]
+
+    @property
+    def changed(self) -> List[dict]:
+        return list(self._changed)
+
+    def summary(self) -> dict:
+        return {
+            "listed": len(self._current),
+            "added": len(self._added),
+            "removed": len(self.removed),
+            "changed": len(self._changed),
+            "complete": self.complete,
+        }
+
+    def describe(self) -> str:
+        text = f"delta: +{len(self._added)} / -{len(self.removed)} cuentas, {len(self._changed)} cambios de seguidores"
+        if not self.complete:
+            text += " (lista incompleta: no se calculan bajas)"
+        return text
+
+    def as_dict(self) -> dict:
+        return {
+            "source": self.source,
+            "relation": self.relation,
+            "generated_at": round(time.time(), 3),
+            "previous_scrape": self.previous_scrape,
+            "max_age_s": self.max_age,
+            **self.summary(),
+            "added": self.added,
+            "removed": self.removed,
+            "changed": self.changed,
+        }
+
+    def write(self, path: Path) -> Path:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.as_dict(), ensure_ascii=False, indent=2), encoding="utf-8")
+        return path
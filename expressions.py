@@ -0,0 +1,607 @@
+"""Filter expression language: parsed once into a row predicate and a vectorized mask.
+
+Examples::
+
+    followers between 1k and 50k and not is_private and full_name ~ /coach/i
+    (posts >= 10 or is_verified) and username !~ /shop|store/ and following < 2k
+
+Numeric fields (``followers``, ``following``, ``posts``) take ``<``,
+``<=``, ``>``, ``>=``, ``=``, ``!=`` and ``between A and B``; numbers
+accept ``k``/``m`` suffixes. Text fields (``username``, ``full_name``,
+``source``) take ``=``/``!=`` with a quoted string and ``~``/``!~`` with a
+``/regex/flags`` (``i``, ``m``, ``s``). Flags (``is_private``,
+``is_verified``, ``has_highlights``, also ``public``) stand alone or are
+compared with ``true``/``false``. ``not`` binds tighter than ``and``, and
+``and`` tighter than ``or``.
+
+A missing number or text never satisfies a comparison, ``!=`` and ``!~``
+included (``not full_name ~ /x/`` does hold for it); a missing flag
+counts as ``false``, like in ``filters.matches``.
+"""
+from __future__ import annotations
+
+import operator
+import re
+from dataclasses import dataclass
+from typing import Callable, Iterator, List, Mapping
+
+from frames import column, numeric, truthy
+
+NUMBER_FIELDS = ("followers", "following", "posts")
+TEXT_FIELDS = ("username", "full_name", "source")
+FLAG_FIELDS = ("is_private", "is_verified", "has_highlights")
+FIELD_ALIASES = {
+    "media_count": "posts",
+    "has_highlight_reels": "has_highlights",
+    "private": "is_private",
+    "verified": "is_verified",
+    "highlights": "has_highlights",
+}
+# Campos que ya trae el listado corto (hashtag o relación), antes de pedir el perfil.
+SHORT_FIELDS = ("username", "full_name", "is_private", "is_verified")
+
+_SUFFIXES = {"k": 1_000, "m": 1_000_000}
+_REGEX_FLAGS = {"i": re.IGNORECASE, "m": re.MULTILINE, "s": re.DOTALL}
+_OPERATORS = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "=": operator.eq,
+    "!=": operator.ne,
+}
+_COMPARISONS = ("<=", ">=", "!=", "==", "<", ">", "=")
+_KEYWORDS = {"and", "or", "not", "between", "true", "false"}
+
+_TOKEN = re.compile(
+    r"""
+    (?P<space>\s+)
+    | (?P<number>\d[\d_]*(?:\.\d+)?[kKmM]?(?![\w.]))
+    | (?P<string>"(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')
+    | (?P<regex>/(?:\\.|[^/\\])*/[a-z]*)
+    | (?P<op><=|>=|!=|==|!~|<|>|=|~|\(|\))
+    | (?P<name>[A-Za-z_][A-Za-z0-9_]*)
+    """,
+    re.VERBOSE,
+)
+
+
+class FilterSyntaxError(ValueError):
+    """The filter expression could not be parsed."""
+
+
+@dataclass
+class _Token:
+    kind: str
+    value: str
+    position: int
+
+
+def _tokenize(text: str) -> List[_Token]:
+    tokens: List[_Token] = []
+    position = 0
+    while position < len(text):
+        found = _TOKEN.match(text, position)
+        if found is None:
+            raise FilterSyntaxError(f"Carácter inesperado {text[position]!r} en la posición {position + 1}.")
+        kind = found.lastgroup
+        value = found.group()
+        # ``/`` solo abre una expresión regular después de ``~`` o ``!~``.
+        if kind == "regex" and not (tokens and tokens[-1].value in ("~", "!~")):
+            raise FilterSyntaxError(f"Carácter inesperado '/' en la posición {position + 1}.")
+        if kind != "space":
+            tokens.append(_Token(kind, value, position))
+        position = found.end()
+    tokens.append(_Token("end", "", len(text)))
+    return tokens
+
+
+def _number(token: _Token) -> int | float:
+    text = token.value.replace("_", "").lower()
+    scale = _SUFFIXES.get(text[-1], 1)
+    if scale != 1:
+        text = text[:-1]
+    value = float(text) * scale
+    return int(value) if value.is_integer() else value
+
+
+def _string(token: _Token) -> str:
+    body = token.value[1:-1]
+    return re.sub(r"\\(.)", r"\1", body)
+
+
+def _regex(token: _Token) -> re.Pattern:
+    body, _, flags = token.value[1:].rpartition("/")
+    value = 0
+    for flag in flags:
+        if flag not in _REGEX_FLAGS:
+            raise FilterSyntaxError(f"Modificador de expresión regular desconocido {flag!r} en la posición {token.position + 1}.")
+        value |= _REGEX_FLAGS[flag]
+    try:
+        return re.compile(body.replace("\\/", "/"), value)
+    except re.error as exc:
+        raise FilterSyntaxError(f"Expresión regular inválida en la posición {token.position + 1}: {exc}") from None
+
+
+# ----------------------------------------------------------------------
+# Nodos
+# ----------------------------------------------------------------------
+Predicate = Callable[[Mapping], bool]
+
+
+def _getter(field: str) -> Callable[[Mapping], object]:
+    """Reads ``field`` from a row, with the same fallbacks as ``filters.matches``."""
+    if field == "posts":
+        return lambda row: row.get("media_count") or row.get("posts")
+    if field == "has_highlights":
+        return lambda row: row.get("has_highlight_reels") or row.get("has_highlights")
+    return operator.methodcaller("get", field)
+
+
+@dataclass
+class _Compare:
+    field: str
+    op: str
+    value: object
+
+    def text(self) -> str:
+        if isinstance(self.value, bool):
+            value = "true" if self.value else "false"
+        elif isinstance(self.value, str):
+            value = '"' + re.sub(r'(["\\])', r"\\\1", self.value) + '"'
+        else:
+            value = str(self.value)
+        return f"{self.field} {self.op} {value}"
+
+    def predicate(self) -> Predicate:
+        get = _getter(self.field)
+        if self.field in FLAG_FIELDS:
+            wanted = self.value == (self.op == "=")
+            return lambda row: bool(get(row)) is wanted
+        compare = _OPERATORS[self.op]
+        value = self.value
+
+        def check(row: Mapping) -> bool:
+            found = get(row)
+            return found is not None and compare(found, value)
+
+        return check
+
+    def mask(self, frame):
+        op = _OPERATORS[self.op]
+        if self.field in TEXT_FIELDS:
+            return op(_text(frame, self.field), self.value).fillna(False).astype(bool)
+        if self.field in FLAG_FIELDS:
+            flag = _flag(frame, self.field)
+            return flag if (op is operator.eq) == self.value else ~flag
+        numbers = _number_column(frame, self.field)
+        return (op(numbers, self.value) & numbers.notna()).fillna(False).astype(bool)
+
+    def evaluate(self, value: object) -> bool:
+        if self.field in FLAG_FIELDS:
+            return (bool(value) == self.value) == (self.op == "=")
+        return (value == self.value) == (self.op == "=")
+
+    def decide(self, data: Mapping) -> bool | None:
+        return _decide_leaf(self, data)
+
+
+@dataclass
+class _Between:
+    field: str
+    low: int | float
+    high: int | float
+
+    def text(self) -> str:
+        return f"{self.field} between {self.low} and {self.high}"
+
+    def predicate(self) -> Predicate:
+        get = _getter(self.field)
+        low, high = self.low, self.high
+
+        def check(row: Mapping) -> bool:
+            found = get(row)
+            return found is not None and low <= found <= high
+
+        return check
+
+    def mask(self, frame):
+        numbers = _number_column(frame, self.field)
+        return ((numbers >= self.low) & (numbers <= self.high)).fillna(False).astype(bool)
+
+    def decide(self, data: Mapping) -> bool | None:
+        return None
+
+
+@dataclass
+class _Match:
+    field: str
+    pattern: re.Pattern
+    negate: bool = False
+
+    def text(self) -> str:
+        flags = "".join(flag for flag, value in _REGEX_FLAGS.items() if self.pattern.flags & value)
+        body = self.pattern.pattern.replace("/", "\\/")
+        return f"{self.field} {'!~' if self.negate else '~'} /{body}/{flags}"
+
+    def predicate(self) -> Predicate:
+        get = _getter(self.field)
+        search, negate = self.pattern.search, self.negate
+
+        def check(row: Mapping) -> bool:
+            value = get(row)
+            return isinstance(value, str) and (search(value) is not None) != negate
+
+        return check
+
+    def mask(self, frame):
+        text = _text(frame, self.field)
+        found = text.str.contains(self.pattern.pattern, flags=self.pattern.flags, regex=True, na=False)
+        found = found.fillna(False).astype(bool)
+        return (~found & text.notna()) if self.negate else found
+
+    def evaluate(self, value: object) -> bool:
+        return isinstance(value, str) and (self.pattern.search(value) is not None) != self.negate
+
+    def decide(self, data: Mapping) -> bool | None:
+        return _decide_leaf(self, data)
+
+
+@dataclass
+class _Flag:
+    field: str
+
+    def text(self) -> str:
+        return self.field
+
+    def predicate(self) -> Predicate:
+        get = _getter(self.field)
+        return lambda row: bool(get(row))
+
+    def mask(self, frame):
+        return _flag(frame, self.field)
+
+    def evaluate(self, value: object) -> bool:
+        return bool(value)
+
+    def decide(self, data: Mapping) -> bool | None:
+        return _decide_leaf(self, data)
+
+
+@dataclass
+class _Not:
+    node: object
+
+    def text(self) -> str:
+        inner = self.node.text()
+        return f"not ({inner})" if isinstance(self.node, (_And, _Or)) else f"not {inner}"
+
+    def predicate(self) -> Predicate:
+        inner = self.node.predicate()
+        return lambda row: not inner(row)
+
+    def mask(self, frame):
+        return ~self.node.mask(frame)
+
+    def decide(self, data: Mapping) -> bool | None:
+        value = self.node.decide(data)
+        return None if value is None else not value
+
+
+@dataclass
+class _And:
+    nodes: list
+
+    def text(self) -> str:
+        return " and ".join(f"({node.text()})" if isinstance(node, _Or) else node.text() for node in self.nodes)
+
+    def predicate(self) -> Predicate:
+        checks = [node.predicate() for node in self.nodes]
+
+        def check(row: Mapping) -> bool:
+            for item in checks:
+                if not item(row):
+                    return False
+            return True
+
+        return check
+
+    def mask(self, frame):
+        mask = self.nodes[0].mask(frame)
+        for node in self.nodes[1:]:
+            mask = mask & node.mask(frame)
+        return mask
+
+    def decide(self, data: Mapping) -> bool | None:
+        values = [node.decide(data) for node in self.nodes]
+        if False in values:
+            return False
+        return None if None in values else True
+
+
+@dataclass
+class _Or:
+    nodes: list
+
+    def text(self) -> str:
+        return " or ".join(node.text() for node in self.nodes)
+
+    def predicate(self) -> Predicate:
+        checks = [node.predicate() for node in self.nodes]
+
+        def check(row: Mapping) -> bool:
+            for item in checks:
+                if item(row):
+                    return True
+            return False
+
+        return check
+
+    def mask(self, frame):
+        mask = self.nodes[0].mask(frame)
+        for node in self.nodes[1:]:
+            mask = mask | node.mask(frame)
+        return mask
+
+    def decide(self, data: Mapping) -> bool | None:
+        values = [node.decide(data) for node in self.nodes]
+        if True in values:
+            return True
+        return None if None in values else False
+
+
+def _decide_leaf(node, data: Mapping) -> bool | None:
+    """Evaluates a condition over the short data of an account; ``None`` if its field is not there.
+
+    The listings often bring an empty ``full_name`` that the full profile
+    does fill, so an empty text counts as unknown too.
+    """
+    value = data.get(node.field) if node.field in SHORT_FIELDS else None
+    return None if value is None or value == "" else node.evaluate(value)
+
+
+# ----------------------------------------------------------------------
+# Columnas de un DataFrame
+# ----------------------------------------------------------------------
+def _number_column(frame, field: str):
+    if field == "posts":
+        media_count = column(frame, "media_count")
+        return numeric(media_count).where(truthy(media_count), numeric(column(frame, "posts")))
+    return numeric(column(frame, field))
+
+
+def _text(frame, field: str):
+    return column(frame, field).astype("string")
+
+
+def _flag(frame, field: str):
+    if field == "has_highlights":
+        return truthy(column(frame, "has_highlight_reels")) | truthy(column(frame, "has_highlights"))
+    return truthy(column(frame, field))
+
+
+# ----------------------------------------------------------------------
+# Parser
+# ----------------------------------------------------------------------
+class _Parser:
+    def __init__(self, text: str) -> None:
+        self.tokens = _tokenize(text)
+        self.index = 0
+
+    @property
+    def current(self) -> _Token:
+        return self.tokens[self.index]
+
+    def _error(self, expected: str) -> FilterSyntaxError:
+        token = self.current
+        found = "el final" if token.kind == "end" else repr(token.value)
+        return FilterSyntaxError(f"Se esperaba {expected} en la posición {token.position + 1} y se encontró {found}.")
+
+    def _advance(self) -> _Token:
+        token = self.current
+        self.index += 1
+        return token
+
+    def _keyword(self, word: str) -> bool:
+        if self.current.kind == "name" and self.current.value.lower() == word:
+            self.index += 1
+            return True
+        return False
+
+    def parse(self):
+        if self.current.kind == "end":
+            raise FilterSyntaxError("La expresión de filtro está vacía.")
+        node = self._or()
+        if self.current.kind != "end":
+            raise self._error("'and', 'or' o el final")
+        return node
+
+    def _or(self):
+        nodes = [self._and()]
+        while self._keyword("or"):
+            nodes.append(self._and())
+        return nodes[0] if len(nodes) == 1 else _Or(nodes)
+
+    def _and(self):
+        nodes = [self._not()]
+        while self._keyword("and"):
+            nodes.append(self._not())
+        # ``(a and b) and c`` queda plano, así ``split`` ve cada condición.
+        flat = [item for node in nodes for item in (node.nodes if isinstance(node, _And) else [node])]
+        return flat[0] if len(flat) == 1 else _And(flat)
+
+    def _not(self):
+        if self._keyword("not"):
+            return _Not(self._not())
+        return self._atom()
+
+    def _atom(self):
+        if self.current.value == "(":
+            self._advance()
+            node = self._or()
+            if self.current.value != ")":
+                raise self._error("')'")
+            self._advance()
+            return node
+        if self.current.kind != "name" or self.current.value.lower() in _KEYWORDS:
+            raise self._error("un campo")
+        token = self._advance()
+        name = token.value.lower()
+        if name == "public":
+            return _Not(_Flag("is_private"))
+        field = FIELD_ALIASES.get(name, name)
+        if field in NUMBER_FIELDS:
+            return self._number_condition(field)
+        if field in TEXT_FIELDS:
+            return self._text_condition(field)
+        if field in FLAG_FIELDS:
+            return self._flag_condition(field)
+        known = ", ".join(NUMBER_FIELDS + TEXT_FIELDS + FLAG_FIELDS)
+        raise FilterSyntaxError(f"Campo desconocido {token.value!r} en la posición {token.position + 1}. Campos: {known}.")
+
+    def _number_value(self) -> int | float:
+        if self.current.kind != "number":
+            raise self._error("un número")
+        return _number(self._advance())
+
+    def _number_condition(self, field: str):
+        if self._keyword("between"):
+            low = self._number_value()
+            if not self._keyword("and"):
+                raise self._error("'and'")
+            high = self._number_value()
+            return _Between(field, low, high)
+        if self.current.value not in _COMPARISONS:
+            raise self._error(f"una comparación para {field} (<, <=, >, >=, =, != o between)")
+        op = self._advance().value
+        return _Compare(field, "=" if op == "==" else op, self._number_value())
+
+    def _text_condition(self, field: str):
+        op = self.current.value
+        if op in ("~", "!~"):
+            self._advance()
+            if self.current.kind == "regex":
+                pattern = _regex(self._advance())
+            elif self.current.kind == "string":
+                pattern = re.compile(re.escape(_string(self._advance())), re.IGNORECASE)
+            else:
+                raise self._error("una expresión regular /.../")
+            return _Match(field, pattern, negate=op == "!~")
+        if op in ("=", "==", "!="):
+            self._advance()
+            if self.current.kind != "string":
+                raise self._error("un texto entre comillas")
+            return _Compare(field, "!=" if op == "!=" else "=", _string(self._advance()))
+        raise self._error(f"una comparación para {field} (=, !=, ~ o !~)")
+
+    def _flag_condition(self, field: str):
+        if self.current.value not in ("=", "==", "!="):
+            return _Flag(field)
+        op = self._advance().value
+        if self._keyword("true"):
+            value = True
+        elif self._keyword("false"):
+            value = False
+        else:
+            raise self._error("true o false")
+        return _Compare(field, "!=" if op == "!=" else "=", value)
+
+
+# ----------------------------------------------------------------------
+# API
+# ----------------------------------------------------------------------
+class FilterExpression:
+    """A parsed filter expression.
+
+    Calling it evaluates one row through a predicate built once from the
+    parse tree as nested closures; ``mask`` evaluates a whole DataFrame
+    with the same semantics; ``decide`` evaluates the short data of a
+    listing and returns ``None`` when it cannot tell yet.
+    """
+
+    def __init__(self, tree) -> None:
+        self.tree = tree
+        self.predicate: Predicate = tree.predicate()
+
+    @property
+    def text(self) -> str:
+        """Normalized text of the expression."""
+        return self.tree.text()
+
+    def __call__(self, row: Mapping) -> bool:
+        return self.predicate(row)
+
+    def __repr__(self) -> str:
+        return f"FilterExpression({self.text!r})"
+
+    def mask(self, frame):
+        return self.tree.mask(frame)
+
+    def decide(self, data: Mapping) -> bool | None:
+        return self.tree.decide(data)
+
+    def conditions(self) -> Iterator[object]:
+        """Top-level ``and`` conditions."""
+        if isinstance(self.tree, _And):
+            yield from self.tree.nodes
+        else:
+            yield self.tree
+
+    def split(self, free: Callable[[str], bool]) -> tuple[dict, "FilterExpression | None"]:
+        """Moves the top-level conditions that ``FilterCriteria`` fields can hold out of the expression.
+
+        ``free(name)`` tells whether that field is still unset. Returns the
+        field values and whatever is left of the expression (or ``None``).
+        """
+        values: dict = {}
+        rest = []
+        for node in self.conditions():
+            lifted = _criteria_values(node)
+            if lifted is None or any(name in values or not free(name) for name in lifted):
+                rest.append(node)
+            else:
+                values.update(lifted)
+        if not rest:
+            return values, None
+        return values, FilterExpression(rest[0] if len(rest) == 1 else _And(rest))
+
+
+def _integral(value: int | float) -> bool:
+    return isinstance(value, int) or float(value).is_integer()
+
+
+def _criteria_values(node) -> dict | None:
+    """``FilterCriteria`` fields equivalent to ``node``, if there are any."""
+    if isinstance(node, _Between) and node.field == "followers" and _integral(node.low) and _integral(node.high):
+        return {"min_followers": int(node.low), "max_followers": int(node.high)}
+    if isinstance(node, _Compare) and node.field in ("followers", "posts") and _integral(node.value):
+        value = int(node.value)
+        bounds = {">=": value, ">": value + 1, "<=": value, "<": value - 1}
+        if node.field == "posts":
+            return {"min_posts": bounds[node.op]} if node.op in (">=", ">") else None
+        if node.op in (">=", ">"):
+            return {"min_followers": bounds[node.op]}
+        if node.op in ("<=", "<"):
+            return {"max_followers": bounds[node.op]}
+        if node.op == "=":
+            return {"min_followers": value, "max_followers": value}
+        return None
+    flag, wanted = None, True
+    if isinstance(node, _Flag):
+        flag = node.field
+    elif isinstance(node, _Not) and isinstance(node.node, _Flag):
+        flag, wanted = node.node.field, False
+    elif isinstance(node, _Compare) and node.field in FLAG_FIELDS:
+        flag, wanted = node.field, node.value == (node.op == "=")
+    if flag == "is_private":
+        return {"require_public": not wanted}
+    if flag == "is_verified" and wanted:
+        return {"require_verified": True}
+    if flag == "has_highlights" and wanted:
+        return {"require_highlights": True}
+    return None
+
+
+def parse_expression(text: str) -> FilterExpression:
+    """Parses ``text``; raises ``FilterSyntaxError`` (a ``ValueError``) with the position of the problem."""
+    return FilterExpression(_Parser(text).parse())
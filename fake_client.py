@@ -0,0 +1,582 @@
+"""Deterministic offline stand-in for the instagrapi ``Client`` used by the scraper.
+
+Used by the benchmarks (and for manual checks) to drive ``ScraperService``
+without touching Instagram. Profiles are derived from their pk with a seeded
+RNG, so datasets of any size cost no memory and every run sees the same data.
+``StandInProxy`` and ``HttpStandInClient`` serve the same profiles over local
+HTTP, to exercise the proxy pool with real sockets.
+"""
+from __future__ import annotations
+
+import copy
+import hashlib
+import json
+import random
+import re
+import socket
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+import requests
+
+from compat import ensure_pydantic_compat
+
+ensure_pydantic_compat()
+
+from instagrapi.extractors import extract_user_v1  # noqa: E402
+from instagrapi.exceptions import (  # noqa: E402
+    ClientConnectionError,
+    ClientNotFoundError,
+    PrivateAccount,
+    PrivateError,
+    RateLimitError,
+    UserNotFound,
+)
+
+_USER_INFO_ENDPOINT = re.compile(r"^users/(\d+)/info/$")
+
+
+_BIO_WORDS = ("coach", "fitness", "viajes", "café", "arte", "música", "mamá", "emprendedora", "📍", "✨", "link", "👇")
+_CATEGORIES = ("Personal blog", "Artist", "Health/beauty", "Coach", "Restaurant", "Product/service")
+
+
+def _seed(*parts: object) -> int:
+    digest = hashlib.blake2b(repr(parts).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+class FakeUser:
+    """Attributes read by ``ScraperService._serialize_user``."""
+
+    __slots__ = (
+        "pk",
+        "username",
+        "full_name",
+        "follower_count",
+        "following_count",
+        "media_count",
+        "is_private",
+        "is_verified",
+        "has_highlight_reels",
+    )
+
+    def __init__(self, **values: object) -> None:
+        for name in self.__slots__:
+            setattr(self, name, values.get(name))
+
+    def short(self) -> "FakeUserShort":
+        return FakeUserShort(self.pk, self.username, self.full_name, self.is_private, self.is_verified)
+
+
+class FakeUserShort:
+    __slots__ = ("pk", "username", "full_name", "is_private", "is_verified")
+
+    def __init__(self, pk: str, username: str, full_name: str, is_private: bool, is_verified: bool) -> None:
+        self.pk = pk
+        self.username = username
+        self.full_name = full_name
+        self.is_private = is_private
+        self.is_verified = is_verified
+
+
+class FakeMedia:
+    __slots__ = ("pk", "user", "like_count")
+
+    def __init__(self, pk: str, user: FakeUserShort, like_count: int = 0) -> None:
+        self.pk = pk
+        self.user = user
+        self.like_count = like_count
+
+
+@dataclass
+class SyntheticDataset:
+    """Synthetic accounts ``1..users`` plus hashtags and relations built from them.
+
+    Hashtag authors repeat (popular accounts post more), so per-call dedup
+    and the profile caches get exercised like in real scrapes.
+    """
+
+    users: int = 10_000
+    relation_size: int = 1_000
+    seed: int = 1234
+    private_ratio: float = 0.3
+    verified_ratio: float = 0.02
+
+    def profile(self, pk: object) -> FakeUser:
+        number = int(pk)
+        if not 1 <= number <= self.users:
+            raise KeyError(pk)
+        rng = random.Random(_seed(self.seed, "profile", number))
+        private = rng.random() < self.private_ratio
+        return FakeUser(
+            pk=str(number),
+            username=f"user_{number}",
+            full_name=f"User {number}",
+            follower_count=int(rng.paretovariate(1.2) * 100),
+            following_count=rng.randint(0, 5000),
+            media_count=rng.randint(0, 800),
+            is_private=private,
+            is_verified=rng.random() < self.verified_ratio,
+            has_highlight_reels=rng.random() < 0.4,
+        )
+
+    def user_json(self, pk: object) -> dict:
+        """``users/{pk}/info/`` response for ``pk``, with the fields a real one carries.
+
+        Counts and flags match ``profile(pk)``; the rest is the bulk that
+        instagrapi validates into its pydantic ``User`` on every request.
+        """
+        user = self.profile(pk)
+        rng = random.Random(_seed(self.seed, "payload", user.pk))
+        pic = f"https://scontent.cdninstagram.com/v/t51.2885-19/{rng.getrandbits(48)}_n.jpg"
+        versions = [
+            {"width": size, "height": size, "url": f"{pic}?stp=dst-jpg_s{size}x{size}"} for size in (150, 320, 640, 1080)
+        ]
+        business = rng.random() < 0.25
+        biography = " ".join(rng.choice(_BIO_WORDS) for _ in range(rng.randint(3, 25)))
+        return {
+            "user": {
+                "pk": int(user.pk),
+                "pk_id": user.pk,
+                "id": user.pk,
+                "strong_id__": user.pk,
+                "fbid_v2": str(17841400000000000 + int(user.pk)),
+                "interop_messaging_user_fbid": str(rng.getrandbits(52)),
+                "username": user.username,
+                "full_name": user.full_name,
+                "is_private": user.is_private,
+                "is_verified": user.is_verified,
+                "is_business": business,
+                "account_type": 2 if business else 1,
+                "professional_conversion_suggested_account_type": 2,
+                "profile_pic_id": f"{rng.getrandbits(60)}_{user.pk}",
+                "profile_pic_url": f"{pic}?stp=dst-jpg_s150x150",
+                "hd_profile_pic_url_info": versions[-1],
+                "hd_profile_pic_versions": versions[:-1],
+                "has_anonymous_profile_picture": False,
+                "biography": biography,
+                "biography_with_entities": {"raw_text": biography, "entities": []},
+                "bio_links": [
+                    {
+                        "link_id": rng.getrandbits(50),
+                        "url": f"https://example.com/{user.username}",
+                        "lynx_url": "",
+                        "link_type": "external",
+                        "title": "",
+                    }
+                ]
+                if rng.random() < 0.3
+                else [],
+                "external_url": f"https://example.com/{user.username}" if rng.random() < 0.3 else "",
+                "external_lynx_url": "",
+                "follower_count": user.follower_count,
+                "following_count": user.following_count,
+                "following_tag_count": rng.randint(0, 5),
+                "media_count": user.media_count,
+                "total_clips_count": rng.randint(0, 50),
+                "total_igtv_videos": 0,
+                "usertags_count": rng.randint(0, 300),
+                "mutual_followers_count": rng.randint(0, 20),
+                "has_highlight_reels": user.has_highlight_reels,
+                "has_guides": False,
+                "has_videos": rng.random() < 0.6,
+                "has_clips": rng.random() < 0.6,
+                "show_text_post_app_badge": rng.random() < 0.2,
+                "text_post_app_badge_label": user.username,
+                "category": rng.choice(_CATEGORIES) if business else None,
+                "business_category_name": None,
+                "category_name": None,
+                "public_email": f"{user.username}@example.com" if business else "",
+                "contact_phone_number": "",
+                "public_phone_country_code": "",
+                "public_phone_number": "",
+                "business_contact_method": "UNKNOWN" if business else None,
+                "address_street": "",
+                "city_id": 0,
+                "city_name": "",
+                "latitude": 0.0,
+                "longitude": 0.0,
+                "zip": "",
+                "instagram_location_id": "",
+                "is_favorite": False,
+                "is_interest_account": rng.random() < 0.5,
+                "is_memorialized": False,
+                "is_new_to_instagram": False,
+                "is_potential_business": False,
+                "is_call_to_action_enabled": business,
+                "is_eligible_for_smb_support_flow": business,
+                "is_whatsapp_linked": False,
+                "is_supervision_features_enabled": False,
+                "include_direct_blacklist_status": True,
+                "pronouns": [],
+                "transparency_product_enabled": False,
+                "fan_club_info": {"fan_club_id": None, "fan_club_name": None, "is_fan_club_referral_eligible": None},
+                "friendship_status": {
+                    "following": False,
+                    "followed_by": rng.random() < 0.1,
+                    "blocking": False,
+                    "muting": False,
+                    "is_private": user.is_private,
+                    "incoming_request": False,
+                    "outgoing_request": False,
+                    "is_bestie": False,
+                    "is_restricted": False,
+                    "is_feed_favorite": False,
+                },
+                "broadcast_channel": [],
+                "pinned_channels_info": {"pinned_channels_list": [], "has_public_channels": False},
+                "chaining_suggestions": [],
+                "recs_from_friends": {"enable_recs_from_friends": False, "recs_from_friends_entry_point_type": "banner"},
+                "profile_context": "",
+                "profile_context_links_with_user_ids": [],
+                "third_party_downloads_enabled": 1,
+                "auto_expand_chaining": False,
+                "highlight_reshare_disabled": False,
+            },
+            "status": "ok",
+        }
+
+    def hashtag_authors(self, hashtag: str, amount: int) -> List[int]:
+        rng = random.Random(_seed(self.seed, "hashtag", hashtag))
+        popular = max(1, self.users // 20)
+        return [
+            rng.randint(1, popular) if rng.random() < 0.3 else rng.randint(1, self.users)
+            for _ in range(amount)
+        ]
+
+    def pk_for_username(self, username: str) -> int:
+        if username.startswith("user_") and username[5:].isdigit():
+            return int(username[5:])
+        return _seed(self.seed, "username", username) % self.users + 1
+
+    def relation(self, user_id: object, relation: str) -> List[int]:
+        """pks of ``relation`` of ``user_id``, newest first."""
+        rng = random.Random(_seed(self.seed, relation, int(user_id)))
+        return rng.sample(range(1, self.users + 1), min(self.relation_size, self.users))
+
+
+@dataclass
+class FaultPlan:
+    """Errors injected by ``FakeClient``.
+
+    ``private`` and ``not_found`` are the share of pks whose ``user_info``
+    always fails with ``PrivateError`` / ``UserNotFound``. ``rate_limit`` is
+    the probability of a random ``RateLimitError`` on any request, and
+    ``max_rps`` makes the fake server throttle clients that go faster than
+    that many requests per second (shared by every clone). Requests sent
+    through a proxy in ``dead_proxies`` fail with ``ClientConnectionError``
+    and ``proxy_latency`` adds seconds to the ones sent through each proxy.
+    """
+
+    private: float = 0.0
+    not_found: float = 0.0
+    rate_limit: float = 0.0
+    max_rps: float | None = None
+    dead_proxies: Tuple[str, ...] = ()
+    proxy_latency: Dict[str, float] = field(default_factory=dict)
+
+
+class _ServerLimit:
+    """Server-side token bucket shared by a client and its clones."""
+
+    def __init__(self, rate: float | None) -> None:
+        self.rate = rate
+        self._tokens = 1.0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        if self.rate is None:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(1.0, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return True
+            return False
+
+
+class FakeClient:
+    """Implements the subset of ``instagrapi.Client`` that ``ScraperService`` calls.
+
+    ``latency`` is the time each request takes, either fixed or a
+    ``(min, max)`` range. ``calls`` counts requests per endpoint.
+    """
+
+    def __init__(
+        self,
+        dataset: SyntheticDataset | None = None,
+        latency: float | Tuple[float, float] = 0.0,
+        faults: FaultPlan | None = None,
+        seed: int = 1234,
+    ) -> None:
+        self.dataset = dataset or SyntheticDataset()
+        self.latency = latency
+        self.faults = faults or FaultPlan()
+        self.proxy = None
+        self.username = "bench"
+        self.calls: Dict[str, int] = {}
+        self._calls_lock = threading.Lock()
+        self._server = _ServerLimit(self.faults.max_rps)
+        self._rng = random.Random(seed)
+
+    def clone(self) -> "FakeClient":
+        """Worker copy with its own RNG; call counters and server limits are shared."""
+        twin = copy.copy(self)
+        twin._rng = random.Random(self._rng.randrange(2**32))
+        return twin
+
+    # ------------------------------------------------------------------
+    # Infraestructura
+    # ------------------------------------------------------------------
+    def _request(self, endpoint: str) -> None:
+        with self._calls_lock:
+            self.calls[endpoint] = self.calls.get(endpoint, 0) + 1
+        latency = self.latency
+        if isinstance(latency, tuple):
+            latency = self._rng.uniform(*latency)
+        latency += self.faults.proxy_latency.get(self.proxy, 0.0)
+        if latency:
+            time.sleep(latency)
+        if self.proxy is not None and self.proxy in self.faults.dead_proxies:
+            raise ClientConnectionError(f"ProxyError: no se pudo conectar a {self.proxy}")
+        if not self._server.allow():
+            raise RateLimitError("Please wait a few minutes before you try again.")
+        if self.faults.rate_limit and self._rng.random() < self.faults.rate_limit:
+            raise RateLimitError("Please wait a few minutes before you try again.")
+
+    def _fails(self, kind: str, pk: object, share: float) -> bool:
+        return share > 0 and random.Random(_seed(self.dataset.seed, kind, str(pk))).random() < share
+
+    def get_settings(self) -> Dict[str, object]:
+        return {}
+
+    def set_proxy(self, dsn: str | None) -> None:
+        self.proxy = dsn
+
+    def load_settings(self, path: str) -> Dict[str, object]:
+        return {}
+
+    def dump_settings(self, path: str) -> bool:
+        return True
+
+    def login(self, username: str, password: str, verification_code: str | None = None) -> bool:
+        self.username = username
+        return True
+
+    # ------------------------------------------------------------------
+    # Endpoints
+    # ------------------------------------------------------------------
+    def account_info(self) -> FakeUser:
+        self._request("account_info")
+        return FakeUser(pk="0", username=self.username, full_name=self.username)
+
+    def user_id_from_username(self, username: str) -> str:
+        self._request("user_id_from_username")
+        return str(self.dataset.pk_for_username(username))
+
+    def user_info(self, user_id: object):
+        """Validates the ``users/{pk}/info/`` payload into instagrapi's ``User``, as the real client does."""
+        self._request("user_info")
+        if self._fails("not_found", user_id, self.faults.not_found):
+            raise UserNotFound(f"User {user_id} not found")
+        if self._fails("private", user_id, self.faults.private):
+            raise PrivateError("Not authorized to view user")
+        try:
+            payload = self.dataset.user_json(user_id)
+        except KeyError:
+            raise UserNotFound(f"User {user_id} not found") from None
+        return copy.deepcopy(extract_user_v1(payload["user"]))
+
+    def private_request(
+        self, endpoint: str, data: Optional[dict] = None, params: Optional[dict] = None, **kwargs: object
+    ) -> dict:
+        """Only ``users/{pk}/info/``, with the errors instagrapi raises for it."""
+        match = _USER_INFO_ENDPOINT.match(endpoint)
+        if match is None:
+            raise NotImplementedError(f"FakeClient no implementa {endpoint}")
+        user_id = match.group(1)
+        self._request("users/info")
+        if self._fails("not_found", user_id, self.faults.not_found):
+            raise ClientNotFoundError("User not found")
+        if self._fails("private", user_id, self.faults.private):
+            raise PrivateAccount("Not authorized to view user")
+        try:
+            return self.dataset.user_json(user_id)
+        except KeyError:
+            raise ClientNotFoundError("User not found") from None
+
+    def hashtag_medias_recent(self, name: str, amount: int = 27) -> List[FakeMedia]:
+        self._request("hashtag_medias_recent")
+        medias = []
+        for index, pk in enumerate(self.dataset.hashtag_authors(name, amount)):
+            author = self.dataset.profile(pk)
+            # Los likes siguen (con ruido) a los seguidores del autor, como en una publicación real.
+            likes = int(author.follower_count * random.Random(_seed(name, index)).uniform(0.01, 0.1))
+            medias.append(FakeMedia(f"{name}_{index}", author.short(), likes))
+        return medias
+
+    def _relation(self, relation: str, user_id: object, amount: int = 0) -> Dict[str, FakeUserShort]:
+        self._request(f"user_{relation}")
+        pks = self.dataset.relation(user_id, relation)
+        if amount:
+            pks = pks[:amount]
+        return {str(pk): self.dataset.profile(pk).short() for pk in pks}
+
+    def user_followers(self, user_id: object, use_cache: bool = True, amount: int = 0) -> Dict[str, FakeUserShort]:
+        return self._relation("followers", user_id, amount)
+
+    def user_following(self, user_id: object, use_cache: bool = True, amount: int = 0) -> Dict[str, FakeUserShort]:
+        return self._relation("following", user_id, amount)
+
+    def _relation_chunk(
+        self, relation: str, user_id: object, max_amount: int = 0, max_id: str = ""
+    ) -> Tuple[List[FakeUserShort], str]:
+        self._request(f"user_{relation}_v1_chunk")
+        pks = self.dataset.relation(user_id, relation)
+        start = int(max_id or 0)
+        end = start + max_amount if max_amount else len(pks)
+        users = [self.dataset.profile(pk).short() for pk in pks[start:end]]
+        return users, (str(end) if end < len(pks) else "")
+
+    def user_followers_v1_chunk(
+        self, user_id: object, max_amount: int = 0, max_id: str = ""
+    ) -> Tuple[List[FakeUserShort], str]:
+        return self._relation_chunk("followers", user_id, max_amount, max_id)
+
+    def user_following_v1_chunk(
+        self, user_id: object, max_amount: int = 0, max_id: str = ""
+    ) -> Tuple[List[FakeUserShort], str]:
+        return self._relation_chunk("following", user_id, max_amount, max_id)
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Cabeceras y cuerpo salen en escrituras separadas; sin esto Nagle añade ~40 ms por respuesta.
+    disable_nagle_algorithm = True
+    server: "StandInProxy"
+
+    def setup(self) -> None:
+        super().setup()
+        self.server.count("connections")
+
+    def do_GET(self) -> None:  # noqa: N802 - nombre impuesto por BaseHTTPRequestHandler
+        server = self.server
+        server.count("requests")
+        if server.latency:
+            time.sleep(server.latency)
+        if server.failure and server.roll() < server.failure:
+            # Corta la conexión sin responder, como un proxy caído a mitad de solicitud.
+            self.close_connection = True
+            self.connection.shutdown(socket.SHUT_RDWR)
+            return
+        match = re.search(r"/api/v1/(users/\d+/info/)", self.path)
+        user_id = _USER_INFO_ENDPOINT.match(match.group(1)).group(1) if match else None
+        try:
+            body = json.dumps(server.dataset.user_json(user_id)).encode("utf-8") if user_id else None
+        except KeyError:
+            body = None
+        status = 200 if body is not None else 404
+        body = body if body is not None else b'{"status": "fail", "message": "User not found"}'
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:  # noqa: A002
+        pass
+
+
+class StandInProxy(ThreadingHTTPServer):
+    """Local HTTP proxy that answers ``users/{pk}/info/`` itself from a ``SyntheticDataset``.
+
+    Speaks HTTP/1.1 with keep-alive, so ``connections`` against
+    ``requests`` shows how often clients reuse their pooled connections.
+    ``latency`` slows every answer and ``failure`` is the probability of
+    dropping the connection without answering. Use as a context manager.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self, dataset: SyntheticDataset | None = None, latency: float = 0.0, failure: float = 0.0, seed: int = 1
+    ) -> None:
+        super().__init__(("127.0.0.1", 0), _StandInHandler)
+        self.dataset = dataset or SyntheticDataset()
+        self.latency = latency
+        self.failure = failure
+        self.connections = 0
+        self.requests = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, name: str) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def roll(self) -> float:
+        with self._lock:
+            return self._rng.random()
+
+    def __enter__(self) -> "StandInProxy":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+class HttpStandInClient:
+    """Client that sends ``private_request`` over real HTTP, through ``set_proxy``.
+
+    Mirrors how instagrapi uses ``requests`` sessions (``private`` /
+    ``public``, proxies set on both) so ``ProxyPool`` can be exercised
+    against ``StandInProxy`` servers. Connection failures surface as
+    ``ClientConnectionError``, like instagrapi.
+    """
+
+    API_URL = "http://i.instagram.invalid/api/v1/"
+
+    def __init__(self, timeout: float = 2.0) -> None:
+        self.timeout = timeout
+        self.proxy: str | None = None
+        self.private = requests.Session()
+        self.public = requests.Session()
+        for session in (self.private, self.public):
+            # Sin proxies del entorno: solo los que asigna el pool.
+            session.trust_env = False
+
+    def set_proxy(self, dsn: str | None) -> None:
+        self.proxy = dsn
+        proxies = {"http": dsn, "https": dsn} if dsn else {}
+        self.private.proxies = dict(proxies)
+        self.public.proxies = dict(proxies)
+
+    def private_request(
+        self, endpoint: str, data: Optional[dict] = None, params: Optional[dict] = None, **kwargs: object
+    ) -> dict:
+        try:
+            response = self.private.get(self.API_URL + endpoint, params=params, timeout=self.timeout)
+        except requests.RequestException as exc:
+            raise ClientConnectionError(f"{type(exc).__name__}: {exc}") from exc
+        if response.status_code == 404:
+            raise ClientNotFoundError("User not found")
+        return response.json()
+
+    def close(self) -> None:
+        self.private.close()
+        self.public.close()
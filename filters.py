@@ -1,8 +1,14 @@
 """Filtering logic for Instagram scraper results."""
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Iterable, List, Optional
+import time
+from dataclasses import asdict, dataclass
+from typing import Iterable, Iterator, List, Mapping, Optional
+
+from expressions import SHORT_FIELDS, FilterExpression, parse_expression
+from frames import column, numeric, truthy
+from metrics import RunMetrics
+from records import UserRow
 
 
 @dataclass
@@ -13,6 +19,48 @@ class FilterCriteria:
     require_public: Optional[bool] = None
     require_verified: Optional[bool] = None
     require_highlights: Optional[bool] = None
+    # Condiciones extra en el lenguaje de ``expressions`` (p. ej. ``full_name ~ /coach/i or is_verified``).
+    expression: Optional[str] = None
+
+    def __post_init__(self) -> None:
+        # Se compila una sola vez; un error de sintaxis sale aquí como ValueError.
+        self.compiled: FilterExpression | None = parse_expression(self.expression) if self.expression else None
+
+    @classmethod
+    def from_expression(cls, text: str, base: "FilterCriteria | None" = None) -> "FilterCriteria":
+        """Criteria for the expression ``text``, added to those of ``base``.
+
+        Top-level ``and`` conditions that the fixed fields can hold move
+        there, so the prefilter and the result store query still use them;
+        the rest stays in ``expression``.
+        """
+        values = asdict(base) if base is not None else {}
+        if values.get("expression"):
+            text = f"({values['expression']}) and ({text})"
+        fixed, rest = parse_expression(text).split(lambda name: values.get(name) is None)
+        values.update(fixed, expression=rest.text if rest is not None else None)
+        return cls(**values)
+
+    def to_expression(self) -> str:
+        """The same criteria written in the expression language."""
+        parts: List[str] = []
+        if self.min_followers is not None and self.max_followers is not None:
+            parts.append(f"followers between {self.min_followers} and {self.max_followers}")
+        elif self.min_followers is not None:
+            parts.append(f"followers >= {self.min_followers}")
+        elif self.max_followers is not None:
+            parts.append(f"followers <= {self.max_followers}")
+        if self.min_posts is not None:
+            parts.append(f"posts >= {self.min_posts}")
+        if self.require_public is not None:
+            parts.append("not is_private" if self.require_public else "is_private")
+        if self.require_verified:
+            parts.append("is_verified")
+        if self.require_highlights:
+            parts.append("has_highlights")
+        if self.compiled is not None:
+            parts.append(f"({self.compiled.text})" if len(parts) else self.compiled.text)
+        return " and ".join(parts)
 
     def describe(self) -> List[str]:
         messages: List[str] = []
@@ -28,32 +76,139 @@ class FilterCriteria:
             messages.append("Solo cuentas verificadas")
         if self.require_highlights:
             messages.append("Solo cuentas con historias destacadas")
+        if self.compiled is not None:
+            messages.append(f"Expresión: {self.compiled.text}")
         return messages
 
 
-def apply_filters(rows: Iterable[dict], criteria: FilterCriteria) -> List[dict]:
-    filtered: List[dict] = []
-    for row in rows:
+def short_data(user) -> dict:
+    """Fields of a listed (short) account that ``rejects_early`` can use; ``None`` when missing."""
+    return {field: getattr(user, field, None) for field in SHORT_FIELDS}
+
+
+def rejects_early(data: Mapping[str, object], criteria: FilterCriteria) -> bool:
+    """Decides whether ``criteria`` rejects an account from its short data alone.
+
+    ``data`` holds whatever the relation/hashtag listing already returned
+    (``None`` or an empty text means unknown). Only ``require_public`` (``is_private``),
+    ``require_verified`` (``is_verified``) and the parts of ``expression``
+    over ``username``, ``full_name`` and those two flags can be decided
+    this way; every other criterion needs the full profile, so the account
+    is kept.
+    """
+    is_private = data.get("is_private")
+    if criteria.require_public is not None and is_private is not None:
+        if criteria.require_public and is_private:
+            return True
+        if not criteria.require_public and not is_private:
+            return True
+    is_verified = data.get("is_verified")
+    if criteria.require_verified is True and is_verified is not None and not is_verified:
+        return True
+    return criteria.compiled is not None and criteria.compiled.decide(data) is False
+
+
+def matches(row: Mapping[str, object], criteria: FilterCriteria) -> bool:
+    if isinstance(row, UserRow):
+        # Lectura directa de los slots: evita cinco llamadas a ``get`` por fila.
+        # Igual que en los dict, 0 publicaciones cuenta como dato ausente (``UserRow`` no tiene ``posts``).
+        followers = row.followers
+        media_count = row.media_count or None
+        is_private = row.is_private
+        is_verified = row.is_verified
+        has_highlights = row.has_highlight_reels
+    else:
         followers = row.get("followers")
         media_count = row.get("media_count") or row.get("posts")
         is_private = row.get("is_private")
         is_verified = row.get("is_verified")
         has_highlights = row.get("has_highlight_reels") or row.get("has_highlights")
 
-        if criteria.min_followers is not None and (followers is None or followers < criteria.min_followers):
-            continue
-        if criteria.max_followers is not None and (followers is None or followers > criteria.max_followers):
-            continue
-        if criteria.min_posts is not None and (media_count is None or media_count < criteria.min_posts):
-            continue
-        if criteria.require_public is not None:
-            if criteria.require_public and is_private:
-                continue
-            if not criteria.require_public and not is_private:
-                continue
-        if criteria.require_verified is True and not is_verified:
-            continue
-        if criteria.require_highlights is True and not has_highlights:
+    if criteria.min_followers is not None and (followers is None or followers < criteria.min_followers):
+        return False
+    if criteria.max_followers is not None and (followers is None or followers > criteria.max_followers):
+        return False
+    if criteria.min_posts is not None and (media_count is None or media_count < criteria.min_posts):
+        return False
+    if criteria.require_public is not None:
+        if criteria.require_public and is_private:
+            return False
+        if not criteria.require_public and not is_private:
+            return False
+    if criteria.require_verified is True and not is_verified:
+        return False
+    if criteria.require_highlights is True and not has_highlights:
+        return False
+    return criteria.compiled is None or criteria.compiled(row)
+
+
+def iter_filters(
+    rows: Iterable[Mapping],
+    criteria: FilterCriteria,
+    metrics: RunMetrics | None = None,
+) -> Iterator[Mapping]:
+    """Lazily yields the rows that satisfy ``criteria``."""
+    for row in rows:
+        if metrics is None:
+            if matches(row, criteria):
+                yield row
             continue
-        filtered.append(row)
+        start = time.perf_counter()
+        matched = matches(row, criteria)
+        metrics.add_stage("filter", time.perf_counter() - start)
+        metrics.count("processed")
+        if matched:
+            metrics.count("kept")
+            yield row
+
+
+def apply_filters(
+    rows: Iterable[Mapping],
+    criteria: FilterCriteria,
+    metrics: RunMetrics | None = None,
+) -> List[Mapping]:
+    return list(iter_filters(rows, criteria, metrics))
+
+
+def filter_mask(frame, criteria: FilterCriteria):
+    """Evaluates ``criteria`` as a boolean mask over a DataFrame.
+
+    Mirrors ``matches`` row by row: missing values (None/NaN/NA) behave like
+    ``None``, ``media_count`` falls back to ``posts`` when it is falsy and
+    ``has_highlight_reels`` falls back to ``has_highlights``. The
+    ``expression`` adds its own vectorized mask.
+    """
+    import pandas as pd
+
+    mask = pd.Series(True, index=frame.index)
+    followers = numeric(column(frame, "followers"))
+    if criteria.min_followers is not None:
+        mask &= (followers >= criteria.min_followers).fillna(False)
+    if criteria.max_followers is not None:
+        mask &= (followers <= criteria.max_followers).fillna(False)
+    if criteria.min_posts is not None:
+        media_count = column(frame, "media_count")
+        posts = numeric(column(frame, "posts"))
+        effective = numeric(media_count).where(truthy(media_count), posts)
+        mask &= (effective >= criteria.min_posts).fillna(False)
+    if criteria.require_public is not None:
+        is_private = truthy(column(frame, "is_private"))
+        mask &= ~is_private if criteria.require_public else is_private
+    if criteria.require_verified is True:
+        mask &= truthy(column(frame, "is_verified"))
+    if criteria.require_highlights is True:
+        mask &= truthy(column(frame, "has_highlight_reels")) | truthy(column(frame, "has_highlights"))
+    if criteria.compiled is not None:
+        mask &= criteria.compiled.mask(frame)
+    return mask
+
+
+def apply_filters_frame(frame, criteria: FilterCriteria, metrics: RunMetrics | None = None):
+    """Vectorized counterpart of ``apply_filters`` for DataFrames."""
+    if metrics is None:
+        return frame[filter_mask(frame, criteria)]
+    with metrics.timed("filter"):
+        filtered = frame[filter_mask(frame, criteria)]
+    metrics.count("processed", len(frame))
+    metrics.count("kept", len(filtered))
     return filtered
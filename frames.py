@@ -0,0 +1,32 @@
+"""DataFrame column helpers shared by the vectorized filters."""
+from __future__ import annotations
+
+
+def column(frame, name: str):
+    """Column ``name`` of ``frame``, or an all-missing column when the file lacks it."""
+    import pandas as pd
+
+    if name in frame.columns:
+        return frame[name]
+    return pd.Series(float("nan"), index=frame.index, dtype="float64")
+
+
+def truthy(series):
+    """Python truthiness of every value; missing values are ``False``."""
+    from pandas.api.types import is_bool_dtype, is_numeric_dtype
+
+    if is_bool_dtype(series.dtype):
+        return series.fillna(False).astype(bool)
+    if is_numeric_dtype(series.dtype):
+        return series.fillna(0).astype(bool)
+    return series.astype(object).where(series.notna(), False).astype(bool)
+
+
+def numeric(series):
+    """``series`` as numbers; values that are not numbers become missing."""
+    import pandas as pd
+    from pandas.api.types import is_bool_dtype, is_numeric_dtype
+
+    if is_numeric_dtype(series.dtype) and not is_bool_dtype(series.dtype):
+        return series
+    return pd.to_numeric(series.astype(object).where(series.notna(), None), errors="coerce")
@@ -0,0 +1,747 @@
+"""Menú interactivo del Instagram Scraper CLI."""
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import asdict
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Iterable, List
+
+from rich import box
+from rich.console import Console
+from rich.panel import Panel
+from rich.prompt import Confirm, IntPrompt, Prompt
+from rich.table import Table
+
+from filters import FilterCriteria, apply_filters_frame
+from metrics import RunMetrics
+from output import OutputOptions, open_output
+from targeting import ScrapeTarget
+from utils import (
+    APP_HEADER,
+    COMPRESSIONS,
+    OUTPUT_FORMATS,
+    clear_session_files,
+    delta_path,
+    filtered_output_path,
+    frame_to_rows,
+    get_results_root,
+    get_session_path,
+    hashtag_output_path,
+    list_result_files,
+    load_session_meta,
+    open_result_writer,
+    read_results,
+    relation_output_path,
+    report_path,
+    result_fields,
+    result_format,
+    result_shards,
+    save_session_meta,
+    write_csv,
+)
+
+if TYPE_CHECKING:  # pragma: no cover - solo para anotaciones
+    from scraper import ScrapeStream, ScraperService
+
+console = Console()
+
+PREVIEW_ROWS = 10
+
+
+class ServiceLoader:
+    """Builds the ``ScraperService`` in a background thread.
+
+    Importing instagrapi and validating the saved session dominate the
+    start-up time, so the menu renders right away and the first option that
+    needs the service waits for it.
+    """
+
+    def __init__(self, factory: Callable[[], "ScraperService"]) -> None:
+        self._future: Future = Future()
+        self._thread = threading.Thread(target=self._run, args=(factory,), name="service-loader", daemon=True)
+        self._thread.start()
+
+    def _run(self, factory: Callable[[], "ScraperService"]) -> None:
+        try:
+            service = factory()
+            # El servicio ya no valida la sesión al crearse; se hace aquí para saludar sin frenar el menú.
+            service.is_logged_in()
+            self._future.set_result(service)
+        except BaseException as exc:  # noqa: BLE001 - se propaga al hilo principal en get()
+            self._future.set_exception(exc)
+
+    def ready(self) -> bool:
+        return self._future.done()
+
+    def get(self) -> "ScraperService":
+        if not self.ready():
+            with console.status("Validando la sesión guardada..."):
+                return self._future.result()
+        return self._future.result()
+
+
+def render_header(subtitle: str | None = None) -> None:
+    text = APP_HEADER
+    if subtitle:
+        text += f"\n[bold cyan]{subtitle}[/bold cyan]"
+    console.print(Panel(text, expand=False, border_style="magenta", box=box.DOUBLE))
+
+
+def prompt_filters() -> FilterCriteria | None:
+    console.print("\n[bold]Configurar filtros opcionales[/bold]")
+    if not Confirm.ask("¿Deseas aplicar filtros a los resultados?", default=False):
+        return None
+
+    console.print(
+        "Puedes escribir una expresión, por ejemplo "
+        "[cyan]followers between 1k and 50k and not is_private and full_name ~ /coach/i[/cyan]"
+    )
+    while True:
+        expression = Prompt.ask("Expresión de filtro (enter para responder preguntas)", default="", show_default=False)
+        if not expression.strip():
+            break
+        try:
+            return FilterCriteria.from_expression(expression)
+        except ValueError as exc:
+            console.print(f"[red]{exc}[/red]")
+
+    min_followers = _prompt_optional_int("Mínimo de seguidores (enter para omitir): ")
+    max_followers = _prompt_optional_int("Máximo de seguidores (enter para omitir): ")
+    min_posts = _prompt_optional_int("Mínimo de publicaciones (enter para omitir): ")
+
+    require_public: bool | None = None
+    if Confirm.ask("¿Filtrar por cuentas públicas?", default=False):
+        require_public = True
+    elif Confirm.ask("¿Filtrar por cuentas privadas?", default=False):
+        require_public = False
+
+    require_verified = Confirm.ask("¿Solo cuentas verificadas?", default=False)
+    require_highlights = Confirm.ask("¿Solo cuentas con historias destacadas?", default=False)
+
+    return FilterCriteria(
+        min_followers=min_followers,
+        max_followers=max_followers,
+        min_posts=min_posts,
+        require_public=require_public,
+        require_verified=require_verified,
+        require_highlights=require_highlights,
+    )
+
+
+def _prompt_optional_int(message: str) -> int | None:
+    value = Prompt.ask(message, default="", show_default=False)
+    if not value:
+        return None
+    try:
+        number = int(value)
+    except ValueError:
+        console.print("[red]Valor inválido. Se ignorará.")
+        return None
+    return number
+
+
+def ensure_logged_in(service: ScraperService) -> bool:
+    if service.is_logged_in():
+        return True
+    console.print("[yellow]No hay una sesión activa. Inicia sesión primero.[/yellow]")
+    return False
+
+
+def handle_login(service: ScraperService) -> None:
+    render_header("Inicio de sesión")
+    session_path = get_session_path()
+    meta = load_session_meta()
+
+    if session_path.exists():
+        msg = "Se encontró una sesión guardada."
+        if meta.get("username"):
+            msg += f" Usuario almacenado: [bold]{meta['username']}[/bold]."
+        console.print(msg)
+        if Confirm.ask("¿Quieres intentar reutilizar la sesión existente?", default=True):
+            try:
+                client = service.ensure_client()
+                client.load_settings(str(session_path))
+                client.account_info()
+                service.mark_authenticated(meta.get("username"))
+                console.print("[green]Sesión reutilizada correctamente.[/green]\n")
+                return
+            except Exception as exc:  # pragma: no cover
+                console.print(
+                    f"[yellow]No fue posible reutilizar la sesión automáticamente: {exc}. Se solicitarán credenciales.[/yellow]"
+                )
+
+    username = Prompt.ask("Usuario de Instagram", default=meta.get("username", ""))
+    if not username:
+        console.print("[red]Debes ingresar un usuario válido.[/red]")
+        return
+    password = Prompt.ask("Contraseña", password=True)
+    if not password:
+        console.print("[red]Debes ingresar una contraseña.[/red]")
+        return
+
+    from instagrapi.exceptions import TwoFactorRequired
+
+    try:
+        service.login(username, password)
+    except TwoFactorRequired:
+        code = Prompt.ask("Código 2FA", password=True)
+        try:
+            service.login(username, password, verification_code=code)
+        except Exception as exc:
+            console.print(f"[red]No se pudo completar el inicio de sesión: {exc}[/red]")
+            return
+    except Exception as exc:
+        console.print(f"[red]{exc}[/red]")
+        return
+
+    save_session_meta({"username": username})
+    console.print("[green]Inicio de sesión exitoso.[/green]")
+
+
+def handle_hashtag(service: ScraperService) -> None:
+    render_header("Scraping por hashtag")
+    if not ensure_logged_in(service):
+        return
+
+    hashtag = Prompt.ask("Hashtag (sin #)").strip().lstrip("#")
+    if not hashtag:
+        console.print("[red]Debes ingresar un hashtag válido.[/red]")
+        return
+
+    amount = IntPrompt.ask("Cantidad máxima de publicaciones a analizar", default=100)
+    criteria = prompt_filters()
+    output_format = _prompt_output_format()
+    options = _prompt_output_options()
+    target = _prompt_target()
+    refresh_age = None
+    if service.result_store.last_snapshot(hashtag, "hashtag")[0] is not None and Confirm.ask(
+        "Ya hay un scraping anterior de este hashtag. "
+        "¿Consultar solo autores nuevos o desactualizados (con archivo delta)?",
+        default=True,
+    ):
+        refresh_age = _prompt_refresh_age()
+
+    try:
+        stream = service.stream_hashtag(hashtag, amount, criteria, refresh_age=refresh_age, target=target)
+    except Exception as exc:
+        console.print(f"[red]{exc}[/red]")
+        return
+
+    output_path = hashtag_output_path(hashtag, output_format, options.compression)
+    preview = _stream_to_file(stream, output_path, _csv_fields(), output_format, options=options)
+    if preview is None:
+        return
+    console.print(f"[green]Resultados guardados en {output_path}[/green]")
+
+    _render_rows_table(preview, subtitle=stream.description)
+    _render_metrics(stream.metrics)
+    _render_pacing(service)
+
+
+def handle_profiles(service: ScraperService) -> None:
+    render_header("Scraping por perfiles")
+    if not ensure_logged_in(service):
+        return
+
+    mode = Prompt.ask(
+        "¿Cómo deseas proporcionar los usuarios? [1] Lista manual, [2] Archivo .txt",
+        choices=["1", "2"],
+        default="1",
+    )
+    usernames: List[str] = []
+    if mode == "1":
+        raw = Prompt.ask("Usernames separados por coma")
+        usernames = [item.strip() for item in raw.split(",") if item.strip()]
+    else:
+        file_path = Prompt.ask("Ruta del archivo .txt con usernames")
+        path = Path(file_path).expanduser()
+        if not path.exists():
+            console.print("[red]El archivo indicado no existe.[/red]")
+            return
+        usernames = [line.strip() for line in path.read_text(encoding="utf-8").splitlines() if line.strip()]
+
+    if not usernames:
+        console.print("[red]No se proporcionaron usuarios válidos.[/red]")
+        return
+
+    relation = Prompt.ask("¿Qué deseas obtener?", choices=["followers", "following"], default="followers")
+    criteria = prompt_filters()
+    output_format = _prompt_output_format()
+    options = _prompt_output_options()
+
+    limit = IntPrompt.ask("Máximo de cuentas a listar por perfil (0 = todas)", default=0) or None
+    target = _prompt_target()
+
+    resume = incremental = False
+    refresh_age = None
+    journal = service.checkpoints
+    completed = [name for name in usernames if journal.is_complete(name, relation)]
+    pending = [name for name in usernames if journal.has_progress(name, relation) and name not in completed]
+    if completed:
+        console.print(f"Ya se completaron {relation} de: [bold]{', '.join(completed)}[/bold].")
+        incremental = Confirm.ask("¿Deseas obtener solo las cuentas nuevas desde entonces?", default=True)
+        if not incremental and Confirm.ask(
+            "¿Reescanear la lista completa consultando solo cuentas nuevas o desactualizadas (con archivo delta)?",
+            default=True,
+        ):
+            refresh_age = _prompt_refresh_age()
+    if pending and not incremental and refresh_age is None:
+        console.print(f"Hay progreso guardado de {relation} para: [bold]{', '.join(pending)}[/bold].")
+        resume = Confirm.ask("¿Deseas reanudar desde el último checkpoint?", default=True)
+
+    append = resume or incremental
+    fieldnames = _csv_fields(extra_source=True)
+    running: dict[str, ScrapeStream] = {}
+    lock = threading.Lock()
+
+    def progress_text() -> str:
+        with lock:
+            parts = [f"{name}: {stream.stats.kept}/{stream.stats.found}" for name, stream in running.items()]
+        return "Procesando perfiles... " + (" · ".join(parts) or "iniciando")
+
+    def consume(username: str, stream: ScrapeStream) -> List[dict]:
+        # Corre en un hilo por perfil; solo escribe su archivo y actualiza el estado.
+        with lock:
+            running[username] = stream
+        output_path = relation_output_path(username, relation, output_format, options.compression)
+        try:
+            preview = _write_rows(
+                stream,
+                output_path,
+                fieldnames,
+                output_format,
+                append,
+                on_row=lambda: status.update(progress_text()),
+                options=options,
+            )
+        except Exception as exc:
+            _write_report(stream, output_path, error=str(exc))
+            raise
+        finally:
+            with lock:
+                running.pop(username, None)
+        _write_report(stream, output_path)
+        return preview
+
+    try:
+        outcomes = service.run_profile_relations(
+            usernames,
+            relation,
+            consume,
+            criteria,
+            resume=resume,
+            limit=limit,
+            incremental=incremental,
+            refresh_age=refresh_age,
+            target=target,
+        )
+    except Exception as exc:
+        console.print(f"[red]{exc}[/red]")
+        return
+
+    with console.status(progress_text()) as status:
+        for outcome in outcomes:
+            output_path = relation_output_path(outcome.username, relation, output_format, options.compression)
+            if outcome.ok:
+                console.print(f"[green]Resultados para {outcome.username} guardados en {output_path}[/green]")
+                _render_rows_table(outcome.value, subtitle=outcome.stream.description)
+            else:
+                console.print(f"[red]{outcome.username}: {outcome.error}[/red]")
+                if outcome.stream.stats.kept:
+                    console.print(
+                        f"[yellow]Se conservaron {outcome.stream.stats.kept} resultados parciales en {output_path}[/yellow]"
+                    )
+            _render_metrics(outcome.stream.metrics)
+            status.update(progress_text())
+    _render_pacing(service)
+
+
+def handle_filters_existing() -> None:
+    render_header("Filtrar resultados existentes")
+    files = list_result_files()
+    if not files:
+        console.print("[yellow]Aún no hay archivos de resultados guardados para filtrar.[/yellow]")
+        return
+
+    table = Table(title="Archivos disponibles", show_lines=True)
+    table.add_column("#")
+    table.add_column("Ruta")
+    table.add_column("Partes", justify="right")
+    for idx, path in enumerate(files, start=1):
+        table.add_row(str(idx), str(path), str(len(result_shards(path)) or 1))
+    console.print(table)
+
+    choice = Prompt.ask("Selecciona un archivo por número", choices=[str(i) for i in range(1, len(files) + 1)])
+    input_path = files[int(choice) - 1]
+    criteria = prompt_filters()
+    if criteria is None:
+        console.print("[yellow]No se aplicaron filtros. Nada que hacer.[/yellow]\n")
+        return
+
+    metrics = RunMetrics(f"filtro:{input_path.name}")
+    try:
+        with metrics.timed("read"):
+            df = read_results(input_path)
+    except Exception as exc:
+        console.print(f"[red]No se pudo leer {input_path}: {exc}[/red]")
+        return
+    filtered = frame_to_rows(apply_filters_frame(df, criteria, metrics))
+    if not filtered:
+        console.print("[yellow]Ningún registro coincide con los filtros seleccionados.[/yellow]")
+        return
+
+    output_path = filtered_output_path(input_path)
+    output_format, compression = result_format(input_path)
+    has_source = "source" in df.columns
+    with open_result_writer(
+        output_path, _csv_fields(extra_source=has_source), output_format, metrics=metrics, compression=compression
+    ) as writer:
+        for row in filtered:
+            writer.write(row)
+    metrics.finish()
+    metrics.write_report(report_path(output_path), input=str(input_path), output=str(output_path))
+    console.print(f"[green]Archivo filtrado guardado en {output_path}[/green]")
+    _render_rows_table(filtered[:10], subtitle="Vista previa del filtrado")
+    _render_metrics(metrics)
+
+
+def handle_store_queries(service: ScraperService) -> None:
+    render_header("Base local de resultados")
+    store = service.result_store
+    mode = Prompt.ask(
+        "[1] Filtrar perfiles guardados, [2] Cuentas únicas de varios hashtags, "
+        "[3] Seguidores/seguidos compartidos entre perfiles",
+        choices=["1", "2", "3"],
+        default="1",
+    )
+
+    if mode == "1":
+        relation = Prompt.ask(
+            "Relación", choices=["todas", "hashtag", "followers", "following"], default="todas"
+        )
+        criteria = prompt_filters()
+        rows = store.query(criteria, relation=None if relation == "todas" else relation)
+        export_name = "perfiles_filtrados"
+    else:
+        relation = "hashtag" if mode == "2" else Prompt.ask(
+            "Relación", choices=["followers", "following"], default="followers"
+        )
+        available = store.sources(relation)
+        if not available:
+            console.print("[yellow]La base aún no tiene resultados para esa relación.[/yellow]")
+            return
+        console.print(f"Disponibles: {', '.join(available)}")
+        raw = Prompt.ask("Fuentes separadas por coma (enter para todas)", default="", show_default=False)
+        sources = [item.strip().lstrip("#") for item in raw.split(",") if item.strip()] or available
+        if mode == "2":
+            rows = store.query(prompt_filters(), relation="hashtag", sources=sources)
+            export_name = "hashtags_unicos"
+        else:
+            min_sources = IntPrompt.ask("Mínimo de perfiles en común", default=2)
+            rows = store.shared_profiles(sources, relation, min_sources=min_sources)
+            export_name = f"{relation}_compartidos"
+
+    if not rows:
+        console.print("[yellow]Ninguna cuenta coincide con la consulta.[/yellow]")
+        return
+    output_path = get_results_root() / "base" / f"{export_name}.csv"
+    write_csv(output_path, _csv_fields(extra_source=True), rows)
+    console.print(f"[green]{len(rows)} cuentas exportadas a {output_path}[/green]")
+    _render_rows_table(rows[:PREVIEW_ROWS], subtitle="Vista previa de la consulta")
+
+
+def handle_configuration(service: ScraperService) -> None:
+    render_header("Configuración y sesión")
+    session_path = get_session_path()
+    meta = load_session_meta()
+
+    info_table = Table(show_header=False, box=box.SIMPLE_HEAVY)
+    info_table.add_row("Sesión activa", "Sí" if service.is_logged_in() else "No")
+    info_table.add_row("Usuario autenticado", service.logged_username or "-")
+    info_table.add_row("Archivo de sesión", str(session_path))
+    info_table.add_row("Resultados", str(get_results_root()))
+    info_table.add_row("Usuario guardado", meta.get("username", "-"))
+    info_table.add_row("Ritmo actual", f"{service.pacer.current_rate * 60:.1f} solicitudes/min")
+    info_table.add_row("Pausas por rate limit", str(len(service.pacer.history)))
+    console.print(info_table)
+    _render_session_pool(service)
+    _render_proxy_pool(service)
+
+    if session_path.exists() and Confirm.ask("¿Deseas eliminar la sesión guardada?", default=False):
+        clear_session_files()
+        console.print("[green]La sesión guardada se eliminó correctamente.[/green]")
+
+
+def handle_exit() -> None:
+    console.print("Gracias por usar INSTAGRAM SCRAPER CLI - propiedad de matidiazlife/elite")
+
+
+def _render_rows_table(rows: Iterable[dict], subtitle: str | None = None) -> None:
+    if not rows:
+        console.print("[yellow]No hay datos para mostrar.[/yellow]")
+        return
+
+    table = Table(title=subtitle or "Resultados", box=box.SIMPLE_HEAVY)
+    columns = [
+        "username",
+        "full_name",
+        "followers",
+        "following",
+        "media_count",
+        "is_private",
+        "is_verified",
+        "has_highlight_reels",
+    ]
+    if any("source" in row for row in rows):
+        columns.append("source")
+
+    for col in columns:
+        table.add_column(col)
+
+    for row in rows:
+        table.add_row(*(str(row.get(col, "")) for col in columns))
+
+    console.print(table)
+
+
+def _render_pacing(service: ScraperService) -> None:
+    pacer = service.pacer
+    console.print(f"Ritmo actual: {pacer.current_rate * 60:.1f} solicitudes/min")
+    _render_session_pool(service)
+    if not pacer.history:
+        return
+    table = Table(title="Pausas por rate limit", box=box.SIMPLE_HEAVY)
+    table.add_column("Hora")
+    table.add_column("Motivo")
+    table.add_column("Pausa (s)")
+    table.add_column("Nuevo ritmo (sol/min)")
+    for event in pacer.history[-PREVIEW_ROWS:]:
+        table.add_row(
+            time.strftime("%H:%M:%S", time.localtime(event.timestamp)),
+            event.reason,
+            f"{event.delay:.0f}",
+            f"{event.rate * 60:.1f}",
+        )
+    console.print(table)
+
+
+def _render_session_pool(service: ScraperService) -> None:
+    if service.session_pool is None:
+        return
+    table = Table(title="Cuentas del pool", box=box.SIMPLE_HEAVY)
+    table.add_column("Cuenta")
+    table.add_column("Solicitudes")
+    table.add_column("Errores")
+    table.add_column("Cuarentenas")
+    table.add_column("Estado")
+    for entry in service.session_pool.report():
+        table.add_row(
+            entry["account"], str(entry["requests"]), str(entry["errors"]), str(entry["quarantines"]), entry["status"]
+        )
+    console.print(table)
+
+
+def _render_proxy_pool(service: ScraperService) -> None:
+    if service.proxy_pool is None:
+        return
+    table = Table(title="Proxies", box=box.SIMPLE_HEAVY)
+    table.add_column("Proxy")
+    table.add_column("Solicitudes")
+    table.add_column("Errores")
+    table.add_column("Latencia")
+    table.add_column("Estado")
+    for entry in service.proxy_pool.report():
+        latency = f"{entry['latency_ms']:.0f} ms" if entry["latency_ms"] is not None else "-"
+        table.add_row(entry["proxy"], str(entry["requests"]), str(entry["errors"]), latency, entry["status"])
+    console.print(table)
+
+
+def _prompt_output_format() -> str:
+    return Prompt.ask("Formato de salida", choices=list(OUTPUT_FORMATS), default="csv")
+
+
+def _prompt_output_options() -> OutputOptions:
+    compression = Prompt.ask("Compresión", choices=["ninguna", *COMPRESSIONS], default="ninguna")
+    return OutputOptions(compression=None if compression == "ninguna" else compression)
+
+
+def _prompt_refresh_age() -> float:
+    """Seconds after which a stored profile is requested again in refresh mode."""
+    return IntPrompt.ask("Días tras los que un perfil guardado se vuelve a consultar", default=7) * 86400
+
+
+def _prompt_target() -> ScrapeTarget | None:
+    matches = IntPrompt.ask("Detenerse al conseguir cuántas cuentas que cumplan los filtros (0 = sin objetivo)", default=0)
+    requests = IntPrompt.ask("Máximo de solicitudes a gastar (0 = sin límite)", default=0)
+    if matches <= 0 and requests <= 0:
+        return None
+    return ScrapeTarget(matches=matches if matches > 0 else None, requests=requests if requests > 0 else None)
+
+
+def _stream_to_file(
+    stream: ScrapeStream,
+    output_path: Path,
+    fieldnames: List[str],
+    output_format: str = "csv",
+    append: bool = False,
+    options: OutputOptions | None = None,
+) -> List[dict] | None:
+    """Appends the rows of ``stream`` to ``output_path`` as they arrive.
+
+    Returns the first rows for the preview table, or ``None`` if the scrape
+    failed (rows written until then are kept on disk).
+    """
+    try:
+        with console.status("Procesando cuentas...") as status:
+            preview = _write_rows(
+                stream,
+                output_path,
+                fieldnames,
+                output_format,
+                append,
+                on_row=lambda: status.update(f"Procesando cuentas... {stream.description}"),
+                options=options,
+            )
+    except Exception as exc:
+        console.print(f"[red]{exc}[/red]")
+        if stream.stats.kept:
+            console.print(
+                f"[yellow]Se conservaron {stream.stats.kept} resultados parciales en {output_path}[/yellow]"
+            )
+        _write_report(stream, output_path, error=str(exc))
+        _render_metrics(stream.metrics)
+        return None
+    _write_report(stream, output_path)
+    return preview
+
+
+def _write_rows(
+    stream: ScrapeStream,
+    output_path: Path,
+    fieldnames: List[str],
+    output_format: str,
+    append: bool,
+    on_row: Callable[[], None] | None = None,
+    options: OutputOptions | None = None,
+) -> List[dict]:
+    """Writes every row of ``stream`` and returns the first ones for the preview."""
+    preview: List[dict] = []
+    with open_output(
+        output_path,
+        fieldnames,
+        output_format,
+        append=append,
+        metrics=stream.metrics,
+        options=options,
+        checkpoints=stream.checkpoints,
+    ) as writer:
+        for row in stream:
+            writer.write(row)
+            if len(preview) < PREVIEW_ROWS:
+                preview.append(row)
+            if on_row is not None:
+                on_row()
+    return preview
+
+
+def _write_report(stream: ScrapeStream, output_path: Path, **extra: object) -> None:
+    stream.metrics.finish()
+    try:
+        stream.metrics.write_report(
+            report_path(output_path), output=str(output_path), stats=asdict(stream.stats), **extra
+        )
+        if stream.delta is not None:
+            stream.delta.write(delta_path(output_path))
+    except OSError as exc:
+        console.print(f"[yellow]No se pudo guardar el reporte de la ejecución: {exc}[/yellow]")
+
+
+def _render_metrics(metrics: RunMetrics) -> None:
+    """Summary of where the time of a run went."""
+    report = metrics.report()
+    table = Table(title="Métricas de la ejecución", box=box.SIMPLE_HEAVY)
+    table.add_column("Endpoint")
+    table.add_column("Solicitudes", justify="right")
+    table.add_column("Errores", justify="right")
+    table.add_column("p50 (ms)", justify="right")
+    table.add_column("p95 (ms)", justify="right")
+    table.add_column("Máx (ms)", justify="right")
+    table.add_column("Total (s)", justify="right")
+    for endpoint, latency in report["requests"].items():
+        errors = sum(report["errors"].get(endpoint, {}).values())
+        table.add_row(
+            endpoint,
+            str(latency["count"]),
+            str(errors),
+            f"{latency['p50_ms']:.0f}",
+            f"{latency['p95_ms']:.0f}",
+            f"{latency['max_ms']:.0f}",
+            f"{latency['total_s']:.1f}",
+        )
+    if report["requests"]:
+        console.print(table)
+
+    summary = Table(show_header=False, box=box.SIMPLE_HEAVY)
+    summary.add_row("Duración total", f"{report['wall_s']:.1f} s")
+    summary.add_row("En solicitudes", f"{report['request_s']:.1f} s")
+    summary.add_row("En esperas (ritmo y pausas)", f"{report['sleep_s']:.1f} s")
+    for stage, seconds in report["stages_s"].items():
+        summary.add_row(f"Etapa: {stage}", f"{seconds:.2f} s")
+    for counter, rate in report["rows_per_s"].items():
+        summary.add_row(f"Filas/s ({counter})", f"{rate:.1f}")
+    console.print(summary)
+
+
+def _csv_fields(extra_source: bool | None = False) -> List[str]:
+    return result_fields(extra_source)
+
+
+def _greet(service: ScraperService) -> None:
+    if service.is_logged_in():
+        username = service.logged_username or "(usuario desconocido)"
+        console.print(
+            f"[green]Sesión restaurada automáticamente. Usuario autenticado: [bold]{username}[/bold].[/green]\n"
+        )
+
+
+def interactive_loop(loader: ServiceLoader) -> None:
+    options = {
+        "1": handle_login,
+        "2": handle_hashtag,
+        "3": handle_profiles,
+        "4": lambda svc: handle_filters_existing(),
+        "5": handle_store_queries,
+        "6": handle_configuration,
+        "7": lambda svc: handle_exit(),
+    }
+
+    greeted = False
+    while True:
+        if not greeted and loader.ready():
+            _greet(loader.get())
+            greeted = True
+        render_header("Menú principal")
+        console.print(
+            "===========================================\n"
+            "1. Iniciar sesión en Instagram\n"
+            "2. Hacer scraping por hashtags\n"
+            "3. Hacer scraping por perfiles\n"
+            "4. Aplicar filtros a resultados existentes\n"
+            "5. Consultar la base local de resultados\n"
+            "6. Configuración y sesión actual\n"
+            "7. Salir\n"
+        )
+        choice = Prompt.ask("Seleccione una opción (1-7)", choices=list(options.keys()))
+        if choice == "7":
+            handle_exit()
+            break
+        handler = options[choice]
+        if choice == "4":
+            handler(None)  # type: ignore[arg-type]
+            continue
+        if not greeted:
+            _greet(loader.get())
+            greeted = True
+        handler(loader.get())
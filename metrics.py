@@ -0,0 +1,157 @@
+"""Run instrumentation: request latencies, waits, stage timings and throughput."""
+from __future__ import annotations
+
+import json
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator
+
+# Límites superiores (ms) de cada cubeta del histograma; la última cubeta no tiene límite.
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram with approximate percentiles."""
+
+    __slots__ = ("counts", "count", "total", "minimum", "maximum")
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.minimum = float("inf")
+        self.maximum = 0.0
+
+    def add(self, seconds: float) -> None:
+        self.counts[bisect_left(LATENCY_BUCKETS_MS, seconds * 1000)] += 1
+        self.count += 1
+        self.total += seconds
+        self.minimum = min(self.minimum, seconds)
+        self.maximum = max(self.maximum, seconds)
+
+    def quantile(self, q: float) -> float:
+        """Upper bound (ms) of the bucket holding the ``q`` quantile, capped at the maximum."""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= target and bucket_count:
+                bound = LATENCY_BUCKETS_MS[index] if index < len(LATENCY_BUCKETS_MS) else float("inf")
+                return min(bound, self.maximum * 1000)
+        return self.maximum * 1000
+
+    def as_dict(self) -> dict:
+        labels = [f"<={bound}ms" for bound in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}ms"]
+        return {
+            "count": self.count,
+            "total_s": round(self.total, 3),
+            "mean_ms": round(self.total / self.count * 1000, 1) if self.count else 0.0,
+            "min_ms": round(self.minimum * 1000, 1) if self.count else 0.0,
+            "p50_ms": round(self.quantile(0.5), 1),
+            "p95_ms": round(self.quantile(0.95), 1),
+            "max_ms": round(self.maximum * 1000, 1),
+            "buckets": {label: count for label, count in zip(labels, self.counts) if count},
+        }
+
+
+class RunMetrics:
+    """Thread-safe collector for one scrape (or filter) run.
+
+    ``requests`` holds a latency histogram per endpoint, ``sleep`` the time
+    workers spent waiting on the rate limiter or a backoff, and ``stages``
+    the time spent in local work such as filtering, storing and writing.
+    """
+
+    def __init__(self, label: str = "") -> None:
+        self.label = label
+        self.started_at = time.time()
+        self._started = time.perf_counter()
+        self._finished: float | None = None
+        self.requests: Dict[str, LatencyHistogram] = defaultdict(LatencyHistogram)
+        self.errors: Dict[str, Counter] = defaultdict(Counter)
+        self.sleep = 0.0
+        self.stages: Dict[str, float] = defaultdict(float)
+        self.counters: Counter = Counter()
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Registro
+    # ------------------------------------------------------------------
+    def record_request(self, endpoint: str, seconds: float, error: str | None = None) -> None:
+        with self._lock:
+            self.requests[endpoint].add(seconds)
+            if error is not None:
+                self.errors[endpoint][error] += 1
+
+    def add_sleep(self, seconds: float) -> None:
+        if seconds > 0:
+            with self._lock:
+                self.sleep += seconds
+
+    def add_stage(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self.stages[name] += seconds
+
+    def count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self.counters[name] += amount
+
+    @contextmanager
+    def timed(self, stage: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_stage(stage, time.perf_counter() - start)
+
+    def finish(self) -> None:
+        if self._finished is None:
+            self._finished = time.perf_counter()
+
+    # ------------------------------------------------------------------
+    # Reporte
+    # ------------------------------------------------------------------
+    @property
+    def wall_seconds(self) -> float:
+        end = self._finished if self._finished is not None else time.perf_counter()
+        return end - self._started
+
+    @property
+    def request_seconds(self) -> float:
+        return sum(histogram.total for histogram in self.requests.values())
+
+    @property
+    def request_count(self) -> int:
+        with self._lock:
+            return sum(histogram.count for histogram in self.requests.values())
+
+    def rate(self, counter: str) -> float:
+        wall = self.wall_seconds
+        return self.counters[counter] / wall if wall > 0 else 0.0
+
+    def report(self, **extra: object) -> dict:
+        with self._lock:
+            return {
+                "label": self.label,
+                "started_at": round(self.started_at, 3),
+                "wall_s": round(self.wall_seconds, 3),
+                "request_s": round(self.request_seconds, 3),
+                "sleep_s": round(self.sleep, 3),
+                "stages_s": {name: round(seconds, 3) for name, seconds in sorted(self.stages.items())},
+                "counters": dict(self.counters),
+                "rows_per_s": {name: round(self.rate(name), 2) for name in self.counters},
+                "requests": {endpoint: histogram.as_dict() for endpoint, histogram in sorted(self.requests.items())},
+                "errors": {endpoint: dict(counts) for endpoint, counts in self.errors.items() if counts},
+                **extra,
+            }
+
+    def write_report(self, path: Path, **extra: object) -> Path:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.report(**extra), ensure_ascii=False, indent=2), encoding="utf-8")
+        return path
@@ -0,0 +1,316 @@
+"""Result writers fed through a queue: a background thread writes, compresses and rotates shards."""
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Mapping, Sequence
+
+from checkpoint import CheckpointJournal
+from metrics import RunMetrics
+from utils import COMPRESSIONS, count_result_rows, open_result_writer, result_shards, shard_path
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUEUE_SIZE = 1000
+# Cada cuántas filas se mira el tamaño del shard actual.
+SIZE_CHECK_EVERY = 100
+
+_CLOSE = object()
+
+
+@dataclass
+class OutputOptions:
+    """How scrape results are written.
+
+    ``compression`` is ``gzip`` or ``zstd`` (CSV files get a ``.gz`` /
+    ``.zst`` suffix; Parquet compresses its pages). Past ``max_bytes`` or
+    ``max_rows`` the output rotates into ``<name>.part002<ext>``,
+    ``.part003``... The size counts the bytes already on disk, so
+    compressors that buffer (zstd) can overshoot it a little.
+    ``background=False`` writes on the calling thread.
+    """
+
+    compression: str | None = None
+    max_bytes: int | None = None
+    max_rows: int | None = None
+    background: bool = True
+    queue_size: int = DEFAULT_QUEUE_SIZE
+
+    def __post_init__(self) -> None:
+        if self.compression is not None and self.compression not in COMPRESSIONS:
+            raise ValueError(f"Compresión desconocida: {self.compression!r}. Usa {' o '.join(COMPRESSIONS)}.")
+        for value, label in ((self.max_bytes, "El tamaño máximo"), (self.max_rows, "El máximo de filas")):
+            if value is not None and value <= 0:
+                raise ValueError(f"{label} por archivo debe ser mayor que cero.")
+
+
+class ShardedWriter:
+    """Writes rows to ``path`` and rotates into numbered shards past a size or row threshold.
+
+    ``append`` continues the last existing shard; otherwise shards left by
+    a previous run are deleted first so readers never mix both runs. With
+    ``checkpoints`` the current shard is synced before each journal sync.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        fieldnames: Sequence[str],
+        fmt: str = "csv",
+        append: bool = False,
+        metrics: RunMetrics | None = None,
+        options: OutputOptions | None = None,
+        checkpoints: CheckpointJournal | None = None,
+    ) -> None:
+        self.path = path
+        self.fieldnames = list(fieldnames)
+        self.fmt = fmt
+        self.metrics = metrics
+        self.options = options or OutputOptions()
+        self.rows_written = 0
+        existing = result_shards(path)
+        if not append:
+            for stale in existing[1:]:
+                stale.unlink()
+            existing = []
+        self.index = len(existing) or 1
+        self.shards = [shard_path(path, self.index)]
+        self._shard_rows = 0
+        if existing and self.options.max_rows:
+            self._shard_rows = count_result_rows(existing[-1])
+        self._writer = self._open(append=bool(existing))
+        self._checkpoints = checkpoints
+        if checkpoints is not None:
+            checkpoints.add_sync_hook(self.sync)
+
+    def _open(self, append: bool):
+        return open_result_writer(
+            shard_path(self.path, self.index),
+            self.fieldnames,
+            self.fmt,
+            append=append,
+            metrics=self.metrics,
+            compression=self.options.compression,
+        )
+
+    def _full(self) -> bool:
+        options = self.options
+        if options.max_rows and self._shard_rows >= options.max_rows:
+            return True
+        if options.max_bytes and self._shard_rows % SIZE_CHECK_EVERY == 0 and self._shard_rows:
+            return self._writer.size() >= options.max_bytes
+        return False
+
+    def _rotate(self) -> None:
+        self._writer.close()
+        self.index += 1
+        self.shards.append(shard_path(self.path, self.index))
+        self._shard_rows = 0
+        self._writer = self._open(append=False)
+        logger.info("Resultados continúan en %s", self.shards[-1])
+
+    def write(self, row: Mapping[str, object]) -> None:
+        if self._full():
+            self._rotate()
+        self._writer.write(row)
+        self._shard_rows += 1
+        self.rows_written += 1
+
+    def sync(self) -> None:
+        self._writer.sync()
+
+    def close(self) -> None:
+        if self._checkpoints is not None:
+            self._checkpoints.remove_sync_hook(self.sync)
+            self._checkpoints = None
+        self._writer.close()
+
+    def __enter__(self) -> "ShardedWriter":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+class ResultWriter:
+    """Hands rows to a ``ShardedWriter`` running on its own thread.
+
+    ``write`` only enqueues the row (blocking while ``queue_size`` rows are
+    pending), so compression and disk writes overlap with the scrape.
+    ``sync`` waits until every queued row is on disk and fsynced; with
+    ``checkpoints`` it runs before each journal sync, so the journal never
+    marks as done a row that could still be lost. An error on the writer
+    thread is raised by the next ``write``, ``sync`` or ``close``.
+    """
+
+    def __init__(
+        self,
+        writer: ShardedWriter,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        checkpoints: CheckpointJournal | None = None,
+    ) -> None:
+        self.writer = writer
+        self.metrics = writer.metrics
+        self.rows_written = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, queue_size))
+        self._error: BaseException | None = None
+        self._closed = False
+        self._lock = threading.Lock()
+        self._checkpoints = checkpoints
+        self._thread = threading.Thread(target=self._run, name=f"writer:{writer.path.name}", daemon=True)
+        self._thread.start()
+        if checkpoints is not None:
+            checkpoints.add_sync_hook(self.sync)
+
+    @property
+    def shards(self) -> list[Path]:
+        return self.writer.shards
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is _CLOSE:
+                try:
+                    if self._error is None:
+                        self.writer.sync()
+                    self.writer.close()
+                except Exception as exc:
+                    self._error = self._error or exc
+                return
+            if isinstance(item, threading.Event):
+                if self._error is None:
+                    try:
+                        self.writer.sync()
+                    except Exception as exc:
+                        self._error = exc
+                item.set()
+                continue
+            if self._error is None:
+                try:
+                    self.writer.write(item)
+                except Exception as exc:
+                    # Se siguen vaciando las filas pendientes para no bloquear al scraper.
+                    self._error = exc
+
+    def _raise_error(self) -> None:
+        if self._error is not None:
+            raise RuntimeError(f"No se pudo escribir {self.writer.path}: {self._error}") from self._error
+
+    def write(self, row: Mapping[str, object]) -> None:
+        self._raise_error()
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            start = time.perf_counter()
+            self._queue.put(row)
+            if self.metrics is not None:
+                self.metrics.add_stage("write_wait", time.perf_counter() - start)
+        self.rows_written += 1
+
+    def sync(self) -> None:
+        done = threading.Event()
+        with self._lock:
+            # Tras cerrar, el hilo ya sincronizó todo lo escrito.
+            if self._closed:
+                return
+            self._queue.put(done)
+        done.wait()
+        self._raise_error()
+
+    def close(self) -> None:
+        if self._checkpoints is not None:
+            self._checkpoints.remove_sync_hook(self.sync)
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_CLOSE)
+        self._thread.join()
+        self._raise_error()
+
+    def __enter__(self) -> "ResultWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        try:
+            self.close()
+        except RuntimeError as error:
+            if exc_type is None:
+                raise
+            # No se tapa el error del scraping con el de la escritura.
+            logger.warning("%s", error)
+
+
+class DeferredOutput:
+    """Opens the writer of a scrape output only once there is something to write.
+
+    Scrape streams are lazy, so opening the output up front would truncate
+    the previous results before the first request, and a run that fails
+    right away (rate limit, challenge...) would leave an empty file behind.
+    The writer opens on the first row, or on a clean exit for a scrape that
+    kept no rows; if the scrape fails before any row, the file is left as is.
+    """
+
+    def __init__(self, opener: Callable[[], "ShardedWriter | ResultWriter"]) -> None:
+        self._opener = opener
+        self._writer: ShardedWriter | ResultWriter | None = None
+
+    def _open(self) -> "ShardedWriter | ResultWriter":
+        if self._writer is None:
+            self._writer = self._opener()
+        return self._writer
+
+    @property
+    def rows_written(self) -> int:
+        return self._writer.rows_written if self._writer is not None else 0
+
+    @property
+    def shards(self) -> list[Path]:
+        return self._writer.shards if self._writer is not None else []
+
+    def write(self, row: Mapping[str, object]) -> None:
+        self._open().write(row)
+
+    def sync(self) -> None:
+        if self._writer is not None:
+            self._writer.sync()
+
+    def close(self) -> None:
+        self._open().close()
+
+    def __enter__(self) -> "DeferredOutput":
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        elif self._writer is not None:
+            self._writer.__exit__(exc_type, exc, traceback)
+
+
+def open_output(
+    path: Path,
+    fieldnames: Sequence[str],
+    fmt: str = "csv",
+    append: bool = False,
+    metrics: RunMetrics | None = None,
+    options: OutputOptions | None = None,
+    checkpoints: CheckpointJournal | None = None,
+):
+    """Writer for a scrape output: a ``ResultWriter`` thread, or the ``ShardedWriter`` itself.
+
+    The file is only opened with the first row (see ``DeferredOutput``).
+    """
+    options = options or OutputOptions()
+
+    def opener() -> ShardedWriter | ResultWriter:
+        if not options.background:
+            return ShardedWriter(path, fieldnames, fmt, append, metrics, options, checkpoints=checkpoints)
+        writer = ShardedWriter(path, fieldnames, fmt, append, metrics, options)
+        return ResultWriter(writer, options.queue_size, checkpoints)
+
+    return DeferredOutput(opener)
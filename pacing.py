@@ -0,0 +1,159 @@
+"""Request pacing primitives shared by the scraping workers."""
+from __future__ import annotations
+
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import List
+
+DEFAULT_DELAY = (2.0, 5.0)
+# Misma cadencia media que el retardo fijo entre solicitudes.
+DEFAULT_RATE = 2.0 / sum(DEFAULT_DELAY)
+DEFAULT_WORKERS = 1
+# Cuentas origen procesadas a la vez; todas comparten el mismo presupuesto de solicitudes.
+DEFAULT_PARALLEL_SOURCES = 3
+
+
+class TokenBucket:
+    """Thread-safe token bucket limiting the global request rate.
+
+    Every request consumes one token. Tokens refill continuously at ``rate``
+    tokens per second up to ``capacity``, so short bursts are allowed while
+    the long-term average never exceeds ``rate``.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0) -> None:
+        if rate <= 0:
+            raise ValueError("La tasa de solicitudes debe ser mayor que cero.")
+        self.rate = rate
+        self.capacity = max(capacity, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._updated = now
+
+    def available(self) -> float:
+        """Tokens currently available, without consuming any."""
+        with self._lock:
+            self._refill(time.monotonic())
+            return self._tokens
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return True
+            return False
+
+    def reserve(self) -> float:
+        """Takes a token and returns 0, or returns how long to wait before trying again.
+
+        Never blocks, so asyncio callers can wait with ``asyncio.sleep``.
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return 0.0
+            return (1.0 - self._tokens) / self.rate
+
+    def acquire(self) -> float:
+        """Blocks until a token is available and returns the time waited."""
+        waited = 0.0
+        while True:
+            delay = self.reserve()
+            if not delay:
+                return waited
+            time.sleep(delay)
+            waited += delay
+
+
+@dataclass
+class BackoffEvent:
+    timestamp: float
+    reason: str
+    rate: float
+    delay: float
+
+
+class AdaptivePacer:
+    """AIMD controller on top of a ``TokenBucket``.
+
+    Every successful request raises the rate additively by ``increase``
+    (up to ``max_rate``). A throttling response multiplies it by
+    ``decrease`` (down to ``min_rate``) and pauses every worker for an
+    exponentially growing, jittered delay.
+
+    ``max_rate`` defaults to the bucket's starting rate, so the pacer only
+    climbs back after a throttle; pass a higher value to let it go faster.
+    """
+
+    def __init__(
+        self,
+        bucket: TokenBucket,
+        min_rate: float = 1 / 60,
+        max_rate: float | None = None,
+        increase: float = 0.005,
+        decrease: float = 0.5,
+        base_backoff: float = 30.0,
+        max_backoff: float = 900.0,
+        jitter: float = 0.25,
+        max_retries: int = 5,
+    ) -> None:
+        self.bucket = bucket
+        self.min_rate = min_rate
+        self.max_rate = bucket.rate if max_rate is None else max(max_rate, bucket.rate)
+        self.increase = increase
+        self.decrease = decrease
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.max_retries = max_retries
+        self.history: List[BackoffEvent] = []
+        self._consecutive_throttles = 0
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def current_rate(self) -> float:
+        return self.bucket.rate
+
+    def reserve(self) -> float:
+        """Non-blocking ``acquire``: 0 once a token was taken, otherwise the time to wait."""
+        with self._lock:
+            remaining = self._paused_until - time.monotonic()
+        if remaining > 0:
+            return remaining
+        return self.bucket.reserve()
+
+    def acquire(self) -> float:
+        """Waits out any active backoff and then takes a token."""
+        waited = 0.0
+        while True:
+            delay = self.reserve()
+            if not delay:
+                return waited
+            time.sleep(delay)
+            waited += delay
+
+    def on_success(self) -> None:
+        with self._lock:
+            self._consecutive_throttles = 0
+            self.bucket.rate = min(self.max_rate, self.bucket.rate + self.increase)
+
+    def on_throttle(self, reason: str) -> float:
+        """Registers a rate limit and returns the pause applied to all workers."""
+        with self._lock:
+            self._consecutive_throttles += 1
+            self.bucket.rate = max(self.min_rate, self.bucket.rate * self.decrease)
+            delay = min(self.max_backoff, self.base_backoff * 2 ** (self._consecutive_throttles - 1))
+            delay *= random.uniform(1 - self.jitter, 1 + self.jitter)
+            self._paused_until = max(self._paused_until, time.monotonic() + delay)
+            self.history.append(BackoffEvent(time.time(), reason, self.bucket.rate, delay))
+            return delay
@@ -3,11 +3,16 @@ from __future__ import annotations
 
 import logging
 import os
-import random
+import threading
 import time
-from dataclasses import dataclass
+from collections import deque
+from contextvars import ContextVar, copy_context
+from itertools import chain
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from functools import partial, update_wrapper
 from pathlib import Path
-from typing import Iterable, List
+from typing import Callable, Iterable, Iterator, List
 
 from compat import ensure_pydantic_compat
 
@@ -20,6 +25,7 @@ try:
         ClientConnectionError,
         ClientError,
         ClientLoginError,
+        ClientNotFoundError,
         LoginRequired,
         PleaseWaitFewMinutes,
         PrivateError,
@@ -32,30 +38,617 @@ except ImportError as exc:  # pragma: no cover - se detecta en tiempo de ejecuci
         "[ERROR] No se pudo importar instagrapi. Ejecuta ./run.sh para reinstalar las dependencias."
     ) from exc
 
-from filters import FilterCriteria, apply_filters
-from utils import load_session_meta
+from cache import ProfileCache
+from checkpoint import CheckpointJournal
+from delta import SnapshotDelta
+from filters import FilterCriteria, matches, rejects_early, short_data
+from metrics import RunMetrics
+from pacing import DEFAULT_PARALLEL_SOURCES, DEFAULT_RATE, DEFAULT_WORKERS, AdaptivePacer, TokenBucket
+from proxies import ProxyPool
+from records import UserRow, row_from_user_json
+from seen import SeenIndex
+from sessions import SessionPool
+from store import ResultStore
+from targeting import STOP_REASONS, ScrapeTarget, TargetQueue
+from utils import (
+    get_checkpoint_path,
+    get_profile_cache_path,
+    get_seen_index_path,
+    get_store_path,
+    load_session_meta,
+)
 
 logger = logging.getLogger(__name__)
 
-DEFAULT_DELAY = (2.0, 5.0)
+# instagrapi deriva estos errores de PrivateError; no deben confundirse con una cuenta privada.
+_SESSION_ERRORS = (RateLimitError, PleaseWaitFewMinutes, LoginRequired, ChallengeRequired)
+
+# Cuentas pedidas por página al listar seguidores/seguidos.
+RELATION_PAGE_SIZE = 100
+RELATION_CHUNK_METHODS = {"followers": "user_followers_v1_chunk", "following": "user_following_v1_chunk"}
+
+# Parámetros con los que instagrapi pide ``users/{pk}/info/`` en ``user_info_v1``.
+USER_INFO_PARAMS = {
+    "is_prefetch": "false",
+    "entry_point": "self_profile",
+    "from_module": "self_profile",
+    "is_app_start": False,
+}
+
+# Métricas del stream que se está consumiendo en el hilo (o contexto) actual.
+_current_metrics: ContextVar[RunMetrics | None] = ContextVar("current_metrics", default=None)
+
+
+def _clone_client(client: Client) -> Client:
+    return Client(settings=client.get_settings(), proxy=getattr(client, "proxy", None))
+
+
+def user_info_raw(client: Client, user_id: object) -> dict | None:
+    """Raw ``user`` object of ``users/{user_id}/info/``, skipping instagrapi's pydantic ``User``.
+
+    Raises ``UserNotFound`` like ``Client.user_info_v1``; ``None`` if the
+    response carries no ``user``.
+    """
+    try:
+        result = client.private_request(f"users/{user_id}/info/", params=USER_INFO_PARAMS)
+    except ClientNotFoundError as exc:
+        raise UserNotFound(f"User {user_id} not found") from exc
+    except ClientError as exc:
+        if "User not found" in str(exc):
+            raise UserNotFound(f"User {user_id} not found") from exc
+        raise
+    user = result.get("user") if isinstance(result, dict) else None
+    return user if isinstance(user, dict) else None
+
+
+def endpoint_name(method: str | Callable) -> str:
+    return method if isinstance(method, str) else getattr(method, "__name__", "request")
+
+
+def bind_endpoint(client: Client, method: str | Callable) -> Callable:
+    """``method`` of ``client``: a method name, or a function taking the client first (``user_info_raw``)."""
+    if isinstance(method, str):
+        return getattr(client, method)
+    return update_wrapper(partial(method, client), method)
+
+
+def media_likes(medias: Iterable) -> dict:
+    """Most likes of any of ``medias`` per author pk, a cheap hint of the author's reach."""
+    likes: dict = {}
+    for media in medias:
+        user = getattr(media, "user", None)
+        count = getattr(media, "like_count", None)
+        if user and count:
+            likes[user.pk] = max(count, likes.get(user.pk, 0))
+    return likes
+
+
+@dataclass
+class ScrapeStats:
+    found: int = 0
+    kept: int = 0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    resumed: int = 0
+    prefiltered: int = 0
+    reused: int = 0
+    pages: int = 0
+    spent_requests: int = 0
+    skipped: int = 0
+    saved_requests: int = 0
+    target_stop: str | None = None
+
+    def describe(self) -> str:
+        text = f"caché: {self.cache_hits} aciertos / {self.cache_misses} fallos"
+        if self.pages:
+            text += f" · {self.pages} páginas"
+        if self.reused:
+            text += f" · {self.reused} ya vistas en ejecuciones recientes"
+        if self.prefiltered:
+            text += f" · {self.prefiltered} consultas evitadas por prefiltro"
+        if self.resumed:
+            text += f" · {self.resumed} ya procesadas en la ejecución anterior"
+        if self.target_stop:
+            text += f" · {STOP_REASONS[self.target_stop]} con {self.spent_requests} consultas"
+            if self.skipped:
+                text += f" ({self.skipped} candidatas sin consultar, ~{self.saved_requests} consultas ahorradas)"
+        return text
+
+
+def describe_hashtag(hashtag: str, criteria: FilterCriteria | None, stats: ScrapeStats) -> str:
+    kept = f"Hashtag #{hashtag} - {stats.kept} cuentas"
+    if criteria:
+        kept += f" (de {stats.found} encontradas)"
+    return f"{kept} · {stats.describe()}"
+
+
+def describe_relation(relation: str, username: str, stats: ScrapeStats) -> str:
+    return f"{relation.title()} de {username}: {stats.kept} resultados · {stats.describe()}"
+
+
+def check_refresh(refresh_age: float | None, resume: bool, incremental: bool) -> None:
+    if refresh_age is None:
+        return
+    if refresh_age < 0:
+        raise ValueError("La antigüedad máxima del reescaneo no puede ser negativa.")
+    if resume or incremental:
+        raise ValueError("El reescaneo con delta lista la relación completa; no se combina con reanudar ni incremental.")
+
+
+def describe_stream(stream) -> str:
+    text = stream.describe(stream.stats)
+    if stream.delta is not None:
+        text += f" · {stream.delta.describe()}"
+    return text
 
 
 @dataclass
 class ScraperResult:
-    rows: List[dict]
+    rows: List[UserRow]
     description: str
+    delta: SnapshotDelta | None = None
+
+
+@dataclass
+class ScrapeStream:
+    """Rows produced lazily by a scrape.
+
+    ``stats`` (and therefore ``description``), ``metrics`` and, in refresh
+    mode, ``delta`` keep updating while ``rows`` is consumed. Relation
+    streams carry their ``checkpoints`` journal so writers can sync with it.
+    """
+
+    rows: Iterator[UserRow]
+    stats: ScrapeStats
+    describe: Callable[[ScrapeStats], str]
+    metrics: RunMetrics = field(default_factory=RunMetrics)
+    delta: SnapshotDelta | None = None
+    checkpoints: CheckpointJournal | None = None
+
+    @property
+    def description(self) -> str:
+        return describe_stream(self)
+
+    def __iter__(self) -> Iterator[UserRow]:
+        return self.rows
+
+    def collect(self) -> ScraperResult:
+        rows = list(self.rows)
+        return ScraperResult(rows, self.description, self.delta)
+
+
+@dataclass
+class SourceOutcome:
+    """Outcome of one source account processed by ``run_profile_relations``.
+
+    ``value`` is whatever the ``consume`` callback returned; when it raised,
+    ``error`` holds the message and ``stream`` still carries the stats and
+    metrics of the rows handled before the failure.
+    """
+
+    username: str
+    stream: ScrapeStream
+    value: object = None
+    error: str | None = None
+    seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class RelationWalk:
+    """Checkpoint bookkeeping of one paginated relation scrape.
+
+    ``page`` turns each listed page into the accounts still to process
+    (deduplicated, skipping those done in earlier runs, up to ``limit``)
+    and decides when listing stops: at the limit, or in ``incremental``
+    mode at the first page without new accounts. ``mark`` hands the page
+    cursor to the first candidate of each page, and ``processed`` writes it
+    to the journal once that candidate is done: from then on that page is
+    the first pending one.
+    """
+
+    def __init__(
+        self,
+        journal: CheckpointJournal,
+        username: str,
+        relation: str,
+        stats: ScrapeStats,
+        done_pks: set[str],
+        start_cursor: str | None,
+        limit: int | None,
+        incremental: bool,
+    ) -> None:
+        self.journal = journal
+        self.username = username
+        self.relation = relation
+        self.stats = stats
+        self.done_pks = done_pks
+        self.start_cursor = start_cursor
+        self.limit = limit
+        self.incremental = incremental
+        self.stopped = False
+        self.exhausted = False
+        self._listed = 0
+        self._listed_pks: set[str] = set()
+        self._page_cursor: str | None = None
+        self._marked = start_cursor
+        self._page_starts: dict[str, str] = {}
+
+    def page(self, cursor: str | None, users: Iterable) -> Iterator:
+        self.stats.pages += 1
+        self._page_cursor = cursor
+        listed_in_page = new_in_page = 0
+        for user in users:
+            listed_in_page += 1
+            key = str(user.pk)
+            if key in self._listed_pks:
+                continue
+            self._listed_pks.add(key)
+            if key in self.done_pks:
+                self.stats.resumed += 1
+                continue
+            new_in_page += 1
+            yield user
+            self._listed += 1
+            if self.limit and self._listed >= self.limit:
+                self.stopped = True
+                return
+        if self.incremental and listed_in_page and not new_in_page:
+            # La página solo trajo cuentas ya procesadas: se alcanzó lo de la ejecución anterior.
+            self.exhausted = self.stopped = True
+
+    @property
+    def listed_all(self) -> bool:
+        """True once the whole relation was listed in this run, from the first page to the last."""
+        return self.exhausted and not self.done_pks and self.start_cursor is None
+
+    def mark(self, user):
+        if self._page_cursor and self._page_cursor != self._marked:
+            self._page_starts[str(user.pk)] = self._page_cursor
+            self._marked = self._page_cursor
+        return user
+
+    def record(self, user) -> None:
+        self.journal.record(self.username, self.relation, user.pk)
+
+    def processed(self, user) -> None:
+        self.record(user)
+        cursor = self._page_starts.pop(str(user.pk), None)
+        if cursor:
+            self.journal.record_cursor(self.username, self.relation, cursor)
+
+
+class ScrapeRun:
+    """One scraped source (a hashtag, or the followers/following of an account).
+
+    Holds what the thread engine (``ScraperService``) and the asyncio engine
+    (``async_scraper``) share. Each engine only fetches: the listing, the
+    profile requests and how many run at once. Everything done with what
+    they fetch goes through here:
+    - the prefilter and target order of the candidates;
+    - the result store and profile cache lookups that save requests;
+    - storing and filtering each row, and the stats of both;
+    - the checkpoint walk of a relation;
+    - the flush when the run ends.
+    """
+
+    def __init__(
+        self,
+        service: "ScraperService",
+        source: str,
+        relation: str,
+        criteria: FilterCriteria | None = None,
+        refresh_age: float | None = None,
+        target: ScrapeTarget | None = None,
+    ) -> None:
+        self.service = service
+        self.source = source
+        self.relation = relation
+        self.criteria = criteria
+        self.refresh_age = refresh_age
+        self.stats = ScrapeStats()
+        self.metrics = RunMetrics(f"{relation}:{source}")
+        self.delta = SnapshotDelta(source, relation, refresh_age) if refresh_age is not None else None
+        self.queue = TargetQueue(target, criteria, self.stats, self.metrics) if target is not None else None
+        self.walk: RelationWalk | None = None
+        self.limit: int | None = None
+        self.scrape_id: int | None = None
+        self._reused: set[str] = set()
+        self._reuse: Callable[[object], dict | None] | None = None
+
+    @property
+    def is_relation(self) -> bool:
+        return self.relation in RELATION_CHUNK_METHODS
+
+    @property
+    def describe(self) -> Callable[[ScrapeStats], str]:
+        if self.is_relation:
+            return partial(describe_relation, self.relation, self.source)
+        return partial(describe_hashtag, self.source, self.criteria)
+
+    @property
+    def checkpoints(self) -> CheckpointJournal | None:
+        """Journal a writer has to sync with (relations only)."""
+        return self.service.checkpoints if self.is_relation else None
+
+    @property
+    def should_stop(self) -> Callable[[int], bool] | None:
+        """Check to run with the requests in flight before pulling another candidate."""
+        return self.queue.exhausted if self.queue is not None else None
+
+    # ------------------------------------------------------------------
+    # Inicio
+    # ------------------------------------------------------------------
+    def activate(self) -> None:
+        """Makes the requests of the calling thread (or task) record into this run's metrics."""
+        _current_metrics.set(self.metrics)
+
+    def start_walk(self, resume: bool, limit: int | None, incremental: bool) -> bool:
+        """Loads the checkpoint of a relation; false if a resumed relation was already complete."""
+        journal = self.service.checkpoints
+        username, relation = self.source, self.relation
+        if resume and not incremental and journal.is_complete(username, relation):
+            logger.info("%s de %s ya estaba completo según el checkpoint.", relation, username)
+            return False
+        done_pks = journal.processed(username, relation) if resume or incremental else set()
+        start_cursor = journal.cursor(username, relation) if resume and not incremental else None
+        if not resume and not incremental:
+            journal.reset(username, relation)
+        self.limit = limit
+        self.walk = RelationWalk(journal, username, relation, self.stats, done_pks, start_cursor, limit, incremental)
+        return True
+
+    def begin(self) -> None:
+        """Opens the scrape in the result store, once the source answered."""
+        store = self.service.result_store
+        if self.delta is not None:
+            scrape_id, previous = store.last_snapshot(self.delta.source, self.delta.relation)
+            self.delta.start(previous, scrape_id)
+            self._reuse = self._reuse_fresh
+        elif not self.is_relation:
+            # Perfiles enriquecidos hace poco (por otro hashtag o ejecución) salen de la base local.
+            self._reuse = self._reuse_seen
+        self.scrape_id = store.begin_scrape(self.source, self.relation)
+
+    def source_error(self, exc: Exception) -> RuntimeError:
+        """Message for a relation source that could not be listed."""
+        if isinstance(exc, UserNotFound):
+            return RuntimeError(f"El usuario {self.source} no existe o es inaccesible.")
+        if isinstance(exc, (RateLimitError, PleaseWaitFewMinutes)):
+            return RuntimeError("Instagram aplicó un rate limit mientras se consultaban relaciones.")
+        return RuntimeError(f"La cuenta {self.source} es privada y no se puede consultar.")
+
+    # ------------------------------------------------------------------
+    # Candidatas
+    # ------------------------------------------------------------------
+    def hashtag_candidates(self, medias: list) -> Iterator:
+        """Authors of ``medias`` to enrich: once each, without the prefiltered ones, best first with a target."""
+        candidates = self._unprefiltered(self._authors(medias))
+        if self.queue is not None:
+            return self.queue.order(list(candidates), media_likes(medias))
+        return candidates
+
+    def _authors(self, medias: list) -> Iterator:
+        seen_users: set = set()
+        for media in medias:
+            user = getattr(media, "user", None)
+            if not user or user.pk in seen_users:
+                continue
+            seen_users.add(user.pk)
+            self._list(user)
+            yield user
+
+    def _unprefiltered(self, users: Iterable) -> Iterator:
+        for user in users:
+            if not self.prefiltered(user):
+                yield user
+
+    def page_candidates(self, cursor: str | None, page: list) -> Iterator:
+        """Accounts of one relation page to enrich; the prefiltered ones are recorded as processed."""
+        walk = self.walk
+        listed = walk.page(cursor, page)
+        if self.queue is not None:
+            listed = self.queue.order(listed)
+        for user in listed:
+            self._list(user)
+            if self.prefiltered(user):
+                walk.record(user)
+            else:
+                yield walk.mark(user)
+
+    def _list(self, user) -> None:
+        # La cuenta entra en la foto de la fuente aunque el prefiltro la descarte sin consultarla.
+        if self.delta is not None:
+            self.delta.listed(user)
+        self.service.result_store.record_appearance(self.scrape_id, self.source, self.relation, user.pk)
+
+    def prefiltered(self, user) -> bool:
+        """True if the criteria reject ``user`` from its short data alone (no request needed)."""
+        if self.criteria is None or not rejects_early(short_data(user), self.criteria):
+            return False
+        self.stats.found += 1
+        self.stats.prefiltered += 1
+        return True
+
+    # ------------------------------------------------------------------
+    # Filas
+    # ------------------------------------------------------------------
+    def known_row(self, user) -> UserRow | None:
+        """Row of ``user`` that needs no request (result store or profile cache); ``None`` counts a miss."""
+        known = self._reuse(user) if self._reuse is not None else None
+        if known is not None:
+            self.stats.reused += 1
+        else:
+            known = self.service.profile_cache.get(user.pk, self.refresh_age)
+            if known is None:
+                self.stats.cache_misses += 1
+                return None
+            self.stats.cache_hits += 1
+        return UserRow.from_mapping(known)
+
+    def _reuse_seen(self, user) -> dict | None:
+        """Stored row of ``user`` if it was enriched recently (by another source or run)."""
+        service = self.service
+        if not service.seen_index.seen_recently(user.pk):
+            return None
+        row = service.result_store.profile(user.pk)
+        if row is not None:
+            self._reused.add(str(user.pk))
+        return row
+
+    def _reuse_fresh(self, user) -> dict | None:
+        """Stored row of ``user`` if it is younger than ``refresh_age`` (refresh mode)."""
+        row = self.service.result_store.fresh_profile(user.pk, self.refresh_age)
+        if row is not None:
+            self._reused.add(str(user.pk))
+        return row
+
+    def remember(self, user, row: UserRow) -> None:
+        """Caches a profile that was just requested."""
+        self.service.profile_cache.put(user.pk, row)
+        self.service.seen_index.add(user.pk)
+
+    def keep(self, user, row: UserRow) -> bool:
+        """Records ``row`` in the result store (before filtering) and tells whether it matches."""
+        self._store(user, row)
+        if self.is_relation:
+            row["source"] = self.source
+        stats, metrics = self.stats, self.metrics
+        stats.found += 1
+        metrics.count("processed")
+        start = time.perf_counter()
+        matched = not self.criteria or matches(row, self.criteria)
+        metrics.add_stage("filter", time.perf_counter() - start)
+        if matched:
+            stats.kept += 1
+            metrics.count("kept")
+        return matched
+
+    def _store(self, user, row: UserRow) -> None:
+        key = str(user.pk)
+        if self.delta is not None:
+            self.delta.observe(key, row)
+        store = self.service.result_store
+        start = time.perf_counter()
+        # Las filas reutilizadas ya vienen de la base: solo se registra su aparición en esta fuente.
+        if key in self._reused:
+            self._reused.discard(key)
+            store.record_appearance(self.scrape_id, self.source, self.relation, user.pk)
+        else:
+            store.record(self.scrape_id, self.source, self.relation, user.pk, row)
+        self.metrics.add_stage("store", time.perf_counter() - start)
+
+    def processed(self, user) -> None:
+        """Call once the consumer is done with ``user`` (its row handed over, or filtered out)."""
+        if self.walk is not None:
+            self.walk.processed(user)
+
+    def met(self) -> bool:
+        return self.queue is not None and self.queue.met()
+
+    def rate_limit_error(self) -> RuntimeError:
+        if self.is_relation:
+            return RuntimeError(
+                "Instagram aplicó un rate limit mientras se consultaban relaciones. "
+                "El progreso quedó guardado; reanuda el scraping más tarde."
+            )
+        return RuntimeError("Instagram aplicó un rate limit durante la consulta. Espera antes de continuar.")
+
+    # ------------------------------------------------------------------
+    # Cierre
+    # ------------------------------------------------------------------
+    def close(self) -> None:
+        """Ends the run, finished or not; close the enrichment first so requests in flight are counted."""
+        if self.queue is not None:
+            self.queue.finish()
+        service = self.service
+        service.profile_cache.save()
+        service.seen_index.save()
+        service.result_store.commit()
+        service.checkpoints.sync()
+        self.metrics.finish()
+
+    def finish(self) -> None:
+        """Marks a scrape that ran to its end as finished (the relation complete, if it was fully listed).
+
+        Only a scrape that listed the whole source is saved as a complete
+        snapshot, the baseline of later deltas: a hashtag always is, a
+        relation only if it was listed from the top to its last page.
+        """
+        walk = self.walk
+        if walk is None:
+            self.service.result_store.finish_scrape(self.scrape_id, complete=True)
+            if self.delta is not None:
+                self.delta.complete = True
+            return
+        self.service.result_store.finish_scrape(self.scrape_id, complete=walk.listed_all)
+        if self.delta is not None:
+            self.delta.complete = walk.exhausted
+        if walk.exhausted:
+            walk.journal.mark_complete(walk.username, walk.relation)
+        elif self.stats.target_stop:
+            logger.info(
+                "%s de %s: %s; reanuda para continuar desde la página guardada.",
+                walk.relation.title(),
+                walk.username,
+                STOP_REASONS[self.stats.target_stop],
+            )
+        else:
+            logger.info(
+                "%s de %s: se alcanzó el límite de %s cuentas; reanuda para continuar desde la página guardada.",
+                walk.relation.title(),
+                walk.username,
+                self.limit,
+            )
 
 
 class ScraperService:
     """Encapsula el acceso al cliente de instagrapi y operaciones de scraping."""
 
-    def __init__(self, session_path: Path) -> None:
+    def __init__(
+        self,
+        session_path: Path,
+        profile_cache: ProfileCache | None = None,
+        checkpoints: CheckpointJournal | None = None,
+        workers: int = DEFAULT_WORKERS,
+        rate_limiter: TokenBucket | None = None,
+        pacer: AdaptivePacer | None = None,
+        client_factory: Callable[[Client], Client] | None = None,
+        session_pool: SessionPool | None = None,
+        result_store: ResultStore | None = None,
+        seen_index: SeenIndex | None = None,
+        parallel_sources: int = DEFAULT_PARALLEL_SOURCES,
+        raw_profiles: bool = False,
+        proxy_pool: ProxyPool | None = None,
+    ) -> None:
         self.session_path = session_path
+        self.profile_cache = profile_cache if profile_cache is not None else ProfileCache(get_profile_cache_path())
+        self.checkpoints = checkpoints if checkpoints is not None else CheckpointJournal(get_checkpoint_path())
+        self.workers = max(1, workers)
+        self.parallel_sources = max(1, parallel_sources)
+        # Enriquecer desde el JSON crudo de users/{pk}/info/ sin validar el modelo de instagrapi.
+        self.raw_profiles = raw_profiles
+        if pacer is None:
+            pacer = AdaptivePacer(rate_limiter if rate_limiter is not None else TokenBucket(DEFAULT_RATE))
+        self.pacer = pacer
+        self.rate_limiter = pacer.bucket
+        self.client_factory = client_factory or _clone_client
+        self.session_pool = session_pool
+        # Con pool de proxies, cada solicitud sale por el proxy más sano en ese momento.
+        self.proxy_pool = proxy_pool
+        self.result_store = result_store if result_store is not None else ResultStore(get_store_path())
+        self.seen_index = seen_index if seen_index is not None else SeenIndex(get_seen_index_path())
+        self._local = threading.local()
+        # Métricas usadas fuera de un ScrapeStream; cada stream instala las suyas al empezar.
+        self._default_metrics = RunMetrics()
         self.client: Client | None = None
         self.logged_username: str | None = None
         self._authenticated: bool = False
-
-        self._try_restore_session()
+        # La sesión guardada se valida (una llamada a la red) la primera vez que se pregunta por ella.
+        self._session_checked = False
+        self._session_lock = threading.Lock()
 
     # ------------------------------------------------------------------
     # Login / sesión
@@ -69,6 +662,8 @@ class ScraperService:
                     logger.info("Sesión previa cargada desde %s", self.session_path)
                 except Exception as exc:  # pragma: no cover
                     logger.warning("No fue posible cargar la sesión previa: %s", exc)
+            if self.proxy_pool is not None:
+                self.proxy_pool.prepare(self.client)
         return self.client
 
     def mark_authenticated(self, username: str | None = None) -> None:
@@ -133,148 +728,510 @@ class ScraperService:
         self._authenticated = True
 
     def is_logged_in(self) -> bool:
+        """True with a session pool, or once a login or the saved session (checked on first call) is valid."""
+        if self.session_pool is not None or self._authenticated:
+            return True
+        with self._session_lock:
+            if not self._session_checked:
+                self._session_checked = True
+                self._try_restore_session()
         return self._authenticated
 
     # ------------------------------------------------------------------
     # Scraping helpers
     # ------------------------------------------------------------------
-    def _sleep(self) -> None:
-        start, end = DEFAULT_DELAY
-        time.sleep(random.uniform(start, end))
+    @property
+    def metrics(self) -> RunMetrics:
+        """Metrics of the stream being consumed by the calling thread."""
+        return _current_metrics.get() or self._default_metrics
 
-    def _ensure_login(self) -> Client:
+    def ensure_login(self) -> Client:
+        """Client that identifies the scrape; raises if there is no valid session."""
+        if self.session_pool is not None:
+            # Las solicitudes pasan por el pool; este cliente solo identifica la ejecución.
+            return self.session_pool.accounts[0].client
         client = self.ensure_client()
         if not self.is_logged_in():
             raise RuntimeError("Debes iniciar sesión antes de continuar.")
         return client
 
-    def _serialize_user(self, info) -> dict:
-        return {
-            "username": getattr(info, "username", ""),
-            "full_name": getattr(info, "full_name", ""),
-            "followers": getattr(info, "follower_count", getattr(info, "followers_count", None)),
-            "following": getattr(info, "following_count", getattr(info, "following", None)),
-            "media_count": getattr(info, "media_count", None),
-            "is_private": getattr(info, "is_private", False),
-            "is_verified": getattr(info, "is_verified", False),
-            "has_highlight_reels": getattr(info, "has_highlight_reels", False),
-        }
+    def _serialize_user(self, info) -> UserRow:
+        return UserRow(
+            getattr(info, "username", ""),
+            getattr(info, "full_name", ""),
+            getattr(info, "follower_count", getattr(info, "followers_count", None)),
+            getattr(info, "following_count", getattr(info, "following", None)),
+            getattr(info, "media_count", None),
+            getattr(info, "is_private", False),
+            getattr(info, "is_verified", False),
+            getattr(info, "has_highlight_reels", False),
+        )
 
-    def scrape_hashtag(
+    def _serialize_private_user(self, user) -> UserRow:
+        return UserRow(user.username, user.full_name, is_private=True, is_verified=getattr(user, "is_verified", False))
+
+    def isolate_thread(self) -> None:
+        """Gives the calling thread its own copy of the session from now on (see ``worker_client``)."""
+        self._local.isolated = True
+
+    def worker_client(self, client: Client) -> Client:
+        """Returns the client a worker thread should use for its requests.
+
+        instagrapi keeps the last response on the client instance, so each
+        worker (and each source scraped in parallel) gets its own copy of the
+        authenticated session.
+        """
+        if self.session_pool is not None:
+            return client
+        if self.workers == 1 and not getattr(self._local, "isolated", False):
+            return client
+        cached = getattr(self._local, "client", None)
+        if cached is None or cached[0] is not client:
+            cached = (client, self.client_factory(client))
+            self._local.client = cached
+        return cached[1]
+
+    def request_failed(self, endpoint: str, started: float, exc: Exception, attempts: int) -> int:
+        """Records a failed request and returns the attempts so far if it should be retried.
+
+        Only rate limits are retried, after the pacer's backoff; any other
+        error, or a rate limit past ``max_retries``, is raised again.
+        """
+        self.metrics.record_request(endpoint, time.perf_counter() - started, type(exc).__name__)
+        if not isinstance(exc, (RateLimitError, PleaseWaitFewMinutes)):
+            raise exc
+        attempts += 1
+        self._back_off(exc, attempts)
+        return attempts
+
+    def request_done(self, endpoint: str, started: float) -> None:
+        self.metrics.record_request(endpoint, time.perf_counter() - started)
+        self.pacer.on_success()
+
+    def _paced_call(self, func: Callable, *args, **kwargs):
+        """Runs ``func`` under the shared pacer, retrying rate limits (see ``request_failed``)."""
+        endpoint = getattr(func, "__name__", "request")
+        attempts = 0
+        while True:
+            self.metrics.add_sleep(self.pacer.acquire())
+            start = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as exc:
+                attempts = self.request_failed(endpoint, start, exc, attempts)
+                continue
+            self.request_done(endpoint, start)
+            return result
+
+    def _back_off(self, exc: Exception, attempts: int) -> None:
+        """Slows the pacer down after a rate limit; re-raises ``exc`` once retries run out."""
+        delay = self.pacer.on_throttle(type(exc).__name__)
+        if attempts > self.pacer.max_retries:
+            raise exc
+        logger.warning(
+            "Instagram aplicó un rate limit (%s). Reintento %s/%s en %.0f s.",
+            type(exc).__name__,
+            attempts,
+            self.pacer.max_retries,
+            delay,
+        )
+
+    def endpoint(self, client: Client, method: str | Callable) -> Callable:
+        """``bind_endpoint``, routed through the proxy pool when there is one."""
+        endpoint = bind_endpoint(client, method)
+        if self.proxy_pool is None:
+            return endpoint
+        return update_wrapper(partial(self.proxy_pool.call, client, endpoint), endpoint)
+
+    def pooled_call(self, method: str | Callable, *args, **kwargs):
+        """Runs ``method`` on a leased account from the session pool.
+
+        Accounts that hit a challenge, a login wall or a rate limit are
+        quarantined and the request moves on to another account.
+        """
+        pool = self.session_pool
+        endpoint = endpoint_name(method)
+        attempts = 0
+        while True:
+            waiting = time.perf_counter()
+            with pool.lease() as account:
+                self.metrics.add_sleep(time.perf_counter() - waiting + self.pacer.acquire())
+                start = time.perf_counter()
+                try:
+                    result = self.endpoint(account.client, method)(*args, **kwargs)
+                except _SESSION_ERRORS as exc:
+                    self.metrics.record_request(endpoint, time.perf_counter() - start, type(exc).__name__)
+                    attempts += 1
+                    pool.quarantine(account, type(exc).__name__)
+                    if attempts > len(pool) + self.pacer.max_retries:
+                        raise
+                    continue
+                except Exception as exc:
+                    self.metrics.record_request(endpoint, time.perf_counter() - start, type(exc).__name__)
+                    raise
+                self.metrics.record_request(endpoint, time.perf_counter() - start)
+                pool.record_success(account)
+            self.pacer.on_success()
+            return result
+
+    def _call(self, client: Client, method: str | Callable, *args, **kwargs):
+        if self.session_pool is not None:
+            return self.pooled_call(method, *args, **kwargs)
+        return self._paced_call(self.endpoint(client, method), *args, **kwargs)
+
+    def profile_methods(self) -> tuple:
+        """Requests that enrich a profile, tried in order until one returns a row."""
+        return (user_info_raw, "user_info") if self.raw_profiles else ("user_info",)
+
+    def profile_row(self, user, method: str | Callable, result) -> UserRow | None:
+        """Row built from the response of one of ``profile_methods``; ``None`` to try the next one."""
+        if method is user_info_raw:
+            return row_from_user_json(result) if result is not None else None
+        return self._serialize_user(result)
+
+    def profile_error_row(self, user, exc: Exception) -> UserRow | None:
+        """Row for a profile request that failed with ``exc``, or raises it again.
+
+        Deleted accounts are skipped (``None``) and private ones keep their
+        short data; session errors, which instagrapi derives from
+        ``PrivateError``, stop the scrape.
+        """
+        if isinstance(exc, UserNotFound):
+            return None
+        if isinstance(exc, PrivateError) and not isinstance(exc, _SESSION_ERRORS):
+            return self._serialize_private_user(user)
+        raise exc
+
+    def _request_user_row(self, client: Client, user) -> UserRow | None:
+        worker_client = self.worker_client(client)
+        try:
+            for method in self.profile_methods():
+                row = self.profile_row(user, method, self._call(worker_client, method, user.pk))
+                if row is not None:
+                    return row
+        except Exception as exc:
+            return self.profile_error_row(user, exc)
+        return None
+
+    def _enrich_users(self, client: Client, users: Iterable, run: ScrapeRun) -> Iterator[tuple[object, UserRow]]:
+        """Yields ``(user, row)`` for every user, preserving the input order.
+
+        Rows ``run`` already knows are served without spending requests.
+        The remaining users are fetched by up to ``self.workers`` threads
+        that share a single rate limiter; accounts that no longer exist are
+        skipped. Once ``run.should_stop`` (called with the number of
+        requests in flight) returns true, no further user is taken from
+        ``users``.
+        """
+        pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="enrich") if self.workers > 1 else None
+        pending: deque[tuple[object, Future, bool]] = deque()
+        window = self.workers * 2
+        should_stop = run.should_stop
+
+        def resolve(item: tuple[object, Future, bool]) -> Iterator[tuple[object, UserRow]]:
+            user, future, from_cache = item
+            row = future.result()
+            if row is None:
+                return
+            if not from_cache:
+                run.remember(user, row)
+            yield user, row
+
+        try:
+            for user in users:
+                known = run.known_row(user)
+                if known is not None:
+                    future: Future = Future()
+                    future.set_result(known)
+                    pending.append((user, future, True))
+                else:
+                    if pool is None:
+                        future = Future()
+                        future.set_result(self._request_user_row(client, user))
+                    else:
+                        # Los hilos del pool registran en las métricas del stream que los lanzó.
+                        future = pool.submit(copy_context().run, self._request_user_row, client, user)
+                    pending.append((user, future, False))
+                while pending and (len(pending) > window or pending[0][1].done()):
+                    yield from resolve(pending.popleft())
+                if should_stop is not None:
+                    in_flight = sum(1 for _, future, from_cache in pending if not from_cache and not future.done())
+                    if should_stop(in_flight):
+                        break
+            while pending:
+                yield from resolve(pending.popleft())
+        finally:
+            if pool is not None:
+                pool.shutdown(wait=True, cancel_futures=True)
+
+    def _relation_pages(
+        self,
+        client: Client,
+        user_id: str,
+        relation: str,
+        cursor: str | None = None,
+    ) -> Iterator[tuple[str | None, list]]:
+        """Yields ``(cursor, users)`` for each page of ``relation``, starting at ``cursor``.
+
+        ``cursor`` is the one that produced the page (``None`` for the first
+        page), so it can be stored to fetch that page again later.
+        """
+        method = RELATION_CHUNK_METHODS[relation]
+        while True:
+            users, next_cursor = self._call(client, method, user_id, max_amount=RELATION_PAGE_SIZE, max_id=cursor or "")
+            yield cursor, users
+            if not users or not next_cursor:
+                return
+            cursor = next_cursor
+
+    def stream_hashtag(
         self,
         hashtag: str,
         amount: int,
         criteria: FilterCriteria | None = None,
-    ) -> ScraperResult:
-        client = self._ensure_login()
-        seen_users: set[int] = set()
-        collected: List[dict] = []
-        try:
-            medias = client.hashtag_medias_recent(hashtag, amount=amount)
-        except ClientError as exc:
-            raise RuntimeError(f"Instagram rechazó la consulta del hashtag: {exc}") from exc
+        refresh_age: float | None = None,
+        target: ScrapeTarget | None = None,
+    ) -> ScrapeStream:
+        """Scrapes the authors of recent posts of ``hashtag`` lazily.
 
-        for media in medias:
-            user = getattr(media, "user", None)
-            if not user:
-                continue
-            if user.pk in seen_users:
-                continue
-            seen_users.add(user.pk)
+        Rows are filtered as soon as they are enriched, so callers can write
+        them out while the scrape is still running. With ``refresh_age``
+        (seconds) only authors without a stored profile younger than that
+        are requested, and ``stream.delta`` compares the authors with the
+        previous scrape of the hashtag. With a ``target`` the authors are
+        enriched most promising first (verified, posts with more likes...)
+        and the scrape stops once the target is met.
+        """
+        client = self.ensure_login()
+        check_refresh(refresh_age, resume=False, incremental=False)
+        run = ScrapeRun(self, hashtag, "hashtag", criteria, refresh_age, target)
+
+        def rows() -> Iterator[UserRow]:
+            run.activate()
             try:
-                info = client.user_info(user.pk)
-            except PrivateError:
-                row = {
-                    "username": user.username,
-                    "full_name": user.full_name,
-                    "followers": None,
-                    "following": None,
-                    "media_count": None,
-                    "is_private": True,
-                    "is_verified": getattr(user, "is_verified", False),
-                    "has_highlight_reels": False,
-                }
-            except UserNotFound:
-                continue
+                medias = self._call(client, "hashtag_medias_recent", hashtag, amount=amount)
+            except ClientError as exc:
+                raise RuntimeError(f"Instagram rechazó la consulta del hashtag: {exc}") from exc
+            run.begin()
+            enriched = self._enrich_users(client, run.hashtag_candidates(medias), run)
+            try:
+                for user, row in enriched:
+                    if run.keep(user, row):
+                        yield row
+                    if run.met():
+                        break
             except (RateLimitError, PleaseWaitFewMinutes) as exc:
-                raise RuntimeError(
-                    "Instagram aplicó un rate limit durante la consulta. Espera antes de continuar."
-                ) from exc
-            else:
-                row = self._serialize_user(info)
-            collected.append(row)
-            self._sleep()
+                raise run.rate_limit_error() from exc
+            finally:
+                enriched.close()
+                run.close()
+            run.finish()
 
-        if criteria:
-            filtered_rows = apply_filters(collected, criteria)
-        else:
-            filtered_rows = collected
-        description = (
-            f"Hashtag #{hashtag} - {len(filtered_rows)} cuentas" + (
-                f" (de {len(collected)} encontradas)" if criteria else ""
-            )
-        )
-        return ScraperResult(filtered_rows, description)
+        return ScrapeStream(rows(), run.stats, run.describe, run.metrics, run.delta)
 
-    def scrape_profile_relations(
+    def scrape_hashtag(
+        self,
+        hashtag: str,
+        amount: int,
+        criteria: FilterCriteria | None = None,
+        refresh_age: float | None = None,
+        target: ScrapeTarget | None = None,
+    ) -> ScraperResult:
+        return self.stream_hashtag(hashtag, amount, criteria, refresh_age, target).collect()
+
+    def stream_profile_relations(
         self,
         usernames: Iterable[str],
         relation: str,
         criteria: FilterCriteria | None = None,
-    ) -> dict[str, ScraperResult]:
-        client = self._ensure_login()
+        resume: bool = False,
+        limit: int | None = None,
+        incremental: bool = False,
+        refresh_age: float | None = None,
+        target: ScrapeTarget | None = None,
+    ) -> Iterator[tuple[str, ScrapeStream]]:
+        """Yields one lazy ``ScrapeStream`` per source username.
+
+        Streams are independent: they can be consumed one after another or
+        from different threads (see ``run_profile_relations``).
+        The relation is fetched page by page, so enrichment starts with the
+        first page, and at most ``limit`` new accounts are listed per source.
+        Every processed pk and the cursor of the current page are recorded
+        in the checkpoint journal: ``resume`` continues from that cursor
+        skipping the pks already processed, and ``incremental`` lists the
+        relation from the top (newest first) until a page brings no account
+        unseen by previous runs.
+
+        ``refresh_age`` (seconds) turns on refresh mode: the whole relation
+        is listed again, but only accounts without a stored profile younger
+        than ``refresh_age`` are requested; the rest come from the result
+        store. Each stream's ``delta`` compares the list with the previous
+        scrape of that source (added, removed, follower count changes).
+
+        With a ``target`` each page is enriched most promising first and
+        each source stops (without listing further pages) once it kept
+        ``target.matches`` accounts or spent ``target.requests`` requests;
+        the checkpoint lets a later ``resume`` pick up from there.
+        """
+        base_client = self.ensure_login()
         relation = relation.lower()
         if relation not in {"followers", "following"}:
             raise ValueError("La relación debe ser 'followers' o 'following'.")
+        check_refresh(refresh_age, resume, incremental)
+
+        def source_rows(run: ScrapeRun) -> Iterator[UserRow]:
+            run.activate()
+            # Cada origen consumido en paralelo trae su propio cliente.
+            client = self.worker_client(base_client)
+            if not run.start_walk(resume, limit, incremental):
+                return
+            walk = run.walk
 
-        responses: dict[str, ScraperResult] = {}
-        for username in usernames:
-            username = username.strip()
-            if not username:
-                continue
             try:
-                user_id = client.user_id_from_username(username)
-            except UserNotFound:
-                raise RuntimeError(f"El usuario {username} no existe o es inaccesible.")
+                user_id = self._call(client, "user_id_from_username", run.source)
+            except UserNotFound as exc:
+                raise run.source_error(exc) from exc
 
+            pages = self._relation_pages(client, user_id, relation, walk.start_cursor)
             try:
-                if relation == "followers":
-                    relation_data = client.user_followers(user_id)
-                else:
-                    relation_data = client.user_following(user_id)
+                first_page = next(pages)
+            except (RateLimitError, PleaseWaitFewMinutes, PrivateError) as exc:
+                raise run.source_error(exc) from exc
+
+            def candidates() -> Iterator:
+                for cursor, page in chain([first_page], pages):
+                    yield from run.page_candidates(cursor, page)
+                    if walk.stopped:
+                        return
+                walk.exhausted = True
+
+            run.begin()
+            enriched = self._enrich_users(client, candidates(), run)
+            try:
+                for user, row in enriched:
+                    if run.keep(user, row):
+                        yield row
+                    run.processed(user)
+                    if run.met():
+                        break
             except (RateLimitError, PleaseWaitFewMinutes) as exc:
-                raise RuntimeError(
-                    "Instagram aplicó un rate limit mientras se consultaban relaciones."
-                ) from exc
-            except PrivateError as exc:
-                raise RuntimeError(f"La cuenta {username} es privada y no se puede consultar.") from exc
-
-            rows: List[dict] = []
-            for short_user in relation_data.values():
-                try:
-                    info = client.user_info(short_user.pk)
-                except PrivateError:
-                    row = {
-                        "username": short_user.username,
-                        "full_name": short_user.full_name,
-                        "followers": None,
-                        "following": None,
-                        "media_count": None,
-                        "is_private": True,
-                        "is_verified": getattr(short_user, "is_verified", False),
-                        "has_highlight_reels": False,
-                    }
-                except UserNotFound:
+                raise run.rate_limit_error() from exc
+            finally:
+                enriched.close()
+                run.close()
+            run.finish()
+
+        def stream_for(username: str) -> ScrapeStream:
+            run = ScrapeRun(self, username, relation, criteria, refresh_age, target)
+            return ScrapeStream(source_rows(run), run.stats, run.describe, run.metrics, run.delta, run.checkpoints)
+
+        def streams() -> Iterator[tuple[str, ScrapeStream]]:
+            for username in usernames:
+                username = username.strip()
+                if not username:
                     continue
-                else:
-                    row = self._serialize_user(info)
-                row["source"] = username
-                rows.append(row)
-                self._sleep()
-
-            final_rows = apply_filters(rows, criteria) if criteria else rows
-            responses[username] = ScraperResult(
-                final_rows,
-                f"{relation.title()} de {username}: {len(final_rows)} resultados",
+                yield username, stream_for(username)
+
+        return streams()
+
+    def run_profile_relations(
+        self,
+        usernames: Iterable[str],
+        relation: str,
+        consume: Callable[[str, ScrapeStream], object] | None = None,
+        criteria: FilterCriteria | None = None,
+        resume: bool = False,
+        limit: int | None = None,
+        incremental: bool = False,
+        parallel: int | None = None,
+        refresh_age: float | None = None,
+        target: ScrapeTarget | None = None,
+    ) -> Iterator[SourceOutcome]:
+        """Scrapes up to ``parallel`` source usernames at the same time.
+
+        ``parallel`` defaults to ``self.parallel_sources``. Each source is
+        handed to ``consume`` (``ScrapeStream.collect`` by default) in its own
+        thread, and its ``SourceOutcome`` is yielded as soon as that source
+        finishes, in completion order. Every request still goes through the
+        shared pacer (or session pool), so running sources in parallel never
+        raises the global request rate. A failing source only records its
+        error; the others keep going.
+        """
+        consume = consume or (lambda username, stream: stream.collect())
+        streams = self.stream_profile_relations(
+            usernames,
+            relation,
+            criteria,
+            resume,
+            limit=limit,
+            incremental=incremental,
+            refresh_age=refresh_age,
+            target=target,
+        )
+
+        stop = threading.Event()
+
+        def interruptible(rows: Iterator[UserRow]) -> Iterator[UserRow]:
+            # Si quien consume el scheduler lo abandona, cada origen se detiene en
+            # la siguiente fila y su generador guarda el checkpoint al cerrarse.
+            try:
+                for row in rows:
+                    if stop.is_set():
+                        raise RuntimeError("Scraping interrumpido; el progreso quedó guardado.")
+                    yield row
+            finally:
+                rows.close()
+
+        def run(username: str, stream: ScrapeStream) -> SourceOutcome:
+            self.isolate_thread()
+            start = time.perf_counter()
+            try:
+                value = consume(username, stream)
+            except Exception as exc:
+                logger.warning("Falló el scraping de %s de %s: %s", relation, username, exc)
+                return SourceOutcome(username, stream, error=str(exc), seconds=time.perf_counter() - start)
+            return SourceOutcome(username, stream, value, seconds=time.perf_counter() - start)
+
+        def outcomes() -> Iterator[SourceOutcome]:
+            pool = ThreadPoolExecutor(max_workers=max(1, parallel or self.parallel_sources), thread_name_prefix="source")
+            try:
+                futures = []
+                for username, stream in streams:
+                    stream.rows = interruptible(stream.rows)
+                    futures.append(pool.submit(run, username, stream))
+                for future in as_completed(futures):
+                    yield future.result()
+            finally:
+                stop.set()
+                pool.shutdown(wait=True, cancel_futures=True)
+
+        return outcomes()
+
+    def scrape_profile_relations(
+        self,
+        usernames: Iterable[str],
+        relation: str,
+        criteria: FilterCriteria | None = None,
+        resume: bool = False,
+        limit: int | None = None,
+        incremental: bool = False,
+        parallel: int | None = None,
+        refresh_age: float | None = None,
+        target: ScrapeTarget | None = None,
+    ) -> dict[str, ScraperResult]:
+        """Results of every source that finished; failed sources are logged and left out."""
+        return {
+            outcome.username: outcome.value
+            for outcome in self.run_profile_relations(
+                usernames,
+                relation,
+                criteria=criteria,
+                resume=resume,
+                limit=limit,
+                incremental=incremental,
+                parallel=parallel,
+                refresh_age=refresh_age,
+                target=target,
             )
-        return responses
+            if outcome.ok
+        }
@@ -0,0 +1,156 @@
+"""Compact on-disk index of the profile pks enriched in previous runs."""
+from __future__ import annotations
+
+import logging
+import struct
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WINDOW = 7 * 24 * 3600.0
+
+_MAGIC = b"IGSEEN1\n"
+_HEADER = struct.Struct("<Q")
+_MAX_PK = 2**64
+
+
+class SeenIndex:
+    """Remembers when each pk was last enriched, across runs and sources.
+
+    pks and timestamps are kept as two parallel sorted arrays (8 + 4 bytes
+    per pk) and stored as raw little-endian bytes, so millions of pks load
+    with a single read. New pks stay in a small dict until ``save()`` merges
+    them into the arrays. Safe to share between threads.
+
+    A pk counts as seen while its last enrichment is within ``window``
+    seconds; ``None`` never expires and ``0`` disables the index.
+    """
+
+    def __init__(self, path: Path, window: float | None = DEFAULT_WINDOW) -> None:
+        self.path = path
+        self.window = window
+        self._pks: array | None = None
+        self._seen_at = array("I")
+        self._pending: Dict[int, int] = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Persistencia
+    # ------------------------------------------------------------------
+    def _load(self) -> array:
+        if self._pks is not None:
+            return self._pks
+        pks, seen_at = array("Q"), array("I")
+        if self.path.exists():
+            try:
+                with self.path.open("rb") as file:
+                    header = file.read(len(_MAGIC) + _HEADER.size)
+                    if not header.startswith(_MAGIC):
+                        raise ValueError("formato desconocido")
+                    (count,) = _HEADER.unpack(header[len(_MAGIC):])
+                    pks.fromfile(file, count)
+                    seen_at.fromfile(file, count)
+            except (OSError, EOFError, ValueError, struct.error) as exc:
+                logger.warning("El índice de perfiles vistos está dañado y se ignorará: %s", exc)
+                pks, seen_at = array("Q"), array("I")
+            if sys.byteorder == "big":
+                pks.byteswap()
+                seen_at.byteswap()
+        self._pks, self._seen_at = pks, seen_at
+        return pks
+
+    def _merge_pending(self) -> None:
+        pks, seen_at = self._load(), self._seen_at
+        merged_pks, merged_at = array("Q"), array("I")
+        start = 0
+        for key, seen in sorted(self._pending.items()):
+            index = bisect_left(pks, key, start)
+            merged_pks.extend(pks[start:index])
+            merged_at.extend(seen_at[start:index])
+            merged_pks.append(key)
+            merged_at.append(seen)
+            start = index
+        merged_pks.extend(pks[start:])
+        merged_at.extend(seen_at[start:])
+        self._pks, self._seen_at = merged_pks, merged_at
+        self._pending.clear()
+
+    def save(self) -> None:
+        with self._lock:
+            self._save()
+
+    def _save(self) -> None:
+        if not self._dirty:
+            return
+        self._merge_pending()
+        pks, seen_at = self._pks, self._seen_at
+        if sys.byteorder == "big":
+            pks, seen_at = array("Q", pks), array("I", seen_at)
+            pks.byteswap()
+            seen_at.byteswap()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with tmp_path.open("wb") as file:
+            file.write(_MAGIC + _HEADER.pack(len(pks)))
+            pks.tofile(file)
+            seen_at.tofile(file)
+        tmp_path.replace(self.path)
+        self._dirty = False
+
+    # ------------------------------------------------------------------
+    # Acceso
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _key(pk: object) -> int | None:
+        try:
+            key = int(pk)  # type: ignore[arg-type]
+        except (TypeError, ValueError):
+            return None
+        return key if 0 <= key < _MAX_PK else None
+
+    def last_seen(self, pk: object) -> int | None:
+        """Epoch seconds of the last enrichment of ``pk``, if any."""
+        key = self._key(pk)
+        if key is None:
+            return None
+        with self._lock:
+            if key in self._pending:
+                return self._pending[key]
+            pks = self._load()
+            index = bisect_left(pks, key)
+            if index < len(pks) and pks[index] == key:
+                return self._seen_at[index]
+            return None
+
+    def seen_recently(self, pk: object, now: float | None = None) -> bool:
+        if self.window is not None and self.window <= 0:
+            return False
+        seen = self.last_seen(pk)
+        if seen is None:
+            return False
+        return self.window is None or (time.time() if now is None else now) - seen <= self.window
+
+    def add(self, pk: object, when: float | None = None) -> None:
+        key = self._key(pk)
+        if key is None:
+            return
+        seen = int(time.time() if when is None else when)
+        with self._lock:
+            pks = self._load()
+            index = bisect_left(pks, key)
+            if index < len(pks) and pks[index] == key:
+                self._seen_at[index] = seen
+            else:
+                self._pending[key] = seen
+            self._dirty = True
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._load()) + len(self._pending)
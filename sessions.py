@@ -0,0 +1,148 @@
+"""Pool of persisted Instagram sessions used to spread requests across accounts."""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Iterator, List
+
+from pacing import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUARANTINE = 15 * 60.0
+
+
+@dataclass
+class PooledAccount:
+    name: str
+    client: object
+    bucket: TokenBucket
+    requests: int = 0
+    errors: int = 0
+    leases: int = 0
+    quarantines: int = 0
+    quarantined_until: float = 0.0
+    quarantine_reason: str | None = None
+    in_use: bool = field(default=False, repr=False)
+
+    def is_quarantined(self, now: float | None = None) -> bool:
+        return self.quarantined_until > (time.monotonic() if now is None else now)
+
+
+class SessionPool:
+    """Hands out one account at a time to each request.
+
+    ``lease()`` picks the free, non-quarantined account with the most
+    remaining budget in its own token bucket. Accounts that hit a challenge
+    or a rate limit are quarantined and skipped until the quarantine ends.
+    Each account is used by a single thread at a time because instagrapi
+    clients keep per-request state.
+    """
+
+    def __init__(self, accounts: List[PooledAccount], quarantine_seconds: float = DEFAULT_QUARANTINE) -> None:
+        if not accounts:
+            raise ValueError("El pool de sesiones necesita al menos una cuenta.")
+        self.accounts = accounts
+        self.quarantine_seconds = quarantine_seconds
+        self._condition = threading.Condition()
+
+    @classmethod
+    def from_directory(
+        cls,
+        directory: Path,
+        rate: float,
+        client_factory: Callable[[Path], object] | None = None,
+        quarantine_seconds: float = DEFAULT_QUARANTINE,
+    ) -> "SessionPool":
+        """Loads every ``*.json`` session dumped by instagrapi in ``directory``."""
+        if client_factory is None:
+            client_factory = _load_client
+        accounts: List[PooledAccount] = []
+        for path in sorted(directory.glob("*.json")):
+            try:
+                client = client_factory(path)
+            except Exception as exc:  # pragma: no cover - sesión corrupta
+                logger.warning("No se pudo cargar la sesión %s: %s", path.name, exc)
+                continue
+            accounts.append(PooledAccount(path.stem, client, TokenBucket(rate)))
+        return cls(accounts, quarantine_seconds)
+
+    def __len__(self) -> int:
+        return len(self.accounts)
+
+    def _pick(self, now: float) -> PooledAccount | None:
+        candidates = [
+            account for account in self.accounts if not account.in_use and not account.is_quarantined(now)
+        ]
+        if not candidates:
+            return None
+        return max(candidates, key=lambda account: account.bucket.available())
+
+    def _next_release(self, now: float) -> float | None:
+        pending = [account.quarantined_until - now for account in self.accounts if account.is_quarantined(now)]
+        return min(pending) if pending else None
+
+    @contextmanager
+    def lease(self) -> Iterator[PooledAccount]:
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                account = self._pick(now)
+                if account is not None:
+                    account.in_use = True
+                    account.leases += 1
+                    break
+                wait = self._next_release(now)
+                if wait is not None and not any(account.in_use for account in self.accounts):
+                    logger.warning("Todas las cuentas están en cuarentena. Esperando %.0f s.", wait)
+                self._condition.wait(timeout=wait)
+        try:
+            account.bucket.acquire()
+            yield account
+        finally:
+            with self._condition:
+                account.in_use = False
+                self._condition.notify_all()
+
+    def record_success(self, account: PooledAccount) -> None:
+        with self._condition:
+            account.requests += 1
+
+    def quarantine(self, account: PooledAccount, reason: str, seconds: float | None = None) -> None:
+        with self._condition:
+            account.requests += 1
+            account.errors += 1
+            account.quarantines += 1
+            account.quarantined_until = time.monotonic() + (self.quarantine_seconds if seconds is None else seconds)
+            account.quarantine_reason = reason
+            self._condition.notify_all()
+        logger.warning("La cuenta %s quedó en cuarentena (%s).", account.name, reason)
+
+    def report(self) -> List[dict]:
+        now = time.monotonic()
+        return [
+            {
+                "account": account.name,
+                "requests": account.requests,
+                "errors": account.errors,
+                "leases": account.leases,
+                "quarantines": account.quarantines,
+                "status": f"cuarentena ({account.quarantine_reason})" if account.is_quarantined(now) else "activa",
+            }
+            for account in self.accounts
+        ]
+
+
+def _load_client(path: Path):
+    from compat import ensure_pydantic_compat
+
+    ensure_pydantic_compat()
+    from instagrapi import Client
+
+    client = Client()
+    client.load_settings(str(path))
+    return client
@@ -0,0 +1,279 @@
+"""Local SQLite store with every scraped profile and where it was seen."""
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, List, Sequence
+
+from filters import FilterCriteria
+
+PROFILE_FIELDS = (
+    "username",
+    "full_name",
+    "followers",
+    "following",
+    "media_count",
+    "is_private",
+    "is_verified",
+    "has_highlight_reels",
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scrapes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    source TEXT NOT NULL,
+    relation TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    finished_at REAL,
+    complete INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS profiles (
+    pk TEXT PRIMARY KEY,
+    username TEXT,
+    full_name TEXT,
+    followers INTEGER,
+    following INTEGER,
+    media_count INTEGER,
+    is_private INTEGER,
+    is_verified INTEGER,
+    has_highlight_reels INTEGER,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS profiles_username ON profiles(username);
+CREATE INDEX IF NOT EXISTS profiles_followers ON profiles(followers);
+CREATE TABLE IF NOT EXISTS appearances (
+    pk TEXT NOT NULL,
+    scrape_id INTEGER NOT NULL REFERENCES scrapes(id),
+    source TEXT NOT NULL,
+    relation TEXT NOT NULL,
+    seen_at REAL NOT NULL,
+    PRIMARY KEY (pk, scrape_id)
+);
+CREATE INDEX IF NOT EXISTS appearances_source ON appearances(source, relation, seen_at);
+CREATE INDEX IF NOT EXISTS appearances_pk ON appearances(pk, source);
+"""
+
+
+def criteria_sql(criteria: FilterCriteria | None) -> tuple[str, list]:
+    """Translates ``criteria`` into a SQL condition over ``profiles`` (alias ``p``).
+
+    Keeps the semantics of ``filters.matches``: NULL never satisfies a
+    numeric bound and ``media_count = 0`` counts as missing.
+    """
+    clauses: List[str] = []
+    params: list = []
+    if criteria is None:
+        return "1", params
+    if criteria.min_followers is not None:
+        clauses.append("p.followers >= ?")
+        params.append(criteria.min_followers)
+    if criteria.max_followers is not None:
+        clauses.append("p.followers <= ?")
+        params.append(criteria.max_followers)
+    if criteria.min_posts is not None:
+        clauses.append("p.media_count != 0 AND p.media_count >= ?")
+        params.append(criteria.min_posts)
+    if criteria.require_public is not None:
+        clauses.append("NOT COALESCE(p.is_private, 0)" if criteria.require_public else "COALESCE(p.is_private, 0)")
+    if criteria.require_verified is True:
+        clauses.append("COALESCE(p.is_verified, 0)")
+    if criteria.require_highlights is True:
+        clauses.append("COALESCE(p.has_highlight_reels, 0)")
+    return (" AND ".join(clauses) or "1"), params
+
+
+class ResultStore:
+    """Indexed store for scrape results.
+
+    ``profiles`` keeps the latest data per pk, ``appearances`` records every
+    time a pk showed up under a source (hashtag or username) and relation
+    (``hashtag``, ``followers`` or ``following``).
+    """
+
+    def __init__(self, path: Path, commit_every: int = 200) -> None:
+        self.path = path
+        self.commit_every = max(1, commit_every)
+        self._conn: sqlite3.Connection | None = None
+        self._pending = 0
+        self._lock = threading.RLock()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._conn.row_factory = sqlite3.Row
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(scrapes)")}
+            if "complete" not in columns:
+                # Bases anteriores: sus scrapes no cuentan como foto completa para los deltas.
+                self._conn.execute("ALTER TABLE scrapes ADD COLUMN complete INTEGER NOT NULL DEFAULT 0")
+        return self._conn
+
+    # ------------------------------------------------------------------
+    # Escritura
+    # ------------------------------------------------------------------
+    def begin_scrape(self, source: str, relation: str) -> int:
+        with self._lock:
+            cursor = self.conn.execute(
+                "INSERT INTO scrapes (source, relation, started_at) VALUES (?, ?, ?)",
+                (source, relation, time.time()),
+            )
+            self.conn.commit()
+            return int(cursor.lastrowid)
+
+    def record(self, scrape_id: int, source: str, relation: str, pk: object, row: dict) -> None:
+        now = time.time()
+        values = [row.get(field) for field in PROFILE_FIELDS]
+        with self._lock:
+            self.conn.execute(
+                f"INSERT OR REPLACE INTO profiles (pk, {', '.join(PROFILE_FIELDS)}, updated_at) "
+                f"VALUES (?, {', '.join('?' for _ in PROFILE_FIELDS)}, ?)",
+                (str(pk), *values, now),
+            )
+            self.conn.execute(
+                "INSERT OR IGNORE INTO appearances (pk, scrape_id, source, relation, seen_at) VALUES (?, ?, ?, ?, ?)",
+                (str(pk), scrape_id, source, relation, now),
+            )
+            self._pending += 1
+            if self._pending >= self.commit_every:
+                self.commit()
+
+    def record_appearance(self, scrape_id: int, source: str, relation: str, pk: object) -> None:
+        """Records that ``pk`` showed up under ``source`` without touching its profile."""
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR IGNORE INTO appearances (pk, scrape_id, source, relation, seen_at) VALUES (?, ?, ?, ?, ?)",
+                (str(pk), scrape_id, source, relation, time.time()),
+            )
+            self._pending += 1
+            if self._pending >= self.commit_every:
+                self.commit()
+
+    def finish_scrape(self, scrape_id: int, complete: bool) -> None:
+        """Marks a scrape as finished; ``complete`` if it listed the whole source (see ``last_snapshot``)."""
+        with self._lock:
+            self.conn.execute(
+                "UPDATE scrapes SET finished_at = ?, complete = ? WHERE id = ?", (time.time(), int(complete), scrape_id)
+            )
+            self.commit()
+
+    def commit(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.commit()
+            self._pending = 0
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.commit()
+                self._conn.close()
+                self._conn = None
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+    def _rows(self, sql: str, params: Sequence) -> List[dict]:
+        with self._lock:
+            cursor = self.conn.execute(sql, params)
+            rows = [dict(row) for row in cursor.fetchall()]
+        for row in rows:
+            for field in ("is_private", "is_verified", "has_highlight_reels"):
+                if row.get(field) is not None:
+                    row[field] = bool(row[field])
+        return rows
+
+    def profile(self, pk: object) -> dict | None:
+        """Latest stored row for ``pk``."""
+        rows = self._rows(f"SELECT {', '.join(PROFILE_FIELDS)} FROM profiles WHERE pk = ?", (str(pk),))
+        return rows[0] if rows else None
+
+    def fresh_profile(self, pk: object, max_age: float) -> dict | None:
+        """Stored row for ``pk`` if it was updated less than ``max_age`` seconds ago."""
+        rows = self._rows(
+            f"SELECT {', '.join(PROFILE_FIELDS)} FROM profiles WHERE pk = ? AND updated_at >= ?",
+            (str(pk), time.time() - max_age),
+        )
+        return rows[0] if rows else None
+
+    def last_snapshot(self, source: str, relation: str) -> tuple[int | None, dict[str, dict]]:
+        """Id and accounts of the last complete scrape of ``source`` / ``relation``.
+
+        Scrapes cut by a limit or a target, or that resumed or continued an
+        earlier one, only listed part of the source and are never used as
+        the baseline. Accounts map each pk to its stored ``username`` and
+        ``followers`` (``None`` for accounts listed without being enriched).
+        """
+        with self._lock:
+            found = self.conn.execute(
+                "SELECT id FROM scrapes WHERE source = ? AND relation = ? AND complete "
+                "ORDER BY id DESC LIMIT 1",
+                (source, relation),
+            ).fetchone()
+            if found is None:
+                return None, {}
+            cursor = self.conn.execute(
+                "SELECT a.pk, p.username, p.followers FROM appearances a "
+                "LEFT JOIN profiles p ON p.pk = a.pk WHERE a.scrape_id = ?",
+                (found[0],),
+            )
+            accounts = {row["pk"]: {"username": row["username"], "followers": row["followers"]} for row in cursor}
+        return int(found[0]), accounts
+
+    def query(
+        self,
+        criteria: FilterCriteria | None = None,
+        relation: str | None = None,
+        sources: Iterable[str] | None = None,
+    ) -> List[dict]:
+        """Profiles matching ``criteria`` that appeared under the given sources.
+
+        Each profile is returned once, with its sources joined by commas. The
+        fixed criteria run in SQL; an ``expression`` filters the rows after.
+        """
+        condition, params = criteria_sql(criteria)
+        filters = [condition]
+        if relation is not None:
+            filters.append("a.relation = ?")
+            params.append(relation)
+        source_list = list(sources or [])
+        if source_list:
+            filters.append(f"a.source IN ({', '.join('?' for _ in source_list)})")
+            params.extend(source_list)
+        sql = (
+            f"SELECT p.pk, {', '.join('p.' + field for field in PROFILE_FIELDS)}, "
+            "GROUP_CONCAT(DISTINCT a.source) AS source "
+            "FROM profiles p JOIN appearances a ON a.pk = p.pk "
+            f"WHERE {' AND '.join(filters)} GROUP BY p.pk ORDER BY p.username"
+        )
+        rows = self._rows(sql, params)
+        if criteria is not None and criteria.compiled is not None:
+            rows = [row for row in rows if criteria.compiled(row)]
+        return rows
+
+    def shared_profiles(self, sources: Iterable[str], relation: str, min_sources: int = 2) -> List[dict]:
+        """Profiles that appear under at least ``min_sources`` of ``sources``."""
+        source_list = list(sources)
+        if not source_list:
+            return []
+        sql = (
+            f"SELECT p.pk, {', '.join('p.' + field for field in PROFILE_FIELDS)}, "
+            "GROUP_CONCAT(DISTINCT a.source) AS source, COUNT(DISTINCT a.source) AS shared "
+            "FROM appearances a JOIN profiles p ON p.pk = a.pk "
+            f"WHERE a.relation = ? AND a.source IN ({', '.join('?' for _ in source_list)}) "
+            "GROUP BY a.pk HAVING COUNT(DISTINCT a.source) >= ? ORDER BY shared DESC, p.username"
+        )
+        return self._rows(sql, [relation, *source_list, min_sources])
+
+    def sources(self, relation: str | None = None) -> List[str]:
+        sql = "SELECT DISTINCT source FROM scrapes"
+        params: list = []
+        if relation is not None:
+            sql += " WHERE relation = ?"
+            params.append(relation)
+        with self._lock:
+            return [row[0] for row in self.conn.execute(sql + " ORDER BY source", params)]
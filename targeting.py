@@ -0,0 +1,151 @@
+"""Target-driven scrapes: stop at N matching accounts or R requests, enriching likely matches first."""
+from __future__ import annotations
+
+import math
+import re
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Iterable, Iterator, Mapping
+
+from filters import FilterCriteria, rejects_early, short_data
+from metrics import RunMetrics
+
+if TYPE_CHECKING:  # pragma: no cover - solo para anotaciones
+    from scraper import ScrapeStats
+
+# Motivos por los que se detiene un scraping con objetivo.
+STOP_REASONS = {"objetivo": "objetivo alcanzado", "presupuesto": "presupuesto de consultas agotado"}
+
+# Nombres con muchos dígitos seguidos suelen ser cuentas nuevas o de relleno.
+_LONG_DIGITS = re.compile(r"\d{4,}")
+# Peso de los likes de la publicación (escala log10) frente a las demás señales.
+LIKES_WEIGHT = 2.0
+
+
+@dataclass
+class ScrapeTarget:
+    """Goal of a scrape: ``matches`` accounts kept and/or at most ``requests`` requests, per source."""
+
+    matches: int | None = None
+    requests: int | None = None
+
+    def __post_init__(self) -> None:
+        if self.matches is None and self.requests is None:
+            raise ValueError("Indica un objetivo de coincidencias o un máximo de consultas.")
+        for value, label in ((self.matches, "El objetivo de coincidencias"), (self.requests, "El máximo de consultas")):
+            if value is not None and value <= 0:
+                raise ValueError(f"{label} debe ser mayor que cero.")
+
+    def describe(self) -> str:
+        parts = []
+        if self.matches is not None:
+            parts.append(f"{self.matches} coincidencias")
+        if self.requests is not None:
+            parts.append(f"{self.requests} consultas")
+        return "Hasta " + " o ".join(parts)
+
+
+def _username_score(username: str) -> float:
+    if not username:
+        return 0.0
+    score = 0.0
+    if _LONG_DIGITS.search(username):
+        score -= 0.5
+    if sum(char in "._" for char in username) >= 2:
+        score -= 0.25
+    if len(username) <= 12 and username.isalpha():
+        score += 0.25
+    return score
+
+
+def priority(user, criteria: FilterCriteria | None, likes: int | None = None) -> float:
+    """Guess of how likely ``user`` is to match ``criteria``, from its short data only.
+
+    Verified accounts and popular posts (``likes``) point to big accounts,
+    so they go first when the criteria ask for a minimum of followers and
+    last when they only cap it. A full name, a plain username and a real
+    profile picture point to an active account either way.
+    """
+    wants_big = criteria is None or criteria.min_followers is not None or bool(criteria.require_verified)
+    wants_small = not wants_big and criteria.max_followers is not None
+    popularity = 1.0 if wants_big else -1.0 if wants_small else 0.0
+
+    score = _username_score(getattr(user, "username", "") or "")
+    if getattr(user, "full_name", None):
+        score += 0.5
+    if getattr(user, "has_anonymous_profile_picture", None):
+        score -= 1.0
+    if getattr(user, "is_verified", None):
+        score += 3.0 * popularity if popularity else 1.0
+    if likes:
+        score += popularity * LIKES_WEIGHT * math.log10(1 + likes)
+    return score
+
+
+class TargetQueue:
+    """Orders the candidates of one targeted stream and decides when it stops.
+
+    ``order`` sorts a batch (a hashtag's authors, a relation page) best
+    first; accounts the prefilter will drop go first since they cost no
+    request. ``met`` and ``exhausted`` are checked by the pipeline, and
+    ``finish`` writes the stop reason and the requests saved to ``stats``.
+    """
+
+    def __init__(
+        self, target: ScrapeTarget, criteria: FilterCriteria | None, stats: "ScrapeStats", metrics: RunMetrics
+    ) -> None:
+        self.target = target
+        self.criteria = criteria
+        self.stats = stats
+        self.metrics = metrics
+        self.reason: str | None = None
+        self._unpulled = 0
+
+    def _rejected(self, user) -> bool:
+        if self.criteria is None:
+            return False
+        return rejects_early(short_data(user), self.criteria)
+
+    def order(self, users: Iterable, likes: Mapping | None = None) -> Iterator:
+        """Yields ``users`` best first; candidates not pulled yet count as skipped in ``finish``."""
+        ranked = []
+        for position, user in enumerate(users):
+            if self._rejected(user):
+                key = (1, 0.0, -position)
+            else:
+                key = (0, priority(user, self.criteria, likes.get(user.pk) if likes else None), -position)
+            ranked.append((key, user))
+        ranked.sort(key=lambda item: item[0], reverse=True)
+        # En relaciones se llama una vez por página: las candidatas pendientes se acumulan.
+        self._unpulled += sum(1 for key, _ in ranked if not key[0])
+        for key, user in ranked:
+            if not key[0]:
+                self._unpulled -= 1
+            yield user
+
+    def met(self) -> bool:
+        """True once the stream kept ``target.matches`` accounts.
+
+        Rows already requested when the budget ran out are still handed over,
+        so running out of requests does not count here.
+        """
+        if self.target.matches is None or self.stats.kept < self.target.matches:
+            return False
+        self.reason = self.reason or "objetivo"
+        return True
+
+    def exhausted(self, in_flight: int = 0) -> bool:
+        """True once the requests made plus ``in_flight`` reach ``target.requests``."""
+        if self.target.requests is not None and self.metrics.request_count + in_flight >= self.target.requests:
+            self.reason = self.reason or "presupuesto"
+        return self.reason is not None
+
+    def finish(self) -> None:
+        stats = self.stats
+        stats.spent_requests = self.metrics.request_count
+        if self.reason is None:
+            return
+        stats.target_stop = self.reason
+        stats.skipped = self._unpulled
+        # Las candidatas sin consultar habrían salido de la caché en la misma proporción que las consultadas.
+        served = stats.cache_hits + stats.reused + stats.cache_misses
+        stats.saved_requests = round(self._unpulled * (stats.cache_misses / served if served else 1.0))
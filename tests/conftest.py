@@ -0,0 +1,45 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# Los módulos del proyecto viven en la raíz del repositorio, sin paquete.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+@pytest.fixture
+def make_service(tmp_path):
+    """Builds ``ScraperService`` instances over ``FakeClient`` that share one state directory."""
+    try:
+        import scraper
+    except SystemExit as exc:
+        # scraper termina el proceso cuando instagrapi no se puede importar.
+        pytest.skip(str(exc))
+    from cache import ProfileCache
+    from checkpoint import CheckpointJournal
+    from pacing import TokenBucket
+    from seen import SeenIndex
+    from store import ResultStore
+
+    services = []
+
+    def build(client, rate=1000.0, **kwargs):
+        kwargs.setdefault("rate_limiter", TokenBucket(rate))
+        service = scraper.ScraperService(
+            tmp_path / "session.json",
+            profile_cache=ProfileCache(tmp_path / "profiles.json"),
+            checkpoints=CheckpointJournal(tmp_path / "checkpoints.jsonl"),
+            client_factory=lambda base: base.clone(),
+            result_store=ResultStore(tmp_path / "store.sqlite3"),
+            seen_index=SeenIndex(tmp_path / "seen.bin"),
+            **kwargs,
+        )
+        service.client = client
+        service.mark_authenticated(client.username)
+        services.append(service)
+        return service
+
+    yield build
+    for service in services:
+        service.result_store.close()
+        service.checkpoints.close()
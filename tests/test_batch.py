@@ -0,0 +1,59 @@
+import io
+import json
+
+import pytest
+
+import batch
+import cli
+import utils
+
+
+@pytest.mark.parametrize(
+    "job",
+    [
+        {"type": "hashtag", "hashtag": "viajes", "amount": -5},
+        {"type": "hashtag", "hashtag": "viajes", "amount": 0},
+        {"type": "hashtag", "hashtag": "viajes", "amount": "abc"},
+        {"type": "profiles", "usernames": ["ana"], "limit": 0},
+        {"type": "profiles", "usernames": ["ana"], "limit": -1},
+        {"type": "profiles", "usernames": ["ana"], "limit": [1]},
+    ],
+)
+def test_counts_below_one_are_rejected(job):
+    with pytest.raises(batch.JobFileError):
+        batch.job_from_mapping(job)
+
+
+def test_counts_are_optional():
+    assert batch.job_from_mapping({"type": "profiles", "usernames": ["ana"], "limit": None}).limit is None
+    assert batch.job_from_mapping({"type": "profiles", "usernames": ["ana"], "limit": "3"}).limit == 3
+
+
+@pytest.mark.parametrize("argv", [["hashtag", "viajes", "--amount", "0"], ["profiles", "ana", "--limit", "-2"]])
+def test_cli_rejects_counts_below_one(argv, capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        cli.build_parser().parse_args(argv)
+    assert exit_info.value.code == 2
+    assert "mayor que cero" in capsys.readouterr().err
+
+
+def test_failed_hashtag_scrape_keeps_the_previous_results(make_service, tmp_path, monkeypatch):
+    fake_client = pytest.importorskip("fake_client")
+    from scraper import ClientError
+
+    class BlockedClient(fake_client.FakeClient):
+        def hashtag_medias_recent(self, name, amount=27):
+            raise ClientError("challenge_required")
+
+    monkeypatch.setattr(utils, "get_results_root", lambda: tmp_path / "resultados")
+    output_path = utils.hashtag_output_path("viajes")
+    output_path.parent.mkdir(parents=True)
+    output_path.write_text("username\nanterior\n", encoding="utf-8")
+
+    events = io.StringIO()
+    job = batch.job_from_mapping({"type": "hashtag", "hashtag": "viajes", "amount": 10})
+    code = batch.run_jobs(make_service(BlockedClient()), [job], batch.ProgressEmitter(events))
+
+    assert code != 0
+    assert any(json.loads(line)["event"] == "job_error" for line in events.getvalue().splitlines())
+    assert output_path.read_text(encoding="utf-8") == "username\nanterior\n"
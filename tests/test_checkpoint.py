@@ -0,0 +1,73 @@
+import pytest
+
+from checkpoint import CheckpointJournal
+from pacing import AdaptivePacer, TokenBucket
+
+
+def test_replay_rebuilds_progress_and_skips_damaged_lines(tmp_path):
+    path = tmp_path / "checkpoints.jsonl"
+    journal = CheckpointJournal(path, fsync_every=2)
+    for pk in (1, 2, 3):
+        journal.record("ana", "followers", pk)
+    journal.record_cursor("ana", "followers", "20")
+    journal.record("bob", "following", 9)
+    journal.mark_complete("bob", "following")
+    journal.close()
+    with path.open("a", encoding="utf-8") as file:
+        file.write("{no es json\n")
+
+    again = CheckpointJournal(path)
+    assert again.processed("ana", "followers") == {"1", "2", "3"}
+    assert again.cursor("ana", "followers") == "20"
+    assert not again.is_complete("ana", "followers")
+    assert again.is_complete("bob", "following")
+    assert again.cursor("bob", "following") is None
+    again.reset("ana", "followers")
+    again.close()
+    assert not CheckpointJournal(path).has_progress("ana", "followers")
+
+
+def test_resume_skips_the_rows_processed_before_a_rate_limit(make_service, monkeypatch):
+    import scraper
+
+    fake_client = pytest.importorskip("fake_client")
+    monkeypatch.setattr(scraper, "RELATION_PAGE_SIZE", 10)
+    dataset = fake_client.SyntheticDataset(users=300, relation_size=45)
+
+    class ThrottledClient(fake_client.FakeClient):
+        """Starts answering ``user_info`` with a rate limit after ``budget`` profiles."""
+
+        def __init__(self, budget):
+            super().__init__(dataset)
+            self.budget = [budget]
+
+        def user_info(self, user_id):
+            if self.budget[0] <= 0:
+                raise fake_client.RateLimitError("Please wait a few minutes before you try again.")
+            self.budget[0] -= 1
+            return super().user_info(user_id)
+
+    def no_retries():
+        return AdaptivePacer(TokenBucket(1000.0), base_backoff=0.0, max_retries=0)
+
+    source = "user_7"
+    everyone = [dataset.profile(pk).username for pk in dataset.relation(dataset.pk_for_username(source), "followers")]
+
+    first = make_service(ThrottledClient(budget=23), pacer=no_retries())
+    _, stream = next(first.stream_profile_relations([source], "followers"))
+    before = []
+    with pytest.raises(RuntimeError, match="rate limit"):
+        for row in stream:
+            before.append(row["username"])
+    assert len(before) == 23
+    assert not first.checkpoints.is_complete(source, "followers")
+
+    client = fake_client.FakeClient(dataset)
+    second = make_service(client, pacer=no_retries())
+    result = second.scrape_profile_relations([source], "followers", resume=True)[source]
+    after = [row["username"] for row in result.rows]
+    assert before + after == everyone
+    # Ni las filas ya procesadas ni las páginas completas se vuelven a pedir.
+    assert client.calls["user_info"] == len(after)
+    assert client.calls["user_followers_v1_chunk"] == 3
+    assert second.checkpoints.is_complete(source, "followers")
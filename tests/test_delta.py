@@ -0,0 +1,32 @@
+import pytest
+
+from filters import FilterCriteria
+
+DAY = 24 * 3600.0
+
+
+def test_refresh_compares_against_the_last_complete_listing(make_service, monkeypatch):
+    import scraper
+
+    fake_client = pytest.importorskip("fake_client")
+    monkeypatch.setattr(scraper, "RELATION_PAGE_SIZE", 10)
+    dataset = fake_client.SyntheticDataset(users=300, relation_size=35)
+    source = "user_7"
+    everyone = {str(pk) for pk in dataset.relation(dataset.pk_for_username(source), "followers")}
+
+    # El prefiltro descarta por nombre la mayoría de las cuentas sin consultarlas.
+    criteria = FilterCriteria(expression="username ~ /7/")
+    full = make_service(fake_client.FakeClient(dataset))
+    full.scrape_profile_relations([source], "followers", criteria)
+    snapshot_id, accounts = full.result_store.last_snapshot(source, "followers")
+    assert set(accounts) == everyone
+
+    cut = make_service(fake_client.FakeClient(dataset))
+    cut.scrape_profile_relations([source], "followers", limit=5)
+    assert cut.result_store.last_snapshot(source, "followers")[0] == snapshot_id
+
+    refresh = make_service(fake_client.FakeClient(dataset))
+    _, stream = next(refresh.stream_profile_relations([source], "followers", refresh_age=DAY))
+    stream.collect()
+    assert stream.delta.previous_scrape == snapshot_id
+    assert stream.delta.summary() == {"listed": 35, "added": 0, "removed": 0, "changed": 0, "complete": True}
@@ -0,0 +1,111 @@
+import itertools
+
+import pandas as pd
+import pytest
+
+from expressions import FilterSyntaxError, parse_expression
+from filters import FilterCriteria, filter_mask, matches, rejects_early
+from records import ROW_FIELDS
+
+EXPRESSIONS = [
+    "followers between 1k and 50k and not is_private",
+    "posts >= 10 or is_verified",
+    "following != 0 and followers < 2k",
+    "full_name ~ /coach/i or username !~ /shop|store/",
+    "not (full_name = 'Ana' or has_highlights) and username != 'x'",
+    "public and (verified = true or media_count > 3)",
+]
+
+
+def _rows():
+    names = (None, "", "ana", "coach_ana", "shop.store")
+    full_names = (None, "", "Ana", "Life Coach")
+    numbers = (None, 0, 5, 1_500, 60_000)
+    flags = (None, False, True)
+    for username, full_name, followers, media_count, is_private, is_verified in itertools.product(
+        names, full_names, numbers, numbers, flags, flags
+    ):
+        yield {
+            "username": username,
+            "full_name": full_name,
+            "followers": followers,
+            "following": followers,
+            "media_count": media_count,
+            "is_private": is_private,
+            "is_verified": is_verified,
+            "has_highlight_reels": is_verified,
+        }
+
+
+ROWS = list(_rows())
+FRAME = pd.DataFrame(ROWS, columns=ROW_FIELDS, dtype=object)
+
+
+@pytest.mark.parametrize("text", EXPRESSIONS)
+def test_row_predicate_mask_and_reparsed_text_agree(text):
+    expression = parse_expression(text)
+    again = parse_expression(expression.text)
+    expected = [expression(row) for row in ROWS]
+    assert expression.mask(FRAME).tolist() == expected
+    assert [again(row) for row in ROWS] == expected
+
+
+@pytest.mark.parametrize("text", EXPRESSIONS)
+def test_lifted_criteria_filter_like_the_expression(text):
+    expression = parse_expression(text)
+    criteria = FilterCriteria.from_expression(text)
+    expected = [expression(row) for row in ROWS]
+    assert [matches(row, criteria) for row in ROWS] == expected
+    assert filter_mask(FRAME, criteria).tolist() == expected
+
+
+@pytest.mark.parametrize(
+    "text", ["full_name = 'bob'", "full_name != 'bob'", "full_name ~ /b/", "full_name !~ /b/", "followers != 3"]
+)
+def test_missing_value_never_satisfies_a_comparison(text):
+    criteria = FilterCriteria(expression=text)
+    missing = {"full_name": None, "followers": None}
+    assert not matches(missing, criteria)
+    assert not filter_mask(pd.DataFrame([missing], dtype=object), criteria).iloc[0]
+
+
+def test_not_holds_for_a_missing_value():
+    expression = parse_expression("not full_name ~ /b/")
+    assert expression({"full_name": None})
+    assert expression.mask(pd.DataFrame([{"full_name": None}], dtype=object)).iloc[0]
+
+
+def test_missing_flag_counts_as_false():
+    assert parse_expression("is_verified = false")({"is_verified": None})
+    assert not parse_expression("is_verified")({})
+
+
+@pytest.mark.parametrize("text", ["   ", "followers >", "foo > 1", "username ~ /[/", "followers > 1 and", "username > 'a'"])
+def test_syntax_errors_are_value_errors(text):
+    with pytest.raises(FilterSyntaxError):
+        parse_expression(text)
+    with pytest.raises(ValueError):
+        FilterCriteria(expression=text)
+
+
+@pytest.mark.parametrize("text", ["full_name ~ /coach/i", "full_name !~ /bot/", "full_name = 'Ana'", "username ~ /a/"])
+def test_empty_short_text_is_unknown(text):
+    expression = parse_expression(text)
+    assert expression.decide({"username": "", "full_name": ""}) is None
+
+
+def test_short_data_rejects_only_when_it_can_tell():
+    criteria = FilterCriteria(expression="username ~ /coach/ and full_name ~ /life/i")
+    assert rejects_early({"username": "shop", "full_name": ""}, criteria)
+    assert not rejects_early({"username": "coach_ana", "full_name": ""}, criteria)
+    assert rejects_early({"username": "coach_ana", "full_name": "Ana"}, criteria)
+    assert not rejects_early({"username": "coach_ana", "full_name": None, "is_private": True}, criteria)
+
+
+def test_short_data_never_rejects_a_matching_row():
+    expression = parse_expression(EXPRESSIONS[3])
+    for row in ROWS:
+        short = {field: row[field] for field in ("username", "full_name")}
+        short["full_name"] = ""
+        if expression.decide(short) is False:
+            assert not expression(row)
@@ -0,0 +1,39 @@
+import itertools
+
+import pandas as pd
+import pytest
+
+from filters import FilterCriteria, filter_mask, matches
+from records import ROW_FIELDS, UserRow
+
+EDGE_VALUES = (None, 0, 1, 5)
+CRITERIA = [
+    FilterCriteria(min_posts=0),
+    FilterCriteria(min_posts=1),
+    FilterCriteria(min_posts=-1),
+    FilterCriteria(min_followers=0),
+    FilterCriteria(max_followers=0),
+    FilterCriteria(min_followers=0, max_followers=1, min_posts=0),
+]
+
+
+def _rows():
+    for followers, media_count in itertools.product(EDGE_VALUES, EDGE_VALUES):
+        yield UserRow(username="cuenta", followers=followers, media_count=media_count)
+
+
+@pytest.mark.parametrize("criteria", CRITERIA, ids=FilterCriteria.to_expression)
+def test_userrow_dict_and_mask_agree_on_zero_and_missing_values(criteria):
+    rows = list(_rows())
+    frame = pd.DataFrame([{name: row.get(name) for name in ROW_FIELDS} for row in rows], dtype=object)
+    mask = filter_mask(frame, criteria).tolist()
+    for row, vectorized in zip(rows, mask):
+        as_dict = matches(dict(row), criteria)
+        assert matches(row, criteria) == as_dict == vectorized, row
+
+
+def test_zero_posts_counts_as_missing():
+    criteria = FilterCriteria(min_posts=0)
+    assert not matches(UserRow(media_count=0), criteria)
+    assert not matches({"media_count": 0}, criteria)
+    assert matches({"media_count": 0, "posts": 3}, criteria)
@@ -0,0 +1,26 @@
+from output import OutputOptions, open_output
+
+
+def test_output_is_not_touched_when_the_scrape_fails_before_its_first_row(tmp_path):
+    path = tmp_path / "result.csv"
+    path.write_text("username\nanterior\n", encoding="utf-8")
+    try:
+        with open_output(path, ["username"], options=OutputOptions(background=False)):
+            raise RuntimeError("rate limit")
+    except RuntimeError:
+        pass
+    assert path.read_text(encoding="utf-8") == "username\nanterior\n"
+
+
+def test_output_is_replaced_once_rows_arrive_or_the_scrape_ends(tmp_path):
+    path = tmp_path / "result.csv"
+    path.write_text("username\nanterior\n", encoding="utf-8")
+    with open_output(path, ["username"]) as writer:
+        writer.write({"username": "nueva"})
+    assert writer.rows_written == 1
+    assert path.read_text(encoding="utf-8").split() == ["username", "nueva"]
+
+    with open_output(path, ["username"]) as writer:
+        pass
+    assert writer.rows_written == 0
+    assert path.read_text(encoding="utf-8").split() == ["username"]
@@ -0,0 +1,75 @@
+import threading
+import time
+
+import pytest
+
+from pacing import AdaptivePacer, TokenBucket
+
+
+def _hammer(acquire, threads=8, per_thread=10):
+    """Calls ``acquire`` from several threads at once and returns the seconds it took."""
+    barrier = threading.Barrier(threads)
+
+    def worker():
+        barrier.wait()
+        for _ in range(per_thread):
+            acquire()
+
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    start = time.monotonic()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    return time.monotonic() - start
+
+
+def test_token_bucket_bounds_the_rate_of_concurrent_workers():
+    bucket = TokenBucket(rate=200.0)
+    elapsed = _hammer(bucket.acquire)
+    # 80 solicitudes con un token inicial: al menos 79 reposiciones a 200/s.
+    assert elapsed >= 79 / 200 * 0.95
+
+
+def test_reserve_never_hands_out_more_tokens_than_the_capacity():
+    bucket = TokenBucket(rate=0.001, capacity=3)
+    granted = [bucket.reserve() == 0 for _ in range(10)]
+    assert granted.count(True) == 3
+    assert bucket.reserve() > 0
+
+
+def test_pacer_throttle_pauses_every_worker():
+    pacer = AdaptivePacer(TokenBucket(200.0), base_backoff=0.3, jitter=0.0)
+    delay = pacer.on_throttle("RateLimitError")
+    assert delay == pytest.approx(0.3)
+    assert pacer.current_rate == pytest.approx(100.0)
+    elapsed = _hammer(pacer.acquire, threads=4, per_thread=1)
+    assert elapsed >= 0.25
+
+
+def test_pacer_only_climbs_back_to_its_starting_rate_by_default():
+    pacer = AdaptivePacer(TokenBucket(1.0), increase=0.5, base_backoff=0.0)
+    pacer.on_throttle("RateLimitError")
+    for _ in range(5):
+        pacer.on_success()
+    assert pacer.current_rate == 1.0
+    faster = AdaptivePacer(TokenBucket(1.0), max_rate=2.0, increase=0.5)
+    for _ in range(5):
+        faster.on_success()
+    assert faster.current_rate == 2.0
+
+
+def test_enrichment_workers_share_one_pacer(make_service):
+    fake_client = pytest.importorskip("fake_client")
+    rate = 100.0
+    client = fake_client.FakeClient(fake_client.SyntheticDataset(users=200), latency=0.01)
+    service = make_service(client, rate=rate, workers=4)
+    start = time.monotonic()
+    rows = service.scrape_hashtag("viajes", 30).rows
+    elapsed = time.monotonic() - start
+    requests = sum(client.calls.values())
+    assert requests > 20
+    assert elapsed >= (requests - 1) / rate * 0.95
+    # Los workers no alteran el orden: las filas siguen el de las publicaciones.
+    authors = dict.fromkeys(media.user.username for media in client.hashtag_medias_recent("viajes", 30))
+    assert [row["username"] for row in rows] == list(authors)
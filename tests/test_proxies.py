@@ -0,0 +1,83 @@
+import threading
+import time
+from collections import Counter
+
+import pytest
+from instagrapi.exceptions import ClientConnectionError, RateLimitError
+
+from proxies import CLOSED, HALF_OPEN, OPEN, NoHealthyProxies, ProxyPool
+
+
+def _send(pool, seconds=0.01, error=None):
+    proxy = pool.acquire()
+    pool.release(proxy, seconds, error)
+    return proxy
+
+
+def test_breaker_opens_half_opens_and_closes():
+    pool = ProxyPool(["http://a:1"], breaker_threshold=2, breaker_cooldown=0.1)
+    _send(pool, error=ClientConnectionError("caído"))
+    proxy = _send(pool, error=ClientConnectionError("caído"))
+    assert proxy.state == OPEN and proxy.trips == 1
+
+    start = time.monotonic()
+    trial = pool.acquire()
+    assert time.monotonic() - start >= 0.08
+    assert trial is proxy and proxy.state == HALF_OPEN
+
+    # Con el circuito semiabierto solo pasa una solicitud de prueba a la vez.
+    waiting = threading.Thread(target=lambda: pool.release(pool.acquire(), 0.01))
+    waiting.start()
+    waiting.join(0.05)
+    assert waiting.is_alive()
+    pool.release(trial, 0.01)
+    waiting.join(1)
+    assert not waiting.is_alive()
+    assert proxy.state == CLOSED and proxy.consecutive_failures == 0
+
+
+def test_failed_trial_reopens_and_repeated_trips_evict():
+    pool = ProxyPool(["http://a:1"], breaker_threshold=1, breaker_cooldown=0.05, max_trips=2)
+    proxy = _send(pool, error=ClientConnectionError("caído"))
+    assert proxy.state == OPEN
+    _send(pool, error=ClientConnectionError("caído"))
+    assert proxy.evicted and proxy.trips == 2
+    with pytest.raises(NoHealthyProxies):
+        pool.acquire()
+    assert pool.report()[0]["status"].startswith("descartado")
+
+
+def test_error_rate_evicts_only_for_proxy_errors():
+    throttled = ProxyPool(["http://a:1"], min_requests=5, evict_error_rate=0.5)
+    for _ in range(5):
+        proxy = _send(throttled, error=RateLimitError("espera"))
+    assert proxy.evicted
+    # Un 404 o una cuenta privada no dicen nada del proxy.
+    missing = ProxyPool(["http://b:1"], min_requests=5, evict_error_rate=0.5)
+    for _ in range(10):
+        proxy = _send(missing, error=KeyError("no encontrado"))
+    assert not proxy.evicted and proxy.errors == 0
+
+
+def test_selection_leans_toward_fast_proxies_but_rotates():
+    pool = ProxyPool(["http://rapido:1", "http://lento:1"], seed=7)
+    fast, slow = pool.proxies
+    latency = {fast.url: 0.01, slow.url: 0.5}
+    picks = Counter()
+    for _ in range(2000):
+        proxy = pool.acquire()
+        picks[proxy.url] += 1
+        pool.release(proxy, latency[proxy.url])
+    assert picks[fast.url] > 0.9 * 2000
+    assert picks[slow.url] > 0
+
+
+def test_call_retries_a_connection_error_through_another_proxy():
+    fake_client = pytest.importorskip("fake_client")
+    client = fake_client.FakeClient(faults=fake_client.FaultPlan(dead_proxies=("http://caido:1",)))
+    pool = ProxyPool(["http://caido:1", "http://sano:1"], breaker_threshold=1, breaker_cooldown=60, seed=3)
+    for _ in range(20):
+        assert pool.call(client, client.user_id_from_username, "user_5") == "5"
+    dead, alive = pool.proxies
+    assert dead.state == OPEN and dead.connection_errors >= 1
+    assert alive.requests == 20 and alive.errors == 0
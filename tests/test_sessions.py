@@ -0,0 +1,83 @@
+import threading
+import time
+from collections import Counter
+
+import pytest
+
+from pacing import TokenBucket
+from sessions import PooledAccount, SessionPool
+
+
+def _pool(names, rate=1000.0, clients=None):
+    clients = clients or {}
+    return SessionPool([PooledAccount(name, clients.get(name, object()), TokenBucket(rate)) for name in names])
+
+
+def test_each_account_is_leased_to_one_worker_at_a_time():
+    pool = _pool(["a", "b", "c"])
+    holders = Counter()
+    overlaps = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(8)
+
+    def worker():
+        barrier.wait()
+        for _ in range(20):
+            with pool.lease() as account:
+                with lock:
+                    holders[account.name] += 1
+                    if holders[account.name] > 1:
+                        overlaps.append(account.name)
+                time.sleep(0.001)
+                with lock:
+                    holders[account.name] -= 1
+                pool.record_success(account)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not overlaps
+    report = pool.report()
+    assert sum(entry["leases"] for entry in report) == 160
+    assert sum(entry["requests"] for entry in report) == 160
+    assert all(entry["leases"] for entry in report)
+
+
+def test_quarantined_account_is_skipped_until_released():
+    pool = _pool(["a", "b"])
+    with pool.lease() as account:
+        pool.quarantine(account, "ChallengeRequired", seconds=0.2)
+    quarantined = account.name
+    for _ in range(5):
+        with pool.lease() as other:
+            assert other.name != quarantined
+    time.sleep(0.25)
+    leased = set()
+    for _ in range(10):
+        with pool.lease() as any_account:
+            leased.add(any_account.name)
+    assert quarantined in leased
+    entry = next(entry for entry in pool.report() if entry["account"] == quarantined)
+    assert entry["quarantines"] == 1 and entry["errors"] == 1
+
+
+def test_scrape_moves_off_a_rate_limited_account(make_service):
+    fake_client = pytest.importorskip("fake_client")
+    dataset = fake_client.SyntheticDataset(users=200)
+    clients = {
+        "limitada": fake_client.FakeClient(dataset, faults=fake_client.FaultPlan(rate_limit=1.0)),
+        "sana": fake_client.FakeClient(dataset),
+        "otra": fake_client.FakeClient(dataset),
+    }
+    authors = {media.user.pk for media in fake_client.FakeClient(dataset).hashtag_medias_recent("viajes", 30)}
+    pool = _pool(list(clients), clients=clients)
+    service = make_service(clients["sana"], workers=3, session_pool=pool)
+    rows = service.scrape_hashtag("viajes", 30).rows
+    assert len(rows) == len(authors)
+    report = {entry["account"]: entry for entry in pool.report()}
+    assert report["limitada"]["quarantines"] == 1
+    assert report["limitada"]["status"].startswith("cuarentena")
+    served = sum(sum(clients[name].calls.values()) for name in ("sana", "otra"))
+    assert report["sana"]["requests"] + report["otra"]["requests"] == served == len(authors) + 1
@@ -0,0 +1,40 @@
+import sqlite3
+
+from store import ResultStore
+
+
+def test_last_snapshot_skips_partial_scrapes(tmp_path):
+    store = ResultStore(tmp_path / "store.sqlite3")
+    full = store.begin_scrape("ana", "followers")
+    for pk in (1, 2, 3):
+        store.record_appearance(full, "ana", "followers", pk)
+    store.finish_scrape(full, complete=True)
+    partial = store.begin_scrape("ana", "followers")
+    store.record_appearance(partial, "ana", "followers", 1)
+    store.finish_scrape(partial, complete=False)
+    unfinished = store.begin_scrape("ana", "followers")
+    store.record_appearance(unfinished, "ana", "followers", 9)
+
+    scrape_id, accounts = store.last_snapshot("ana", "followers")
+    assert scrape_id == full
+    assert set(accounts) == {"1", "2", "3"}
+    assert store.last_snapshot("ana", "following") == (None, {})
+    store.close()
+
+
+def test_older_databases_gain_the_complete_column(tmp_path):
+    path = tmp_path / "store.sqlite3"
+    with sqlite3.connect(path) as conn:
+        conn.execute(
+            "CREATE TABLE scrapes (id INTEGER PRIMARY KEY AUTOINCREMENT, source TEXT NOT NULL, "
+            "relation TEXT NOT NULL, started_at REAL NOT NULL, finished_at REAL)"
+        )
+        conn.execute("INSERT INTO scrapes (source, relation, started_at, finished_at) VALUES ('ana', 'followers', 1, 2)")
+    conn.close()
+    store = ResultStore(path)
+    # Sin saber si el scrape anterior fue completo, no sirve de referencia.
+    assert store.last_snapshot("ana", "followers") == (None, {})
+    scrape_id = store.begin_scrape("ana", "followers")
+    store.finish_scrape(scrape_id, complete=True)
+    assert store.last_snapshot("ana", "followers")[0] == scrape_id
+    store.close()
@@ -2,10 +2,19 @@
 from __future__ import annotations
 
 import csv
+import glob
+import gzip
+import io
 import json
 import logging
+import os
+import re
+import time
+import zlib
 from pathlib import Path
-from typing import Iterable, Mapping, Sequence
+from typing import IO, Iterable, Mapping, Sequence
+
+from metrics import RunMetrics
 
 APP_HEADER = "INSTAGRAM SCRAPER CLI - propiedad de matidiazlife/elite"
 
@@ -22,6 +31,10 @@ def get_session_meta_path() -> Path:
     return get_project_root() / "session_meta.json"
 
 
+def get_sessions_dir() -> Path:
+    return get_project_root() / "sessions"
+
+
 def get_desktop_path() -> Path:
     desktop = Path.home() / "Desktop"
     if desktop.exists():
@@ -39,18 +52,389 @@ def get_results_root() -> Path:
     return root
 
 
+def get_profile_cache_path() -> Path:
+    return get_results_root() / ".cache" / "profiles.json"
+
+
+def get_seen_index_path() -> Path:
+    return get_results_root() / ".cache" / "seen_pks.bin"
+
+
+def get_store_path() -> Path:
+    return get_results_root() / "resultados.sqlite3"
+
+
+def get_checkpoint_path() -> Path:
+    return get_results_root() / ".checkpoints.jsonl"
+
+
 def ensure_directory(path: Path) -> Path:
     path.mkdir(parents=True, exist_ok=True)
     return path
 
 
+# Compresión de los CSV de resultados y la extensión que agrega cada una.
+COMPRESSIONS = {"gzip": ".gz", "zstd": ".zst"}
+
+
+def _require_zstandard():
+    try:
+        import zstandard
+    except ImportError as exc:
+        raise RuntimeError(
+            "La compresión zstd requiere zstandard. Instálalo con `pip install zstandard`."
+        ) from exc
+    return zstandard
+
+
+class CsvAppender:
+    """Writes CSV rows incrementally so partial results survive interruptions.
+
+    The header is only written when the file is new (or when ``append`` is
+    ``False``), and the file is flushed every ``flush_every`` rows. With
+    ``compression`` (``gzip`` or ``zstd``) every run appends a new
+    compressed member/frame, which readers decode as one stream.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        fieldnames: Sequence[str],
+        append: bool = False,
+        flush_every: int = 50,
+        metrics: RunMetrics | None = None,
+        compression: str | None = None,
+    ) -> None:
+        ensure_directory(path.parent)
+        self.path = path
+        self.rows_written = 0
+        self.flush_every = max(1, flush_every)
+        self.metrics = metrics
+        self.compression = compression
+        write_header = not append or not path.exists() or path.stat().st_size == 0
+        self._raw = path.open("ab" if append else "wb")
+        if compression == "gzip":
+            self._stream = gzip.GzipFile(fileobj=self._raw, mode="ab")
+        elif compression == "zstd":
+            self._stream = _require_zstandard().ZstdCompressor().stream_writer(self._raw, closefd=False)
+        else:
+            self._stream = self._raw
+        self._file = io.TextIOWrapper(self._stream, encoding="utf-8", newline="")
+        self._writer = csv.DictWriter(self._file, fieldnames=fieldnames, extrasaction="ignore")
+        if write_header:
+            self._writer.writeheader()
+
+    def write(self, row: Mapping[str, object]) -> None:
+        start = time.perf_counter() if self.metrics is not None else 0.0
+        self._writer.writerow(row)
+        self.rows_written += 1
+        if self.rows_written % self.flush_every == 0:
+            self._file.flush()
+        if self.metrics is not None:
+            self.metrics.add_stage("write", time.perf_counter() - start)
+            self.metrics.count("written")
+
+    def size(self) -> int:
+        """Bytes on disk so far (compressed bytes when compressing)."""
+        return self._raw.tell()
+
+    def sync(self) -> None:
+        """Makes every row written so far readable and durable on disk (flush + ``fsync``)."""
+        if self._file.closed:
+            return
+        self._file.flush()
+        if self.compression == "gzip":
+            self._stream.flush(zlib.Z_SYNC_FLUSH)
+        elif self.compression == "zstd":
+            self._stream.flush(_require_zstandard().FLUSH_BLOCK)
+        self._raw.flush()
+        os.fsync(self._raw.fileno())
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self._file.close()
+        if not self._raw.closed:
+            self._raw.close()
+
+    def __enter__(self) -> "CsvAppender":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+# Tipos de cada columna de resultados; definen el esquema Parquet y la lectura tipada de CSV.
+FIELD_TYPES = {
+    "username": "string",
+    "full_name": "string",
+    "followers": "int",
+    "following": "int",
+    "media_count": "int",
+    "is_private": "bool",
+    "is_verified": "bool",
+    "has_highlight_reels": "bool",
+    "source": "string",
+}
+
+OUTPUT_FORMATS = {"csv": ".csv", "parquet": ".parquet"}
+# Extensiones completas de un archivo de resultados (las más largas primero).
+RESULT_EXTENSIONS = (".csv.gz", ".csv.zst", ".csv", ".parquet")
+_SHARD_NAME = re.compile(r"^(?P<stem>.+)\.part(?P<index>\d{3,})$")
+
+
+def result_fields(extra_source: bool | None = False) -> list[str]:
+    base = [name for name in FIELD_TYPES if name != "source"]
+    if extra_source:
+        base.append("source")
+    return base
+
+
+def result_extension(output_format: str = "csv", compression: str | None = None) -> str:
+    """Parquet compresses internally, so only CSV files carry the compression suffix."""
+    extension = OUTPUT_FORMATS[output_format]
+    if output_format == "csv" and compression:
+        extension += COMPRESSIONS[compression]
+    return extension
+
+
+def split_result_name(path: Path) -> tuple[str, str]:
+    """``("followers", ".csv.gz")`` for ``followers.csv.gz``."""
+    name = path.name
+    for extension in RESULT_EXTENSIONS:
+        if name.endswith(extension) and len(name) > len(extension):
+            return name[: -len(extension)], extension
+    return path.stem, path.suffix
+
+
+def result_format(path: Path) -> tuple[str, str | None]:
+    """Output format and compression of a result file, from its extension."""
+    _, extension = split_result_name(path)
+    if extension == ".parquet":
+        return "parquet", None
+    compression = next((name for name, suffix in COMPRESSIONS.items() if extension.endswith(suffix)), None)
+    return "csv", compression
+
+
+def shard_path(path: Path, index: int) -> Path:
+    """Path of shard ``index`` of ``path``; shard 1 is ``path`` itself."""
+    if index <= 1:
+        return path
+    stem, extension = split_result_name(path)
+    return path.with_name(f"{stem}.part{index:03d}{extension}")
+
+
+def result_shards(path: Path) -> list[Path]:
+    """Existing shards of ``path`` in order (``path`` first, then ``.part002``...)."""
+    stem, extension = split_result_name(path)
+    shards = []
+    if path.parent.is_dir():
+        for candidate in path.parent.glob(f"{glob.escape(stem)}.part*{extension}"):
+            match = _SHARD_NAME.match(split_result_name(candidate)[0])
+            if match and match.group("stem") == stem:
+                shards.append((int(match.group("index")), candidate))
+    return ([path] if path.exists() else []) + [candidate for _, candidate in sorted(shards)]
+
+
+def hashtag_output_path(hashtag: str, output_format: str = "csv", compression: str | None = None) -> Path:
+    return get_results_root() / hashtag / f"result{result_extension(output_format, compression)}"
+
+
+def relation_output_path(
+    username: str, relation: str, output_format: str = "csv", compression: str | None = None
+) -> Path:
+    file_name = "followers" if relation == "followers" else "following"
+    return get_results_root() / "perfiles" / username / f"{file_name}{result_extension(output_format, compression)}"
+
+
+def filtered_output_path(input_path: Path) -> Path:
+    return input_path.with_name(f"filtered_result{split_result_name(input_path)[1]}")
+
+
+_PANDAS_DTYPES = {"string": "string", "int": "Int64", "bool": "boolean"}
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet  # noqa: F401
+    except ImportError as exc:
+        raise RuntimeError(
+            "El formato Parquet requiere pyarrow. Instálalo con `pip install pyarrow`."
+        ) from exc
+    return pyarrow
+
+
+def arrow_schema(fieldnames: Sequence[str]):
+    """Builds the Arrow schema for ``fieldnames`` from ``FIELD_TYPES``."""
+    pa = _require_pyarrow()
+    types = {"string": pa.string(), "int": pa.int64(), "bool": pa.bool_()}
+    return pa.schema([(name, types[FIELD_TYPES.get(name, "string")]) for name in fieldnames])
+
+
+class ParquetAppender:
+    """Typed columnar counterpart of ``CsvAppender``.
+
+    Rows are buffered and written as Parquet row groups of ``batch_size``
+    rows. Parquet files cannot be appended to, so ``append`` rewrites the
+    existing rows into the new file first.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        fieldnames: Sequence[str],
+        append: bool = False,
+        batch_size: int = 1000,
+        metrics: RunMetrics | None = None,
+        compression: str | None = None,
+    ) -> None:
+        pa = _require_pyarrow()
+        import pyarrow.parquet as pq
+
+        ensure_directory(path.parent)
+        self.path = path
+        self.rows_written = 0
+        self.fieldnames = list(fieldnames)
+        self.batch_size = max(1, batch_size)
+        self.metrics = metrics
+        self._schema = arrow_schema(self.fieldnames)
+        self._buffer: list[Mapping[str, object]] = []
+        previous = pq.read_table(path) if append and path.exists() else None
+        self._tmp_path = path.with_name(path.name + ".tmp")
+        self._writer = pq.ParquetWriter(str(self._tmp_path), self._schema, compression=compression or "snappy")
+        self._pa = pa
+        if previous is not None:
+            self._writer.write_table(previous.select(self.fieldnames).cast(self._schema))
+
+    def write(self, row: Mapping[str, object]) -> None:
+        self._buffer.append(row)
+        self.rows_written += 1
+        if self.metrics is not None:
+            self.metrics.count("written")
+        if len(self._buffer) >= self.batch_size:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._buffer:
+            return
+        start = time.perf_counter()
+        columns = {name: [row.get(name) for row in self._buffer] for name in self.fieldnames}
+        self._writer.write_table(self._pa.Table.from_pydict(columns, schema=self._schema))
+        self._buffer.clear()
+        if self.metrics is not None:
+            self.metrics.add_stage("write", time.perf_counter() - start)
+
+    def size(self) -> int:
+        return self._tmp_path.stat().st_size if self._tmp_path.exists() else 0
+
+    def sync(self) -> None:
+        """Writes the buffered rows as a row group.
+
+        A Parquet file is only readable once closed (its footer is written
+        last), so the rows are not recoverable from an interrupted file.
+        """
+        if self._writer is not None:
+            self._flush()
+
+    def close(self) -> None:
+        if self._writer is None:
+            return
+        self._flush()
+        start = time.perf_counter()
+        self._writer.close()
+        self._writer = None
+        self._tmp_path.replace(self.path)
+        if self.metrics is not None:
+            self.metrics.add_stage("write", time.perf_counter() - start)
+
+    def __enter__(self) -> "ParquetAppender":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+def open_result_writer(
+    path: Path,
+    fieldnames: Sequence[str],
+    fmt: str = "csv",
+    append: bool = False,
+    metrics: RunMetrics | None = None,
+    compression: str | None = None,
+):
+    if fmt == "parquet":
+        return ParquetAppender(path, fieldnames, append=append, metrics=metrics, compression=compression)
+    return CsvAppender(path, fieldnames, append=append, metrics=metrics, compression=compression)
+
+
+def report_path(output_path: Path) -> Path:
+    """JSON run report stored next to ``output_path``."""
+    return output_path.with_name(f"{split_result_name(output_path)[0]}.report.json")
+
+
+def delta_path(output_path: Path) -> Path:
+    """JSON delta of a refresh scrape stored next to ``output_path``."""
+    return output_path.with_name(f"{split_result_name(output_path)[0]}.delta.json")
+
+
+def open_result_text(path: Path) -> IO[str]:
+    """Opens a CSV result for reading, decompressing ``.gz`` / ``.zst`` (every member or frame)."""
+    _, compression = result_format(path)
+    if compression == "gzip":
+        return gzip.open(path, "rt", encoding="utf-8", newline="")
+    if compression == "zstd":
+        raw = path.open("rb")
+        reader = _require_zstandard().ZstdDecompressor().stream_reader(raw, read_across_frames=True, closefd=True)
+        return io.TextIOWrapper(reader, encoding="utf-8", newline="")
+    return path.open(encoding="utf-8", newline="")
+
+
+def count_result_rows(path: Path) -> int:
+    """Rows in one result file, without loading it as a DataFrame."""
+    if result_format(path)[0] == "parquet":
+        _require_pyarrow()
+        import pyarrow.parquet as pq
+
+        return pq.ParquetFile(path).metadata.num_rows
+    with open_result_text(path) as file:
+        return max(0, sum(1 for _ in csv.reader(file)) - 1)
+
+
+def _read_shard(path: Path):
+    import pandas as pd
+
+    if result_format(path)[0] == "parquet":
+        _require_pyarrow()
+        return pd.read_parquet(path, dtype_backend="numpy_nullable")
+    with open_result_text(path) as file:
+        header = next(csv.reader(file), [])
+    dtypes = {name: _PANDAS_DTYPES[FIELD_TYPES[name]] for name in header if name in FIELD_TYPES}
+    with open_result_text(path) as file:
+        return pd.read_csv(file, dtype=dtypes)
+
+
+def read_results(path: Path):
+    """Loads a result file as a typed DataFrame (CSV or Parquet).
+
+    Compressed CSVs are decompressed on the fly and the ``.partNNN`` shards
+    of ``path`` are concatenated after it.
+    """
+    import pandas as pd
+
+    shards = result_shards(path) or [path]
+    frames = [_read_shard(shard) for shard in shards]
+    return frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+
+
+def frame_to_rows(frame) -> list[dict]:
+    """Converts a DataFrame to row dicts with ``None`` for missing values."""
+    return frame.astype(object).where(frame.notna(), None).to_dict(orient="records")
+
+
 def write_csv(path: Path, fieldnames: Sequence[str], rows: Iterable[Mapping[str, object]]) -> None:
-    ensure_directory(path.parent)
-    with path.open("w", encoding="utf-8", newline="") as file:
-        writer = csv.DictWriter(file, fieldnames=fieldnames)
-        writer.writeheader()
+    with CsvAppender(path, fieldnames) as writer:
         for row in rows:
-            writer.writerow(row)
+            writer.write(row)
 
 
 def load_session_meta() -> dict:
@@ -77,9 +461,13 @@ def clear_session_files() -> None:
             continue
 
 
-def list_csv_files() -> list[Path]:
-    results = []
+def list_result_files() -> list[Path]:
+    """Result files under the results folder; shards are listed once, by their first file."""
+    results = set()
     root = get_results_root()
-    for path in root.rglob("*.csv"):
-        results.append(path)
+    for extension in RESULT_EXTENSIONS:
+        for path in root.rglob(f"*{extension}"):
+            stem, found = split_result_name(path)
+            if found == extension and not _SHARD_NAME.match(stem):
+                results.add(path)
     return sorted(results)